@@ -1,111 +1,129 @@
 import streamlit as st
 import math
+import os
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import time
+import heapq
+import tempfile
 from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
-# Configuração da página
-st.set_page_config(
-    page_title="RadSimLab Pro",
-    page_icon="☢️",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# CSS personalizado
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        color: #1E88E5;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .result-box {
-        background-color: #e8f5e9;
-        padding: 15px;
-        border-radius: 10px;
-        margin-top: 15px;
-        border-left: 5px solid #4CAF50;
-    }
-    .warning-box {
-        background-color: #ffebee;
-        padding: 15px;
-        border-radius: 10px;
-        margin-top: 15px;
-        border-left: 5px solid #F44336;
-    }
-    .info-box {
-        background-color: #e3f2fd;
-        padding: 15px;
-        border-radius: 10px;
-        margin-top: 15px;
-        border-left: 5px solid #2196F3;
-    }
-    .formula-box {
-        background-color: #f5f5f5;
-        padding: 15px;
-        border-radius: 8px;
-        border-left: 4px solid #9E9E9E;
-        font-family: 'Courier New', monospace;
-        margin: 10px 0;
-    }
-    .parameter-table {
-        width: 100%;
-        border-collapse: collapse;
-        margin: 10px 0;
-    }
-    .parameter-table th, .parameter-table td {
-        padding: 8px 12px;
-        text-align: left;
-        border-bottom: 1px solid #ddd;
-    }
-    .parameter-table th {
-        background-color: #f0f0f0;
-        font-weight: bold;
-    }
-</style>
-""", unsafe_allow_html=True)
+from cenarios import (abrir_raster_populacao, cor_risco, decair_atividades, dose_criticidade, dose_pluma,
+                       executar_chernobyl, executar_fukushima, executar_goiania, executar_kyshtym,
+                       executar_testes_nucleares, executar_three_mile_island, executar_tokaimura, executar_windscale,
+                       ler_meteorologia, MAX_COMBINACOES_VARREDURA, meteorologia_sintetica, NUCLIDEOS_PLUMA,
+                       PARAMETROS_CINETICA, ParametrosChernobyl, ParametrosFukushima, ParametrosGoiania,
+                       ParametrosKyshtym, ParametrosTestesNucleares, ParametrosThreeMileIsland, ParametrosTokaimura,
+                       ParametrosWindscale, perfil_liberacao, PERFIS_LIBERACAO, resumo_tornado, simular_puffs,
+                       tamanho_fft_rapido, termo_fonte, TERMOS_FONTE, varredura_cenario, _vetores_nuclideos)
 
-# Título principal
-st.markdown('<h1 class="main-header">🔬 RadSimLab Pro – Simulador Radiológico Avançado</h1>', unsafe_allow_html=True)
+def configurar_pagina():
+    """Configuração da página, estilo, cabeçalho e barra lateral; devolve o módulo selecionado"""
+    # Configuração da página
+    st.set_page_config(
+        page_title="RadSimLab Pro",
+        page_icon="☢️",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
 
-# Sidebar com informações
-with st.sidebar:
-    st.title("RadSimLab Pro")
-    st.markdown("---")
-    st.markdown("### 📊 Navegação")
-    
-    # Menu de módulos
-    modulos = {
-        "Datação Radiométrica": "datacao_radiometrica",
-        "Blindagem Radiológica": "blindagem",
-        "Radioterapia": "radioterapia",
-        "Distribuição de Dose": "dose",
-        "Aplicações Clínicas": "clinico",
-        "Aplicações Ambientais": "ambiental",
-        "Efeito Compton": "compton",
-        "Produção de Pares": "pares",
-        "Exposição Ocupacional": "ocupacional",
-        "Cenários Históricos": "historico",
-        "Decaimento Radioativo": "decaimento",
-        "Modo Explicativo": "explicativo",
-        "Quiz Interativo": "quiz",
-        "Exportar Dados": "exportar",
-        "Comparar Simulações": "comparar"
-    }
+    # CSS personalizado
+    st.markdown("""
+    <style>
+        .main-header {
+            font-size: 2.5rem;
+            color: #1E88E5;
+            text-align: center;
+            margin-bottom: 2rem;
+        }
+        .result-box {
+            background-color: #e8f5e9;
+            padding: 15px;
+            border-radius: 10px;
+            margin-top: 15px;
+            border-left: 5px solid #4CAF50;
+        }
+        .warning-box {
+            background-color: #ffebee;
+            padding: 15px;
+            border-radius: 10px;
+            margin-top: 15px;
+            border-left: 5px solid #F44336;
+        }
+        .info-box {
+            background-color: #e3f2fd;
+            padding: 15px;
+            border-radius: 10px;
+            margin-top: 15px;
+            border-left: 5px solid #2196F3;
+        }
+        .formula-box {
+            background-color: #f5f5f5;
+            padding: 15px;
+            border-radius: 8px;
+            border-left: 4px solid #9E9E9E;
+            font-family: 'Courier New', monospace;
+            margin: 10px 0;
+        }
+        .parameter-table {
+            width: 100%;
+            border-collapse: collapse;
+            margin: 10px 0;
+        }
+        .parameter-table th, .parameter-table td {
+            padding: 8px 12px;
+            text-align: left;
+            border-bottom: 1px solid #ddd;
+        }
+        .parameter-table th {
+            background-color: #f0f0f0;
+            font-weight: bold;
+        }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # Título principal
+    st.markdown('<h1 class="main-header">🔬 RadSimLab Pro – Simulador Radiológico Avançado</h1>', unsafe_allow_html=True)
+
+    # Sidebar com informações
+    with st.sidebar:
+        st.title("RadSimLab Pro")
+        st.markdown("---")
+        st.markdown("### 📊 Navegação")
+    
+        # Menu de módulos
+        modulos = {
+            "Datação Radiométrica": "datacao_radiometrica",
+            "Blindagem Radiológica": "blindagem",
+            "Radioterapia": "radioterapia",
+            "Distribuição de Dose": "dose",
+            "Aplicações Clínicas": "clinico",
+            "Aplicações Ambientais": "ambiental",
+            "Efeito Compton": "compton",
+            "Produção de Pares": "pares",
+            "Exposição Ocupacional": "ocupacional",
+            "Cenários Históricos": "historico",
+            "Decaimento Radioativo": "decaimento",
+            "Modo Explicativo": "explicativo",
+            "Quiz Interativo": "quiz",
+            "Exportar Dados": "exportar",
+            "Comparar Simulações": "comparar"
+        }
     
-    modulo = st.selectbox("Selecione o módulo", list(modulos.keys()))
+        modulo = st.selectbox("Selecione o módulo", list(modulos.keys()))
     
-    st.markdown("---")
-    st.markdown("### ℹ️ Sobre")
-    st.info("""
-    RadSimLab Pro é uma ferramenta educacional para simulações
-    em física radiológica. Desenvolvido para estudantes e
-    profissionais da área.
-    """)
+        st.markdown("---")
+        st.markdown("### ℹ️ Sobre")
+        st.info("""
+        RadSimLab Pro é uma ferramenta educacional para simulações
+        em física radiológica. Desenvolvido para estudantes e
+        profissionais da área.
+        """)
+
+    return modulo
 
 
 # =============================================================================
@@ -803,6 +821,280 @@ CAMADA SEMI-REDUTORA: {math.log(2)/mu:.2f} cm"""
 # MÓDULO 3: RADIOTERAPIA
 # =============================================================================
 
+# Parâmetros radiobiológicos de referência para o modelo linear-quadrático (LQ)
+# alpha_beta em Gy, alpha em Gy⁻¹, t_k (início da repopulação) e t_pot em dias.
+# Tecidos de resposta tardia não repopulam durante o tratamento (t_pot = None).
+TECIDOS_LQ = {
+    "Tumor (cabeça e pescoço)": {"tipo": "tumor", "alpha_beta": 10.0, "alpha": 0.30, "t_k": 21.0, "t_pot": 3.0},
+    "Tumor (pulmão)": {"tipo": "tumor", "alpha_beta": 10.0, "alpha": 0.35, "t_k": 21.0, "t_pot": 3.5},
+    "Tumor (mama)": {"tipo": "tumor", "alpha_beta": 4.0, "alpha": 0.30, "t_k": 21.0, "t_pot": 14.0},
+    "Tumor (próstata)": {"tipo": "tumor", "alpha_beta": 1.5, "alpha": 0.15, "t_k": None, "t_pot": None},
+    "Mucosa (reação aguda)": {"tipo": "oar", "alpha_beta": 10.0, "alpha": 0.35, "t_k": 7.0, "t_pot": 2.5},
+    "Medula espinhal": {"tipo": "oar", "alpha_beta": 2.0, "alpha": 0.25, "t_k": None, "t_pot": None},
+    "Reto": {"tipo": "oar", "alpha_beta": 3.0, "alpha": 0.25, "t_k": None, "t_pot": None},
+    "Pulmão (pneumonite)": {"tipo": "oar", "alpha_beta": 3.0, "alpha": 0.25, "t_k": None, "t_pot": None},
+    "Cérebro": {"tipo": "oar", "alpha_beta": 2.0, "alpha": 0.25, "t_k": None, "t_pot": None}
+}
+
+def duracao_tratamento_dias(n_fracoes, sessoes_semana=5, interrupcao_dias=0):
+    """Tempo total (dias) entre a primeira e a última fração, iniciando numa segunda-feira"""
+    n = np.asarray(n_fracoes, dtype=float)
+    intervalos = np.maximum(n - 1, 0)
+    return 7 * np.floor(intervalos / sessoes_semana) + np.mod(intervalos, sessoes_semana) + interrupcao_dias
+
+def calcular_bed_lq(n_fracoes, dose_fracao, alpha_beta, tempo_total=None, alpha=None, t_k=None, t_pot=None):
+    """BED vetorizada do modelo LQ, com termo opcional de repopulação acelerada"""
+    n = np.asarray(n_fracoes, dtype=float)
+    d = np.asarray(dose_fracao, dtype=float)
+    bed = n * d * (1 + d / alpha_beta)
+
+    if tempo_total is not None and alpha and t_pot:
+        atraso = np.maximum(np.asarray(tempo_total, dtype=float) - (t_k or 0.0), 0.0)
+        bed = np.maximum(bed - math.log(2) * atraso / (alpha * t_pot), 0.0)
+
+    return bed
+
+def calcular_eqd2(bed, alpha_beta):
+    """Dose equivalente em frações de 2 Gy a partir da BED"""
+    return np.asarray(bed, dtype=float) / (1 + 2.0 / alpha_beta)
+
+def bed_tecido(n_fracoes, dose_fracao, tecido, sessoes_semana=5, interrupcao_dias=0):
+    """BED de um tecido de TECIDOS_LQ, com o tempo total derivado do calendário semanal"""
+    tempo = duracao_tratamento_dias(n_fracoes, sessoes_semana, interrupcao_dias)
+    return calcular_bed_lq(n_fracoes, dose_fracao, tecido["alpha_beta"], tempo,
+                           tecido["alpha"], tecido["t_k"], tecido["t_pot"])
+
+def grade_fracionamento(n_valores, d_valores, tecidos, sessoes_semana=5, interrupcao_dias=0):
+    """Avalia BED e EQD2 em toda a grade (nº de frações × dose/fração) para vários tecidos"""
+    n = np.asarray(n_valores, dtype=float)[:, None]
+    d = np.asarray(d_valores, dtype=float)[None, :]
+
+    resultados = {}
+    for nome, tecido in tecidos.items():
+        bed = bed_tecido(n, d, tecido, sessoes_semana, interrupcao_dias)
+        resultados[nome] = {"bed": bed, "eqd2": calcular_eqd2(bed, tecido["alpha_beta"])}
+
+    return resultados
+
+def compensar_interrupcao(n_fracoes, dose_fracao, fracoes_realizadas, interrupcao_dias, tecido, sessoes_semana=5):
+    """Dose/fração das frações restantes que restaura a BED tumoral planejada após uma interrupção"""
+    ab = tecido["alpha_beta"]
+    interrupcao = np.asarray(interrupcao_dias, dtype=float)
+
+    bed_planejada = bed_tecido(n_fracoes, dose_fracao, tecido, sessoes_semana)
+    bed_sem_compensacao = bed_tecido(n_fracoes, dose_fracao, tecido, sessoes_semana, interrupcao)
+    perda = bed_planejada - bed_sem_compensacao
+
+    # As frações restantes precisam entregar a BED original mais a perda por repopulação:
+    # m·x·(1 + x/(α/β)) = alvo  →  x = (α/β)/2 · (√(1 + 4·alvo/(m·α/β)) − 1)
+    restantes = n_fracoes - fracoes_realizadas
+    if restantes <= 0:
+        dose_nova = np.full_like(interrupcao, np.nan)
+    else:
+        alvo = restantes * dose_fracao * (1 + dose_fracao / ab) + perda
+        dose_nova = 0.5 * ab * (np.sqrt(1 + 4 * alvo / (restantes * ab)) - 1)
+
+    return {
+        "bed_planejada": bed_planejada,
+        "bed_sem_compensacao": bed_sem_compensacao,
+        "perda_bed": perda,
+        "dose_fracao_compensada": dose_nova,
+        "fracoes_restantes": restantes
+    }
+
+# Dias da semana preferidos (0 = segunda-feira) para cada número de sessões semanais
+PADROES_SEMANAIS = {
+    1: [0], 2: [0, 3], 3: [0, 2, 4], 4: [0, 1, 3, 4],
+    5: [0, 1, 2, 3, 4], 6: [0, 1, 2, 3, 4, 5], 7: [0, 1, 2, 3, 4, 5, 6]
+}
+
+def feriados_nacionais(anos):
+    """Feriados nacionais de data fixa do Brasil para os anos informados"""
+    datas = ["01-01", "04-21", "05-01", "09-07", "10-12", "11-02", "11-15", "11-20", "12-25"]
+    return np.array([f"{ano}-{data}" for ano in anos for data in datas], dtype="datetime64[D]")
+
+def selecionar_dias_sessao(disponivel, dia_semana, semana, sessoes_semana, n_sessoes):
+    """Índices dos primeiros dias que cumprem o padrão semanal; semanas com dias preferidos
+    indisponíveis (feriado ou acelerador lotado) são completadas com outros dias livres"""
+    if len(disponivel) == 0:
+        return np.array([], dtype=int)
+
+    preferido = disponivel & np.isin(dia_semana, PADROES_SEMANAIS[sessoes_semana])
+    semana_rel = semana - semana[0]
+    faltam = sessoes_semana - np.bincount(semana_rel[preferido], minlength=semana_rel[-1] + 1)
+
+    # Posição de cada dia extra dentro da sua semana (soma acumulada reiniciada a cada segunda-feira)
+    extra = disponivel & ~preferido
+    acumulado = np.cumsum(extra)
+    inicio_semana = np.searchsorted(semana_rel, semana_rel)
+    posicao = acumulado - acumulado[inicio_semana] + extra[inicio_semana]
+
+    selecionado = preferido | (extra & (posicao <= faltam[semana_rel]))
+    return np.flatnonzero(selecionado)[:n_sessoes]
+
+def calendario_sessoes(inicio, n_sessoes, sessoes_semana=5, feriados=()):
+    """Datas das sessões de um paciente, pulando fins de semana e feriados"""
+    inicio = np.datetime64(inicio, "D")
+    dias = inicio + np.arange(int(14 * n_sessoes / sessoes_semana) + 60)
+    numero = dias.astype("int64")
+    dia_semana = (numero + 3) % 7
+    disponivel = ~np.isin(dias, np.asarray(feriados, dtype="datetime64[D]"))
+    if sessoes_semana <= 5:
+        disponivel &= dia_semana < 5
+
+    indices = selecionar_dias_sessao(disponivel, dia_semana, (numero + 3) // 7, sessoes_semana, n_sessoes)
+    return dias[indices]
+
+def horas_exposicao_diarias(inicio, n_dias, horas_dia, dias_semana=5, feriados=()):
+    """Datas e horas de exposição de cada dia; horas_dia escalar ou uma por dia da semana (seg..dom)"""
+    dias = np.datetime64(inicio, "D") + np.arange(n_dias)
+    dia_semana = (dias.astype("int64") + 3) % 7
+    horas = np.broadcast_to(np.asarray(horas_dia, dtype=float), (7,))[dia_semana]
+    trabalho = np.isin(dia_semana, PADROES_SEMANAIS[dias_semana]) & ~np.isin(dias, np.asarray(feriados, dtype="datetime64[D]"))
+    return dias, horas * trabalho
+
+def taxa_em_vigor(datas, taxa_inicial, mudancas=()):
+    """Taxa vigente em cada data, com mudanças em degrau dadas como pares (data, nova taxa)"""
+    datas = np.asarray(datas, dtype="datetime64[D]")
+    if not len(mudancas):
+        return np.full(datas.shape, float(taxa_inicial))
+    datas_mudanca = np.array([m[0] for m in mudancas], dtype="datetime64[D]")
+    ordem = np.argsort(datas_mudanca)
+    taxas = np.concatenate([[float(taxa_inicial)], np.array([m[1] for m in mudancas], dtype=float)[ordem]])
+    return taxas[np.searchsorted(datas_mudanca[ordem], datas, side="right")]
+
+def dose_acumulada(doses, grupos=None):
+    """Dose acumulada por soma cumulativa; com grupos inteiros crescentes (ex.: semanas), acumula o total de cada grupo"""
+    doses = np.asarray(doses, dtype=float)
+    if grupos is None:
+        return np.cumsum(doses, axis=-1)
+    grupos = np.asarray(grupos)
+    return np.cumsum(np.bincount(grupos - grupos[0], weights=doses))
+
+class AgendadorTratamentos:
+    """Agenda departamental de radioterapia: pacientes distribuídos entre aceleradores com
+    capacidade diária em slots, respeitando sessões/semana, fins de semana e feriados"""
+
+    def __init__(self, inicio, horizonte_dias, aceleradores, feriados=(), fim_de_semana=False):
+        self.inicio = np.datetime64(inicio, "D")
+        self.dias = self.inicio + np.arange(horizonte_dias)
+        numero = self.dias.astype("int64")
+        self.dia_semana = (numero + 3) % 7
+        self.semana = (numero + 3) // 7
+        self.aceleradores = list(aceleradores.keys())
+
+        aberto = ~np.isin(self.dias, np.asarray(feriados, dtype="datetime64[D]"))
+        if not fim_de_semana:
+            aberto &= self.dia_semana < 5
+        self.capacidade = aberto[:, None] * np.array(list(aceleradores.values()))[None, :]
+        self.livre = self.capacidade.copy()
+
+        self.pacientes = {}
+        self.agenda = {}
+        self._ordem = 0
+
+    def adicionar_paciente(self, paciente_id, inicio, n_sessoes, sessoes_semana=5, prioridade=1):
+        """Registra um paciente (prioridade menor = mais urgente)"""
+        self.pacientes[paciente_id] = {
+            "inicio": np.datetime64(inicio, "D"),
+            "n_sessoes": int(n_sessoes),
+            "sessoes_semana": int(sessoes_semana),
+            "prioridade": prioridade,
+            "ordem": self._ordem
+        }
+        self._ordem += 1
+
+    def construir(self):
+        """Aloca todos os pacientes pela fila de prioridade (prioridade, data de início, chegada)"""
+        self.livre = self.capacidade.copy()
+        self.agenda = {}
+
+        fila = [(p["prioridade"], p["inicio"].astype("int64"), p["ordem"], pid)
+                for pid, p in self.pacientes.items()]
+        heapq.heapify(fila)
+        while fila:
+            self._alocar(heapq.heappop(fila)[3])
+
+        return self
+
+    def _alocar(self, paciente_id):
+        p = self.pacientes[paciente_id]
+        apos_inicio = self.dias >= p["inicio"]
+        if p["sessoes_semana"] <= 5:
+            apos_inicio &= self.dia_semana < 5
+
+        melhor = None
+        for m in range(len(self.aceleradores)):
+            indices = selecionar_dias_sessao(apos_inicio & (self.livre[:, m] > 0), self.dia_semana,
+                                             self.semana, p["sessoes_semana"], p["n_sessoes"])
+            if len(indices) < p["n_sessoes"]:
+                continue
+            # Término mais cedo; empate resolvido pelo acelerador menos ocupado
+            chave = (indices[-1], -self.livre[:, m].sum())
+            if melhor is None or chave < melhor[0]:
+                melhor = (chave, m, indices)
+
+        if melhor is None:
+            self.agenda[paciente_id] = None
+            return False
+
+        _, m, indices = melhor
+        self.livre[indices, m] -= 1
+        self.agenda[paciente_id] = (m, indices)
+        return True
+
+    def _liberar(self, paciente_id):
+        alocacao = self.agenda.pop(paciente_id, None)
+        if alocacao is not None:
+            m, indices = alocacao
+            self.livre[indices, m] += 1
+
+    def replanejar_paciente(self, paciente_id, **alteracoes):
+        """Replaneja apenas um paciente, liberando e realocando seus slots sem refazer a agenda"""
+        self._liberar(paciente_id)
+        for chave, valor in alteracoes.items():
+            self.pacientes[paciente_id][chave] = np.datetime64(valor, "D") if chave == "inicio" else valor
+        return self._alocar(paciente_id)
+
+    def remover_paciente(self, paciente_id):
+        self._liberar(paciente_id)
+        self.pacientes.pop(paciente_id, None)
+
+    def tabela_sessoes(self):
+        """Todas as sessões agendadas em formato tabular"""
+        linhas = [pd.DataFrame({
+            "Paciente": paciente_id,
+            "Acelerador": self.aceleradores[m],
+            "Sessão": np.arange(1, len(indices) + 1),
+            "Data": self.dias[indices]
+        }) for paciente_id, (m, indices) in
+            ((pid, alocacao) for pid, alocacao in self.agenda.items() if alocacao is not None)]
+        if not linhas:
+            return pd.DataFrame(columns=["Paciente", "Acelerador", "Sessão", "Data"])
+        return pd.concat(linhas, ignore_index=True)
+
+    def resumo_pacientes(self):
+        """Início, término e acelerador de cada paciente"""
+        linhas = []
+        for pid, p in self.pacientes.items():
+            alocacao = self.agenda.get(pid)
+            linhas.append({
+                "Paciente": pid,
+                "Prioridade": p["prioridade"],
+                "Sessões": p["n_sessoes"],
+                "Sessões/semana": p["sessoes_semana"],
+                "Acelerador": self.aceleradores[alocacao[0]] if alocacao else "Não alocado",
+                "Primeira sessão": self.dias[alocacao[1][0]] if alocacao else None,
+                "Última sessão": self.dias[alocacao[1][-1]] if alocacao else None
+            })
+        return pd.DataFrame(linhas)
+
+    def ocupacao(self):
+        """Fração dos slots utilizados por dia e acelerador"""
+        usados = self.capacidade - self.livre
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.capacidade > 0, usados / self.capacidade, np.nan)
+
 def modulo_radioterapia():
     st.header("📅 Planejamento Radioterápico")
     
@@ -903,9 +1195,14 @@ def modulo_radioterapia():
         else:
             st.error("❌ Teste falhou! Verifique os cálculos.")
         
+        # Calendário real das sessões (fins de semana e feriados nacionais excluídos)
+        hoje = datetime.now()
+        datas_sessoes = calendario_sessoes(hoje, num_sessoes, dias_semana,
+                                           feriados_nacionais(range(hoje.year, hoje.year + 3)))
+        
         # Gráfico da distribuição de sessões
         sessoes = list(range(1, num_sessoes + 1))
-        doses_acumuladas = [dose_por_sessao * i for i in range(1, num_sessoes + 1)]
+        doses_acumuladas = dose_acumulada(np.full(num_sessoes, dose_por_sessao))
         
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
         
@@ -931,6 +1228,7 @@ def modulo_radioterapia():
         # Tabela de tratamento
         df_tratamento = pd.DataFrame({
             "Sessão": sessoes,
+            "Data": pd.to_datetime(datas_sessoes).strftime('%d/%m/%Y'),
             "Dose_Sessão (Gy)": [dose_por_sessao] * num_sessoes,
             "Dose_Acumulada (Gy)": doses_acumuladas,
             "Tempo_Sessão (min)": [tempo_por_sessao] * num_sessoes
@@ -953,17 +1251,695 @@ RESULTADOS:
 - Semanas de tratamento: {semanas:.1f}
 
 CALENDÁRIO ESTIMADO:
-- Início: {datetime.now().strftime('%d/%m/%Y')}
-- Término: {(datetime.now() + pd.DateOffset(weeks=semanas)).strftime('%d/%m/%Y')}"""
+- Início: {pd.Timestamp(datas_sessoes[0]).strftime('%d/%m/%Y')}
+- Término: {pd.Timestamp(datas_sessoes[-1]).strftime('%d/%m/%Y')}"""
 
         st.download_button("📥 Baixar Plano de Tratamento", data=plano, 
                           file_name="plano_radioterapia.txt", 
                           mime="text/plain", use_container_width=True)
 
+    # Análise radiobiológica do fracionamento (modelo LQ)
+    st.markdown("---")
+    st.markdown("### 🧬 Análise Radiobiológica do Fracionamento (Modelo LQ)")
+
+    tumores = [nome for nome, p in TECIDOS_LQ.items() if p["tipo"] == "tumor"]
+    orgaos_risco = [nome for nome, p in TECIDOS_LQ.items() if p["tipo"] == "oar"]
+
+    col_lq1, col_lq2 = st.columns(2)
+
+    with col_lq1:
+        tumor = st.selectbox("Tecido alvo", tumores)
+        oars = st.multiselect("Órgãos de risco", orgaos_risco, default=orgaos_risco[:2])
+
+    with col_lq2:
+        interrupcao = st.number_input("Interrupção não planejada (dias)",
+                                    min_value=0, max_value=42, value=0, step=1,
+                                    help="Dias sem tratamento além dos fins de semana")
+        fracoes_realizadas = st.number_input("Frações realizadas antes da interrupção",
+                                           min_value=0, max_value=int(num_sessoes),
+                                           value=min(10, int(num_sessoes)), step=1)
+
+    st.markdown('<div class="formula-box">BED = n·d·(1 + d/(α/β)) − ln2·(T − Tk)/(α·Tpot) &nbsp;|&nbsp; EQD2 = BED / (1 + 2/(α/β))</div>', unsafe_allow_html=True)
+
+    tecidos_sel = {nome: TECIDOS_LQ[nome] for nome in [tumor] + oars}
+    dose_fracao_plano = dose_total / num_sessoes
+
+    # Curva BED × nº de frações (dose total constante) e mapa de iso-efeito na mesma avaliação vetorizada
+    n_curva = np.arange(1, 41)
+    doses_mapa = np.linspace(1.0, 10.0, 91)
+    n_mapa = np.arange(1, 41)
+
+    curvas = {nome: bed_tecido(n_curva, dose_total / n_curva, p, dias_semana, interrupcao)
+              for nome, p in tecidos_sel.items()}
+    mapa = grade_fracionamento(n_mapa, doses_mapa, tecidos_sel, dias_semana, interrupcao)
+
+    fig_lq, (ax_lq1, ax_lq2) = plt.subplots(1, 2, figsize=(14, 6))
+
+    for nome, bed in curvas.items():
+        ax_lq1.plot(n_curva, bed, linewidth=2, label=nome)
+    ax_lq1.axvline(x=num_sessoes, color='gray', linestyle=':', label='Plano atual')
+    ax_lq1.set_xlabel("Número de Frações")
+    ax_lq1.set_ylabel("BED (Gy)")
+    ax_lq1.set_title(f"BED vs Número de Frações ({dose_total:.0f} Gy totais)")
+    ax_lq1.legend()
+    ax_lq1.grid(True)
+
+    eqd2_tumor = mapa[tumor]["eqd2"]
+    cf = ax_lq2.contourf(doses_mapa, n_mapa, eqd2_tumor, levels=20, cmap='viridis')
+    fig_lq.colorbar(cf, ax=ax_lq2, label=f"EQD2 {tumor} (Gy)")
+    for nome, cor in zip(oars, ['white', 'orange', 'red', 'magenta', 'cyan']):
+        cs = ax_lq2.contour(doses_mapa, n_mapa, mapa[nome]["eqd2"], levels=[50, 70], colors=cor, linestyles=['--', '-'])
+        ax_lq2.clabel(cs, fmt=lambda v, nome=nome: f"{nome}: {v:.0f} Gy", fontsize=7)
+    ax_lq2.plot(dose_fracao_plano, num_sessoes, 'r*', markersize=15, label='Plano atual')
+    ax_lq2.set_xlabel("Dose por Fração (Gy)")
+    ax_lq2.set_ylabel("Número de Frações")
+    ax_lq2.set_title("Mapa de Iso-efeito (EQD2)")
+    ax_lq2.legend()
+
+    plt.tight_layout()
+    st.pyplot(fig_lq)
+
+    df_lq = pd.DataFrame({
+        "Tecido": list(tecidos_sel.keys()),
+        "α/β (Gy)": [p["alpha_beta"] for p in tecidos_sel.values()],
+        "BED (Gy)": [float(bed_tecido(num_sessoes, dose_fracao_plano, p, dias_semana, interrupcao)) for p in tecidos_sel.values()],
+    })
+    df_lq["EQD2 (Gy)"] = calcular_eqd2(df_lq["BED (Gy)"], df_lq["α/β (Gy)"])
+    st.dataframe(df_lq, use_container_width=True)
+
+    if interrupcao > 0:
+        st.markdown("**⏸️ Compensação da Interrupção:**")
+        compensacao = compensar_interrupcao(num_sessoes, dose_fracao_plano, fracoes_realizadas,
+                                            interrupcao, TECIDOS_LQ[tumor], dias_semana)
+
+        col_gap1, col_gap2, col_gap3 = st.columns(3)
+
+        with col_gap1:
+            st.metric("BED tumoral planejada", f"{float(compensacao['bed_planejada']):.1f} Gy")
+        with col_gap2:
+            st.metric("BED sem compensação", f"{float(compensacao['bed_sem_compensacao']):.1f} Gy",
+                      delta=f"-{float(compensacao['perda_bed']):.1f} Gy", delta_color="inverse")
+        with col_gap3:
+            dose_comp = float(compensacao['dose_fracao_compensada'])
+            if np.isnan(dose_comp):
+                st.warning("Não há frações restantes para compensar a interrupção.")
+            else:
+                st.metric("Dose/fração compensada", f"{dose_comp:.2f} Gy",
+                          delta=f"{dose_comp - dose_fracao_plano:+.2f} Gy")
+
+                for nome in oars:
+                    p = TECIDOS_LQ[nome]
+                    bed_oar = (calcular_bed_lq(fracoes_realizadas, dose_fracao_plano, p["alpha_beta"]) +
+                               calcular_bed_lq(compensacao['fracoes_restantes'], dose_comp, p["alpha_beta"]))
+                    st.markdown(f"- {nome}: EQD2 {float(calcular_eqd2(bed_oar, p['alpha_beta'])):.1f} Gy após compensação")
+
+    # Agenda departamental (vários pacientes e aceleradores)
+    st.markdown("---")
+    st.markdown("### 🏥 Agenda do Departamento")
+
+    col_ag1, col_ag2, col_ag3 = st.columns(3)
+
+    with col_ag1:
+        n_pacientes = st.number_input("Pacientes na fila", min_value=1, max_value=2000, value=300, step=10)
+        n_aceleradores = st.number_input("Aceleradores lineares", min_value=1, max_value=10, value=4, step=1)
+
+    with col_ag2:
+        slots_dia = st.number_input("Slots por acelerador/dia", min_value=1, max_value=80, value=40, step=1)
+        horizonte = st.number_input("Horizonte (dias)", min_value=30, max_value=730, value=180, step=30)
+
+    with col_ag3:
+        semente = st.number_input("Semente da fila simulada", min_value=0, value=42, step=1)
+
+    if st.button("🗓️ Montar Agenda do Departamento", use_container_width=True):
+        hoje = np.datetime64(datetime.now().date(), "D")
+        rng = np.random.default_rng(int(semente))
+        agendador = AgendadorTratamentos(hoje, int(horizonte),
+                                         {f"LINAC {i + 1}": int(slots_dia) for i in range(int(n_aceleradores))},
+                                         feriados_nacionais(range(datetime.now().year, datetime.now().year + 3)))
+
+        for i in range(int(n_pacientes)):
+            agendador.adicionar_paciente(f"P{i + 1:04d}", hoje + int(rng.integers(0, 60)),
+                                         int(rng.choice([5, 10, 15, 20, 25, 28, 30, 33, 35])),
+                                         int(rng.choice([5, 5, 5, 4, 3])), int(rng.integers(0, 3)))
+
+        inicio_agenda = time.perf_counter()
+        agendador.construir()
+        st.session_state.agendador_radioterapia = agendador
+        st.session_state.tempo_agenda = time.perf_counter() - inicio_agenda
+
+    agendador = st.session_state.get("agendador_radioterapia")
+
+    if agendador is not None:
+        resumo = agendador.resumo_pacientes()
+        nao_alocados = int((resumo["Acelerador"] == "Não alocado").sum())
+        st.markdown(f"**{len(resumo)} pacientes** agendados em {st.session_state.tempo_agenda*1000:.0f} ms "
+                    f"({nao_alocados} sem vaga no horizonte)")
+
+        col_rep1, col_rep2, col_rep3 = st.columns(3)
+        with col_rep1:
+            paciente_rep = st.selectbox("Replanejar paciente", list(agendador.pacientes.keys()))
+        with col_rep2:
+            novas_sessoes = st.number_input("Novo número de sessões", min_value=1, max_value=60,
+                                          value=agendador.pacientes[paciente_rep]["n_sessoes"], step=1)
+        with col_rep3:
+            nova_frequencia = st.selectbox("Novas sessões/semana", [5, 4, 3, 2, 1])
+
+        if st.button("🔁 Replanejar Paciente"):
+            inicio_rep = time.perf_counter()
+            if agendador.replanejar_paciente(paciente_rep, n_sessoes=int(novas_sessoes),
+                                             sessoes_semana=int(nova_frequencia)):
+                st.success(f"✅ {paciente_rep} replanejado em {(time.perf_counter() - inicio_rep)*1000:.1f} ms")
+            else:
+                st.warning(f"⚠️ Não há vagas suficientes para {paciente_rep} no horizonte.")
+            resumo = agendador.resumo_pacientes()
+
+        ocupacao = agendador.ocupacao()
+        fig_ag, ax_ag = plt.subplots(figsize=(12, 4))
+        im = ax_ag.imshow(ocupacao.T, aspect='auto', cmap='YlOrRd', vmin=0, vmax=1, interpolation='nearest')
+        fig_ag.colorbar(im, ax=ax_ag, label="Ocupação dos slots")
+        ax_ag.set_yticks(range(len(agendador.aceleradores)))
+        ax_ag.set_yticklabels(agendador.aceleradores)
+        ax_ag.set_xlabel(f"Dias a partir de {pd.Timestamp(agendador.inicio).strftime('%d/%m/%Y')}")
+        ax_ag.set_title("Ocupação diária dos aceleradores")
+
+        st.pyplot(fig_ag)
+        st.dataframe(resumo, use_container_width=True)
+
 # =============================================================================
 # MÓDULO 4: DISTRIBUIÇÃO DE DOSE
 # =============================================================================
 
+def erf_vetorizado(x):
+    """Função erro vetorizada (Abramowitz & Stegun 7.1.26, erro < 1.5e-7)"""
+    x = np.asarray(x, dtype=float)
+    t = 1.0 / (1.0 + 0.3275911 * np.abs(x))
+    polinomio = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return np.sign(x) * (1.0 - polinomio * np.exp(-x * x))
+
+@lru_cache(maxsize=64)
+def parametros_pdd_fotons(energia):
+    """Coeficientes do modelo de PDD de fótons (μ efetivo, build-up e normalização) por energia (MV)"""
+    mu = 0.07 * energia ** -0.25
+    dmax = 0.5 * energia ** 0.65
+
+    # k tal que o máximo de (1 − e^(−kd))·e^(−μd) ocorra em dmax: ln((k + μ)/μ)/k = dmax
+    k_min, k_max = 1e-3, 100.0
+    for _ in range(60):
+        k = 0.5 * (k_min + k_max)
+        if math.log((k + mu) / mu) / k > dmax:
+            k_min = k
+        else:
+            k_max = k
+
+    fracao_superficie = 0.2
+    d = np.linspace(0, 4 * dmax, 2001)
+    curva = (1 - (1 - fracao_superficie) * np.exp(-k * d)) * np.exp(-mu * d)
+    return mu, k, fracao_superficie, float(curva.max())
+
+def pdd_fotons(profundidade, energia):
+    """PDD relativa (máximo = 1) de um feixe de fótons em função da profundidade radiológica (cm)"""
+    mu, k, fracao_superficie, norma = parametros_pdd_fotons(float(energia))
+    d = np.maximum(profundidade, 0.0)
+    return (1 - (1 - fracao_superficie) * np.exp(-k * d)) * np.exp(-mu * d) / norma
+
+def perfil_fora_do_eixo(x, largura, penumbra):
+    """Perfil lateral de um campo de largura dada, com penumbra 80–20% gaussiana (cm)"""
+    sigma = max(penumbra, 1e-6) / 1.683
+    escala = 1.0 / (sigma * math.sqrt(2))
+    return 0.5 * (erf_vetorizado((0.5 * largura - x) * escala) + erf_vetorizado((0.5 * largura + x) * escala))
+
+def fluencia_abertura(mascara, espacamento, penumbra):
+    """Fluência de uma abertura arbitrária (ex.: MLC) suavizada pela penumbra via convolução FFT"""
+    sigma = max(penumbra, 1e-6) / 1.683
+    borda = int(math.ceil(4 * sigma / espacamento))
+    mapa = np.pad(np.asarray(mascara, dtype=float), borda)
+
+    # Núcleo gaussiano aplicado diretamente no domínio da frequência
+    fy = np.fft.fftfreq(mapa.shape[0], d=espacamento)[:, None]
+    fx = np.fft.rfftfreq(mapa.shape[1], d=espacamento)[None, :]
+    transferencia = np.exp(-2 * (math.pi * sigma) ** 2 * (fx ** 2 + fy ** 2))
+    suavizado = np.fft.irfft2(np.fft.rfft2(mapa) * transferencia, s=mapa.shape)
+
+    return np.clip(suavizado[borda:borda + mascara.shape[0], borda:borda + mascara.shape[1]], 0.0, 1.0)
+
+def fantoma_densidade(n, espacamento, heterogeneidade="Nenhuma"):
+    """Fantoma elíptico de água em ar (ny, nz, nx) com inserto heterogêneo opcional"""
+    c = (np.arange(n) - (n - 1) / 2) * espacamento
+    Y, Z, X = np.meshgrid(c, c, c, indexing="ij", sparse=True)
+    semi_x, semi_z = 0.45 * n * espacamento, 0.35 * n * espacamento
+
+    densidade = np.full((n, n, n), 0.001, dtype=np.float32)
+    corpo = (X / semi_x) ** 2 + (Z / semi_z) ** 2 <= 1
+    densidade[np.broadcast_to(corpo, densidade.shape)] = 1.0
+
+    if heterogeneidade == "Pulmão":
+        for lado in (-1, 1):
+            pulmao = ((X - lado * 0.45 * semi_x) / (0.3 * semi_x)) ** 2 + (Z / (0.6 * semi_z)) ** 2 <= 1
+            densidade[np.broadcast_to(pulmao, densidade.shape)] = 0.25
+    elif heterogeneidade == "Osso":
+        osso = (np.abs(Z + 0.5 * semi_z) <= 0.08 * semi_z) & (np.abs(X) <= 0.6 * semi_x)
+        densidade[np.broadcast_to(osso, densidade.shape)] = 1.85
+
+    return densidade
+
+@lru_cache(maxsize=16)
+def geometria_feixe(nz, nx, espacamento, angulo, sad=100.0):
+    """Mapeamentos (vizinho mais próximo) entre o referencial do feixe (u lateral, v ao longo
+    do eixo) e a seção axial (nz, nx), comuns a todas as fatias"""
+    h = espacamento
+    x = (np.arange(nx) - (nx - 1) / 2) * h
+    z = (np.arange(nz) - (nz - 1) / 2) * h
+    X, Z = np.meshgrid(x, z)
+
+    # Grade do feixe cobrindo toda a seção axial
+    raio = 0.5 * h * math.hypot(nx, nz)
+    s = np.arange(-raio, raio + h, h)
+    U, V = np.meshgrid(s, s, indexing="ij")
+
+    teta = math.radians(angulo)
+    direcao = (math.sin(teta), math.cos(teta))
+    perpendicular = (math.cos(teta), -math.sin(teta))
+
+    ix = np.rint((U * perpendicular[0] + V * direcao[0]) / h + (nx - 1) / 2).astype(int)
+    iz = np.rint((U * perpendicular[1] + V * direcao[1]) / h + (nz - 1) / 2).astype(int)
+    dentro = (ix >= 0) & (ix < nx) & (iz >= 0) & (iz < nz)
+
+    u = X * perpendicular[0] + Z * perpendicular[1]
+    v = X * direcao[0] + Z * direcao[1]
+    escala = (sad + v) / sad
+
+    return {
+        "ix": np.clip(ix, 0, nx - 1), "iz": np.clip(iz, 0, nz - 1), "dentro": dentro,
+        "iu": np.clip(np.rint((u + raio) / h).astype(int), 0, len(s) - 1),
+        "iv": np.clip(np.rint((v + raio) / h).astype(int), 0, len(s) - 1),
+        "u": u, "v": v, "escala": escala, "u_iso": u / escala, "pontos_feixe": U.size
+    }
+
+def profundidade_radiologica(densidade, geometria, espacamento):
+    """Profundidade radiológica (g/cm²) de cada voxel de um bloco de fatias (b, nz, nx)"""
+    g = geometria
+    rho_feixe = np.where(g["dentro"], densidade[:, g["iz"], g["ix"]], 0.0)
+    prof_feixe = (np.cumsum(rho_feixe, axis=2) - 0.5 * rho_feixe) * espacamento
+    return prof_feixe[:, g["iu"], g["iv"]]
+
+def fluencia_por_fatias(geometria, y, espacamento, campo, penumbra, abertura=None):
+    """Função (início, fim) → fluência relativa do feixe num bloco de fatias, com divergência"""
+    h = espacamento
+    escala, u_iso = geometria["escala"], geometria["u_iso"]
+
+    if abertura is None:
+        perfil_u = perfil_fora_do_eixo(u_iso, campo[0], penumbra)
+        # Perfil em y tabelado em passo fino: evita avaliar erf voxel a voxel na grade 3D
+        passo_tab = h / 8
+        y_max = np.abs(y).max() / escala.min() + h
+        tabela_y = perfil_fora_do_eixo(np.arange(-y_max, y_max + passo_tab, passo_tab), campo[1], penumbra)
+
+        def fluencia(inicio, fim):
+            iy = np.rint((y[inicio:fim, None, None] / escala[None] + y_max) / passo_tab).astype(np.int32)
+            return perfil_u[None] * tabela_y[np.clip(iy, 0, len(tabela_y) - 1)]
+    else:
+        mapa = fluencia_abertura(abertura, h, penumbra)
+        fu = np.rint(u_iso / h + (mapa.shape[1] - 1) / 2).astype(int)
+        fu_valido = (fu >= 0) & (fu < mapa.shape[1])
+        fu = np.clip(fu, 0, mapa.shape[1] - 1)
+
+        def fluencia(inicio, fim):
+            fy = np.rint(y[inicio:fim, None, None] / escala[None] / h + (mapa.shape[0] - 1) / 2).astype(int)
+            valido = fu_valido[None] & (fy >= 0) & (fy < mapa.shape[0])
+            return np.where(valido, mapa[np.clip(fy, 0, mapa.shape[0] - 1), fu[None]], 0.0)
+
+    return fluencia
+
+def calcular_dose_3d(densidade, espacamento, angulos, energia, campo, pesos=None, penumbra=0.6,
+                     abertura=None, sad=100.0, memoria_max_mb=256):
+    """Dose 3D (ny, nz, nx) de feixes de fótons isocêntricos: PDD na profundidade radiológica ×
+    perfis fora do eixo com divergência. Processada em blocos de fatias para limitar a memória."""
+    ny, nz, nx = densidade.shape
+    y = (np.arange(ny) - (ny - 1) / 2) * espacamento
+
+    pesos = np.ones(len(angulos)) if pesos is None else np.asarray(pesos, dtype=float)
+    dose = np.zeros((ny, nz, nx), dtype=np.float32)
+
+    for angulo, peso in zip(angulos, pesos):
+        geometria = geometria_feixe(nz, nx, espacamento, float(angulo), sad)
+        fluencia = fluencia_por_fatias(geometria, y, espacamento, campo, penumbra, abertura)
+        fatias_por_bloco = max(1, int(memoria_max_mb * 2**20 // (16 * 8 * max(nz * nx, geometria["pontos_feixe"]))))
+
+        for inicio in range(0, ny, fatias_por_bloco):
+            fim = min(inicio + fatias_por_bloco, ny)
+            profundidade = profundidade_radiologica(densidade[inicio:fim], geometria, espacamento)
+            dose[inicio:fim] += (peso * pdd_fotons(profundidade, energia) * fluencia(inicio, fim)).astype(np.float32)
+
+    # Normalização: 100% no isocentro
+    centro = dose[ny // 2, nz // 2, nx // 2]
+    if centro > 0:
+        dose *= 100.0 / centro
+
+    return dose
+
+@lru_cache(maxsize=8)
+def _nucleo_radial(energia, espacamento, raio_nucleo=5.0):
+    """Partes radiais do núcleo pontual em água numa grade local (2n+1)³ (cache por energia e espaçamento)"""
+    h = espacamento
+    n = int(math.ceil(raio_nucleo / h))
+    c = np.arange(-n, n + 1) * h
+    Yk, Zk, Xk = np.meshgrid(c, c, c, indexing="ij", sparse=True)
+    r = np.maximum(np.sqrt(Xk ** 2 + Yk ** 2 + Zk ** 2), 0.5 * h)
+
+    # Primário: elétrons secundários projetados para a frente; espalhado: fótons quase isotrópicos
+    alcance_eletrons = max(0.5 * energia, h)
+    mu = parametros_pdd_fotons(float(energia))[0]
+    dentro = (r <= raio_nucleo) / r ** 2
+    return Xk / r, Zk / r, np.exp(-3 * r / alcance_eletrons) * dentro, 0.15 * np.exp(-0.5 * mu * r) * dentro
+
+def nucleo_deposicao_fft(energia, angulo, espacamento, forma_fft, raio_nucleo=5.0):
+    """Espectro parcial do núcleo pontual de deposição para um feixe no ângulo dado: índices das linhas não
+    nulas do primeiro eixo da grade estendida e FFT dessas linhas nos dois últimos eixos (a FFT no primeiro
+    eixo é feita por blocos de colunas em calcular_dose_convolucao)"""
+    direcao_x, direcao_z, primario, espalhado = _nucleo_radial(float(energia), espacamento, raio_nucleo)
+    n = primario.shape[0] // 2
+    teta = math.radians(angulo)
+    cosseno = direcao_x * math.sin(teta) + direcao_z * math.cos(teta)
+    nucleo = np.exp(4 * cosseno) * primario + (1 + cosseno ** 2) * espalhado
+    nucleo /= nucleo.sum()
+
+    # Origem do núcleo no canto da grade estendida (convolução circular)
+    indices = [np.arange(-n, n + 1) % m for m in forma_fft]
+    linhas = np.zeros((2 * n + 1, 2 * n + 1, forma_fft[2]), dtype=np.float32)
+    linhas[:, :, indices[2]] = nucleo
+    espectro = np.zeros((2 * n + 1, forma_fft[1], forma_fft[2] // 2 + 1), dtype=np.complex64)
+    espectro[:, indices[1]] = np.fft.rfft(linhas, axis=2)
+    return indices[0], np.fft.fft(espectro, axis=1)
+
+def _fft_por_blocos(espectro, eixo, eixo_blocos, passo, inversa=False):
+    """FFT (ou inversa) complexa no lugar ao longo de um eixo, em blocos de `passo` ao longo de outro eixo"""
+    transformada = np.fft.ifft if inversa else np.fft.fft
+    for inicio in range(0, espectro.shape[eixo_blocos], passo):
+        bloco = (slice(None),) * eixo_blocos + (slice(inicio, inicio + passo),)
+        espectro[bloco] = transformada(espectro[bloco], axis=eixo)
+
+def calcular_dose_convolucao(densidade, espacamento, angulos, energia, campo, pesos=None, penumbra=0.2,
+                             abertura=None, sad=100.0, raio_nucleo=5.0, threads=None, memoria_max_mb=256):
+    """Dose 3D por convolução TERMA ⊗ núcleo de deposição (pencil-beam, núcleo invariante em água).
+    A TERMA de cada feixe é montada em float32 por blocos de fatias e transformada eixo a eixo, em blocos,
+    direto no espectro (complex64) da grade estendida; os espectros são acumulados, poucos feixes de cada
+    vez, e invertidos uma única vez. Além do acumulador, cada feixe em andamento ocupa um espectro e
+    blocos limitados por memoria_max_mb."""
+    ny, nz, nx = densidade.shape
+    h = espacamento
+    y = (np.arange(ny) - (ny - 1) / 2) * h
+    mu = parametros_pdd_fotons(float(energia))[0]
+
+    borda = int(math.ceil(raio_nucleo / h))
+    forma_fft = tuple(tamanho_fft_rapido(n + borda) for n in (ny, nz, nx))
+    forma_espectro = forma_fft[:2] + (forma_fft[2] // 2 + 1,)
+    bytes_espectro = 8 * forma_espectro[0] * forma_espectro[1] * forma_espectro[2]
+    pesos = np.ones(len(angulos)) if pesos is None else np.asarray(pesos, dtype=float)
+
+    # Blocos temporários: um oitavo do orçamento (cópias complexas de 16 bytes por ponto no pior caso)
+    bytes_bloco = memoria_max_mb * 2**20 // 8
+    passo_linhas = max(1, int(bytes_bloco // (16 * forma_espectro[1] * forma_espectro[2])))
+    passo_colunas = max(1, int(bytes_bloco // (16 * forma_espectro[0] * forma_espectro[1])))
+
+    def espectro_feixe(angulo_peso):
+        angulo, peso = angulo_peso
+        geometria = geometria_feixe(nz, nx, h, float(angulo), sad)
+        fluencia = fluencia_por_fatias(geometria, y, h, campo, penumbra, abertura)
+        inverso_quadrado = ((sad / (sad + geometria["v"])) ** 2).astype(np.float32)
+        fatias_por_bloco = min(passo_linhas, max(1, int(memoria_max_mb * 2**20 //
+                                                        (16 * 8 * max(nz * nx, geometria["pontos_feixe"])))))
+
+        # TERMA por volume: fluência × μ × ρ × atenuação primária × inverso do quadrado; FFT no último eixo
+        espectro = np.zeros(forma_espectro, dtype=np.complex64)
+        for inicio in range(0, ny, fatias_por_bloco):
+            fim = min(inicio + fatias_por_bloco, ny)
+            profundidade = profundidade_radiologica(densidade[inicio:fim], geometria, h)
+            terma = ((peso * mu) * fluencia(inicio, fim) * densidade[inicio:fim] * np.exp(-mu * profundidade) *
+                     inverso_quadrado).astype(np.float32)
+            espectro[inicio:fim, :nz] = np.fft.rfft(terma, n=forma_fft[2], axis=2)
+
+        # Só as primeiras ny linhas são não nulas antes da FFT no primeiro eixo
+        _fft_por_blocos(espectro[:ny], 1, 0, passo_linhas)
+
+        # FFT no primeiro eixo e produto pelo núcleo, por blocos de colunas
+        linhas_nucleo, espectro_nucleo = nucleo_deposicao_fft(float(energia), float(angulo), h, forma_fft,
+                                                              raio_nucleo)
+        for inicio in range(0, forma_espectro[2], passo_colunas):
+            colunas = slice(inicio, inicio + passo_colunas)
+            nucleo = np.zeros((forma_espectro[0], forma_espectro[1], espectro[:, :, colunas].shape[2]),
+                              dtype=np.complex64)
+            nucleo[linhas_nucleo] = espectro_nucleo[:, :, colunas]
+            espectro[:, :, colunas] = np.fft.fft(espectro[:, :, colunas], axis=0) * np.fft.fft(nucleo, axis=0)
+        return espectro
+
+    simultaneos = max(1, min(threads or os.cpu_count(), int(memoria_max_mb * 2**20 // (bytes_espectro + bytes_bloco))))
+    feixes = list(zip(angulos, pesos))
+    espectro = None
+
+    def acumular(parciais):
+        nonlocal espectro
+        for parcial in parciais:
+            if espectro is None:
+                espectro = parcial
+            else:
+                espectro += parcial
+
+    if simultaneos == 1:
+        acumular(map(espectro_feixe, feixes))
+    else:
+        # numpy.fft libera o GIL: feixes do lote transformados em paralelo
+        with ThreadPoolExecutor(max_workers=simultaneos) as executor:
+            for inicio in range(0, len(feixes), simultaneos):
+                acumular(executor.map(espectro_feixe, feixes[inicio:inicio + simultaneos]))
+
+    # Inversa eixo a eixo; só a região (ny, nz, nx) da grade estendida é reconstruída
+    _fft_por_blocos(espectro, 0, 2, passo_colunas, inversa=True)
+    dose = np.empty((ny, nz, nx), dtype=np.float32)
+    for inicio in range(0, ny, passo_linhas):
+        bloco = np.fft.ifft(espectro[inicio:min(inicio + passo_linhas, ny)], axis=1)[:, :nz]
+        dose[inicio:inicio + len(bloco)] = np.fft.irfft(bloco, n=forma_fft[2], axis=2)[:, :, :nx]
+
+    centro = dose[ny // 2, nz // 2, nx // 2]
+    if centro > 0:
+        dose *= 100.0 / centro
+
+    return dose
+
+@lru_cache(maxsize=32)
+def _eixo_central_convolucao(energia, profundidade_max, campo, espacamento):
+    n_lateral = int(math.ceil((campo + 8) / espacamento))
+    n_prof = int(math.ceil((profundidade_max + 2) / espacamento))
+    agua = np.ones((n_lateral, n_prof, n_lateral), dtype=np.float32)
+
+    dose = calcular_dose_convolucao(agua, espacamento, [0.0], energia, (campo, campo), threads=1)
+    eixo = dose[n_lateral // 2, :, n_lateral // 2]
+    return (np.arange(n_prof) + 0.5) * espacamento, eixo / eixo.max()
+
+def curva_pdd_convolucao(profundidades, energia, campo=10.0, espacamento=0.25):
+    """PDD no eixo central (máximo = 1) calculada pelo motor de convolução em fantoma de água"""
+    profundidades = np.asarray(profundidades, dtype=float)
+    z, eixo = _eixo_central_convolucao(float(energia), float(profundidades.max()), float(campo), espacamento)
+    return np.interp(profundidades, z, eixo)
+
+def curvas_isodose(dose_2d, x, z, niveis):
+    """Contornos de isodose {nível: [array (N, 2) de pontos (x, z)]} de um corte 2D"""
+    fig, ax = plt.subplots()
+    contornos = ax.contour(x, z, dose_2d, levels=sorted(niveis))
+    curvas = {nivel: [seg for seg in segmentos if len(seg) > 1]
+              for nivel, segmentos in zip(contornos.levels, contornos.allsegs)}
+    plt.close(fig)
+    return curvas
+
+# Parâmetros do modelo de Bortfeld (1997) para prótons em água: R0 = α·E0^p
+BORTFELD_AGUA = {"alpha": 0.0022, "p": 1.77, "beta": 0.012, "gamma": 0.6}
+ENERGIA_MINIMA_BORTFELD = 10.0  # MeV: abaixo disso o ajuste alcance-energia deixa de valer
+
+def alcance_protons(energia):
+    """Alcance (cm) de prótons em água pela relação alcance-energia R0 = α·E0^p"""
+    return BORTFELD_AGUA["alpha"] * np.asarray(energia, dtype=float) ** BORTFELD_AGUA["p"]
+
+def energia_protons(alcance):
+    """Energia inicial (MeV) correspondente a um alcance em água (cm)"""
+    return (np.asarray(alcance, dtype=float) / BORTFELD_AGUA["alpha"]) ** (1 / BORTFELD_AGUA["p"])
+
+@lru_cache(maxsize=4)
+def _nos_gauss_legendre(n):
+    return np.polynomial.legendre.leggauss(n)
+
+def _cilindro_parabolico_amortecido(zeta, nu, n_nos=64):
+    """e^(−ζ²/4)·D_ν(−ζ) para ν < 0, pela representação integral
+    (1/Γ(−ν)) ∫₀^∞ t^(−ν−1) e^(−(t−ζ)²/2) dt, sem overflow para ζ grande"""
+    k = -nu
+    nos, pesos = _nos_gauss_legendre(n_nos)
+    zeta = np.asarray(zeta, dtype=float)[..., None]
+
+    # Intervalo efetivo do integrando (gaussiana centrada em ζ)
+    a = np.maximum(zeta - 8.0, 0.0)
+    b = np.maximum(zeta + 8.0, 1e-12)
+
+    # Perto da origem: t = u^(1/k) remove a singularidade de t^(k−1)
+    u_max = b ** k
+    u = 0.5 * u_max * (nos + 1)
+    t = u ** (1 / k)
+    perto = 0.5 * u_max[..., 0] * np.sum(pesos * np.exp(-0.5 * (t - zeta) ** 2), axis=-1) / k
+
+    # Longe da origem: quadratura direta em [a, b]
+    t = 0.5 * (b - a) * nos + 0.5 * (b + a)
+    longe = 0.5 * (b - a)[..., 0] * np.sum(pesos * t ** (k - 1) * np.exp(-0.5 * (t - zeta) ** 2), axis=-1)
+
+    return np.where(a[..., 0] > 0, longe, perto) / math.gamma(k)
+
+def sigma_straggling(alcance, espalhamento_energia=0.01):
+    """Desvio padrão (cm) do alcance: straggling em água + espalhamento de energia do feixe"""
+    alfa, p = BORTFELD_AGUA["alpha"], BORTFELD_AGUA["p"]
+    alcance = np.asarray(alcance, dtype=float)
+    sigma_mono = 0.012 * alcance ** 0.935
+    energia = energia_protons(alcance)
+    sigma_energia = espalhamento_energia * energia * alfa * p * energia ** (p - 1)
+    return np.sqrt(sigma_mono ** 2 + sigma_energia ** 2)
+
+def curva_bragg(profundidades, alcance, espalhamento_energia=0.01):
+    """Dose por fluência unitária (Bortfeld, com straggling gaussiano). Profundidades e alcances
+    são combinados por broadcasting; use profundidades[:, None] e alcances[None, :] para uma matriz."""
+    alfa, p, beta, gama = (BORTFELD_AGUA[c] for c in ("alpha", "p", "beta", "gamma"))
+    z = np.asarray(profundidades, dtype=float)
+    alcance = np.asarray(alcance, dtype=float)
+    sigma = sigma_straggling(alcance, espalhamento_energia)
+    zeta = (alcance - z) / sigma
+
+    fator = sigma ** (1 / p) * math.gamma(1 / p) / (math.sqrt(2 * math.pi) * p * alfa ** (1 / p) * (1 + beta * alcance))
+    return fator * (_cilindro_parabolico_amortecido(zeta, -1 / p) / sigma +
+                    (beta / p + gama * beta) * _cilindro_parabolico_amortecido(zeta, -1 / p - 1))
+
+def nnls(A, b, max_iter=None, tolerancia=1e-10):
+    """Mínimos quadrados não negativos (Lawson–Hanson): min ||A·x − b||, x ≥ 0"""
+    m, n = A.shape
+    x = np.zeros(n)
+    ativo = np.zeros(n, dtype=bool)
+    gradiente = A.T @ (b - A @ x)
+    max_iter = max_iter or 3 * n
+
+    for _ in range(max_iter):
+        if ativo.all() or gradiente[~ativo].max(initial=0.0) <= tolerancia:
+            break
+        candidatos = np.where(~ativo, gradiente, -np.inf)
+        ativo[np.argmax(candidatos)] = True
+
+        while True:
+            s = np.zeros(n)
+            s[ativo] = np.linalg.lstsq(A[:, ativo], b, rcond=None)[0]
+            if s[ativo].min() > 0:
+                break
+            # Recua até a fronteira e remove variáveis que zeraram
+            negativos = ativo & (s <= 0)
+            passo = np.min(x[negativos] / (x[negativos] - s[negativos]))
+            x = x + passo * (s - x)
+            ativo &= x > tolerancia
+        x = s
+        gradiente = A.T @ (b - A @ x)
+
+    return x
+
+@lru_cache(maxsize=128)
+def pesos_sobp(alcance_distal, modulacao, espalhamento_energia=0.01):
+    """Alcances e pesos dos picos de Bragg que formam um SOBP plano (cache por alcance e modulação)"""
+    sigma = float(sigma_straggling(alcance_distal, espalhamento_energia))
+    # O pico mais estreito (proximal) define o espaçamento: picos mais afastados que ~2σ ondulam o platô
+    sigma_min = float(sigma_straggling(alcance_distal - modulacao, espalhamento_energia))
+    passo = max(2 * sigma_min, 0.05)
+    n_picos = max(2, int(math.ceil(modulacao / passo)) + 1)
+    alcances = np.linspace(alcance_distal - modulacao, alcance_distal, n_picos)
+
+    plato = np.linspace(alcance_distal - modulacao, alcance_distal - 0.5 * sigma, max(200, 4 * n_picos))
+    A = curva_bragg(plato[:, None], alcances[None, :], espalhamento_energia)
+    escala = A.max()
+    pesos = nnls(A / escala, np.ones(len(plato))) / escala
+    return alcances, pesos
+
+@lru_cache(maxsize=32)
+def _picos_puros(profundidades, alcance_distal, modulacao, espalhamento_energia):
+    """Picos de Bragg não ponderados do SOBP (profundidade × pico), em cache pela grade e pelos parâmetros"""
+    alcances, _ = pesos_sobp(alcance_distal, modulacao, espalhamento_energia)
+    picos = curva_bragg(np.array(profundidades)[:, None], alcances[None, :], espalhamento_energia)
+    picos.flags.writeable = False
+    return picos
+
+def construir_sobp(profundidades, alcance_distal, modulacao, espalhamento_energia=0.01):
+    """Dose do SOBP (plateau = 1) e matriz dos picos ponderados (profundidade × pico)"""
+    chave = (round(float(alcance_distal), 3), round(float(modulacao), 3), round(float(espalhamento_energia), 4))
+    alcances, pesos = pesos_sobp(*chave)
+    picos = _picos_puros(tuple(np.asarray(profundidades, dtype=float).tolist()), *chave) * pesos[None, :]
+    return picos.sum(axis=1), picos, alcances, pesos
+
+def parametros_eletrons(energia):
+    """Alcances calibrados (cm) de um feixe de elétrons em água pela energia média na superfície (MeV)"""
+    energia = np.asarray(energia, dtype=float)
+    r50 = energia / 2.33                                   # E0 = 2.33·R50 (TRS-398)
+    rp = np.maximum(0.52 * energia - 0.3, 1.1 * r50)
+    dmax = np.minimum(0.46 * energia ** 0.67, 0.8 * r50)
+    dose_superficie = np.clip(0.70 + 0.01 * energia, 0.70, 0.95)
+    bremsstrahlung = 0.0018 * energia
+    return {"r50": r50, "rp": rp, "dmax": dmax, "dose_superficie": dose_superficie, "bremsstrahlung": bremsstrahlung}
+
+def pdd_eletrons(profundidades, energia):
+    """PDD relativa (máximo = 1) de elétrons: build-up até dmax e queda distal com a tangente
+    em R50 cruzando a cauda de bremsstrahlung em Rp. Energias em broadcast com as profundidades."""
+    p = parametros_eletrons(energia)
+    d = np.asarray(profundidades, dtype=float)
+    fundo = p["bremsstrahlung"]
+
+    # Largura da queda tal que a tangente em R50 (declive (1−B)/(s√2π)) atinja B em Rp
+    s = (p["rp"] - p["r50"]) * (1 - fundo) / ((0.5 - fundo) * math.sqrt(2 * math.pi))
+    queda = fundo + (1 - fundo) * 0.5 * (1 - erf_vetorizado((d - p["r50"]) / (s * math.sqrt(2))))
+    build_up = 1 - (1 - p["dose_superficie"]) * np.exp(-3 * d / p["dmax"])
+    curva = queda * build_up
+
+    # Normalização analítica ao máximo, avaliado numa grade fina até R50
+    grade = np.linspace(0, 1, 256).reshape((-1,) + (1,) * np.ndim(p["r50"])) * p["r50"]
+    maximo = (fundo + (1 - fundo) * 0.5 * (1 - erf_vetorizado((grade - p["r50"]) / (s * math.sqrt(2))))) * \
+             (1 - (1 - p["dose_superficie"]) * np.exp(-3 * grade / p["dmax"]))
+    return curva / maximo.max(axis=0)
+
+def indices_dosimetricos(profundidades, doses, niveis=(80, 50, 20)):
+    """Dmax, R80/R50/R20 (cruzamentos interpolados na queda distal), Rp e energias de elétrons
+    para um lote de curvas (n_curvas, n_pontos); curvas sem cruzamento retornam NaN"""
+    doses = np.atleast_2d(np.asarray(doses, dtype=float))
+    z = np.broadcast_to(np.asarray(profundidades, dtype=float), doses.shape)
+    linhas = np.arange(doses.shape[0])
+
+    doses = 100 * doses / doses.max(axis=1, keepdims=True)
+    i_max = np.argmax(doses, axis=1)
+    distal = np.arange(doses.shape[1])[None, :] > i_max[:, None]
+
+    resultado = {"dmax": z[linhas, i_max]}
+    gradiente = np.gradient(doses, axis=1) / np.gradient(z, axis=1)
+
+    for nivel in niveis:
+        abaixo = distal & (doses <= nivel)
+        existe = abaixo.any(axis=1)
+        i = np.argmax(abaixo, axis=1)
+        i0 = np.maximum(i - 1, 0)
+        d0, d1 = doses[linhas, i0], doses[linhas, i]
+        z0, z1 = z[linhas, i0], z[linhas, i]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cruzamento = np.where(d1 != d0, z0 + (nivel - d0) * (z1 - z0) / (d1 - d0), z1)
+        resultado[f"R{nivel}"] = np.where(existe, cruzamento, np.nan)
+
+        if nivel == 50:
+            declive = np.where(existe, gradiente[linhas, i0] + (gradiente[linhas, i] - gradiente[linhas, i0]) *
+                               np.clip((cruzamento - z0) / np.where(z1 != z0, z1 - z0, 1), 0, 1), np.nan)
+
+    # Alcance prático: tangente em R50 até o fundo de bremsstrahlung (dose no ponto mais profundo)
+    if "R50" in resultado:
+        fundo = doses[:, -1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rp = resultado["R50"] + (50 - fundo) / -declive
+        resultado["Rp"] = np.where(declive < 0, rp, np.nan)
+        resultado["E0 (MeV)"] = 2.33 * resultado["R50"]
+        resultado["Ep0 (MeV)"] = 0.22 + 1.98 * resultado["Rp"] + 0.0025 * resultado["Rp"] ** 2
+
+    return resultado
+
 def modulo_distribuicao_dose():
     st.header("📊 Distribuição de Dose em Tecidos")
     
@@ -983,7 +1959,8 @@ def modulo_distribuicao_dose():
                               index=0)
         
         energia = st.slider("Energia (MeV)", 
-                          min_value=0.1, max_value=20.0, value=6.0, step=0.1)
+                          min_value=0.1, max_value=250.0 if tipo_rad == "Prótons" else 20.0,
+                          value=150.0 if tipo_rad == "Prótons" else 6.0, step=0.1)
         
         st.markdown("**🧪 Parâmetros do Tecido:**")
         densidade = st.number_input("Densidade (g/cm³)", 
@@ -1015,18 +1992,19 @@ def modulo_distribuicao_dose():
                 # Pico de dose a alguns cm de profundidade
                 build_up = 2.0  # cm
                 doses = 100 * (profundidades/build_up) * np.exp(1 - profundidades/build_up)
-            else:  # PDD (Percent Depth Dose)
-                doses = 100 * np.exp(-0.08 * profundidades) * (1 + 0.5 * np.exp(-0.3 * (profundidades - 2)**2))
+            else:  # PDD (Percent Depth Dose) pelo motor de convolução pencil-beam
+                doses = 100 * curva_pdd_convolucao(profundidades, energia)
                 
         elif tipo_rad == "Elétrons":
-            # Elétrons: pico mais superficial
-            r_max = 0.5 * energia  # range máximo em cm
-            doses = 100 * (profundidades/r_max) * np.exp(1 - profundidades/r_max)
+            # Elétrons: modelo de PDD calibrado pela energia (R50, Rp, dose de superfície)
+            doses = 100 * pdd_eletrons(profundidades, energia)
             
         elif tipo_rad == "Prótons":
-            # Prótons: pico de Bragg
-            r_max = 1.0 * energia  # range em cm
-            doses = 100 * np.exp(-0.05 * (profundidades - r_max)**2)
+            # Prótons: pico de Bragg (modelo de Bortfeld com straggling), alcance limitado à validade do ajuste
+            if energia < ENERGIA_MINIMA_BORTFELD:
+                st.caption(f"Abaixo de {ENERGIA_MINIMA_BORTFELD:.0f} MeV o modelo de Bortfeld não se aplica; "
+                           f"curva exibida com o alcance de {ENERGIA_MINIMA_BORTFELD:.0f} MeV.")
+            doses = curva_bragg(profundidades, alcance_protons(max(energia, ENERGIA_MINIMA_BORTFELD)))
             
         else:  # Nêutrons
             # Nêutrons: decaimento exponencial
@@ -1070,19 +2048,10 @@ def modulo_distribuicao_dose():
         # Parâmetros importantes
         st.markdown("### 📋 Parâmetros Importantes")
         
-        # Encontrar R50 (profundidade onde dose = 50%)
-        idx_50 = np.where(doses <= 50)[0]
-        if len(idx_50) > 0:
-            r50 = profundidades[idx_50[0]]
-        else:
-            r50 = max_profundidade
-            
-        # Encontrar R80 e R20
-        idx_80 = np.where(doses <= 80)[0]
-        r80 = profundidades[idx_80[0]] if len(idx_80) > 0 else max_profundidade
-        
-        idx_20 = np.where(doses <= 20)[0]
-        r20 = profundidades[idx_20[0]] if len(idx_20) > 0 else max_profundidade
+        # R80, R50 e R20 interpolados na queda distal (após Dmax)
+        indices = indices_dosimetricos(profundidades, doses)
+        r80, r50, r20 = (float(indices[f"R{n}"][0]) for n in (80, 50, 20))
+        r80, r50, r20 = (max_profundidade if np.isnan(r) else r for r in (r80, r50, r20))
         
         col_params1, col_params2 = st.columns(2)
         
@@ -1096,6 +2065,20 @@ def modulo_distribuicao_dose():
             st.markdown(f"**🎯 Razão R50/R80:** {r50/r80:.2f}")
             st.markdown(f"**📈 Penetração:** {r20:.1f} cm")
         
+        if tipo_rad == "Elétrons":
+            st.markdown(f"**⚡ Rp:** {float(indices['Rp'][0]):.2f} cm &nbsp;|&nbsp; "
+                        f"**E₀ = 2,33·R50:** {float(indices['E0 (MeV)'][0]):.1f} MeV &nbsp;|&nbsp; "
+                        f"**Ep,0:** {float(indices['Ep0 (MeV)'][0]):.1f} MeV")
+
+            # Índices de uma família de energias calculados num único passo vetorizado
+            energias_familia = np.array([4, 6, 9, 12, 16, 20], dtype=float)
+            z_familia = np.linspace(0, 15, 1501)
+            familia = pdd_eletrons(z_familia[None, :], energias_familia[:, None])
+            st.markdown("**📋 Índices dosimétricos por energia nominal:**")
+            st.dataframe(pd.DataFrame({"Energia (MeV)": energias_familia,
+                                       **indices_dosimetricos(z_familia, familia)}).round(2),
+                         use_container_width=True)
+        
         # Tabela de dados
         df_dose = pd.DataFrame({
             "Profundidade (cm)": profundidades,
@@ -1133,10 +2116,740 @@ def modulo_distribuicao_dose():
         
         st.info(info_text)
 
+    # Índices dosimétricos de PDDs medidas (lote)
+    with st.expander("📂 Índices dosimétricos de PDDs medidas (CSV)"):
+        st.markdown("Primeira coluna: profundidade (cm); demais colunas: uma curva de dose por coluna.")
+        arquivo_pdd = st.file_uploader("Arquivo CSV de PDDs", type=["csv"])
+        if arquivo_pdd is not None:
+            tabela_pdd = pd.read_csv(arquivo_pdd)
+            curvas_medidas = tabela_pdd.iloc[:, 1:].to_numpy(dtype=float).T
+            resultado_lote = indices_dosimetricos(tabela_pdd.iloc[:, 0].to_numpy(dtype=float), curvas_medidas)
+            st.dataframe(pd.DataFrame({"Curva": tabela_pdd.columns[1:], **resultado_lote}).round(3),
+                         use_container_width=True)
+
+    # Distribuição 2D/3D com múltiplos feixes
+    st.markdown("---")
+    st.markdown("### 🧊 Distribuição de Dose 2D/3D (Múltiplos Feixes)")
+
+    col_3d1, col_3d2, col_3d3 = st.columns(3)
+
+    with col_3d1:
+        n_grade = st.selectbox("Grade (voxels por eixo)", [64, 96, 128, 192, 256], index=2)
+        tamanho_fantoma = st.slider("Tamanho do fantoma (cm)", 10.0, 50.0, 30.0, 1.0)
+        heterogeneidade = st.selectbox("Heterogeneidade", ["Nenhuma", "Pulmão", "Osso"])
+
+    with col_3d2:
+        angulos_txt = st.text_input("Ângulos de gantry (graus)", "0, 120, 240")
+        energia_mv = st.selectbox("Energia do feixe (MV)", [1.25, 6, 10, 15, 18], index=1)
+        abertura_tipo = st.selectbox("Abertura", ["Retangular", "Circular (MLC)"])
+        modelo_3d = st.selectbox("Modelo de cálculo", ["PDD × perfil (separável)", "Convolução pencil-beam (FFT)"])
+
+    with col_3d3:
+        campo_x = st.slider("Campo X (cm)", 1.0, 30.0, 10.0, 0.5)
+        campo_y = st.slider("Campo Y (cm)", 1.0, 30.0, 10.0, 0.5)
+        penumbra = st.slider("Penumbra 80–20% (cm)", 0.2, 1.5, 0.6, 0.1)
+
+    if st.button("🧊 Calcular Dose 3D", use_container_width=True):
+        try:
+            angulos = [float(a) for a in angulos_txt.replace(";", ",").split(",") if a.strip()]
+        except ValueError:
+            st.error("Informe os ângulos como números separados por vírgula.")
+            return
+
+        espacamento = tamanho_fantoma / n_grade
+        densidade_3d = fantoma_densidade(n_grade, espacamento, heterogeneidade)
+
+        abertura = None
+        if abertura_tipo == "Circular (MLC)":
+            c = (np.arange(n_grade) - (n_grade - 1) / 2) * espacamento
+            abertura = ((c[None, :] / (0.5 * campo_x)) ** 2 + (c[:, None] / (0.5 * campo_y)) ** 2) <= 1
+
+        inicio_calc = time.perf_counter()
+        if modelo_3d == "Convolução pencil-beam (FFT)":
+            dose_3d = calcular_dose_convolucao(densidade_3d, espacamento, angulos, energia_mv, (campo_x, campo_y),
+                                               penumbra=penumbra, abertura=abertura)
+        else:
+            dose_3d = calcular_dose_3d(densidade_3d, espacamento, angulos, energia_mv, (campo_x, campo_y),
+                                       penumbra=penumbra, abertura=abertura)
+        tempo_calc = time.perf_counter() - inicio_calc
+
+        st.markdown(f"**Grade {n_grade}³** ({dose_3d.size:,} voxels, {len(angulos)} feixes) calculada em {tempo_calc:.2f} s")
+
+        eixo = (np.arange(n_grade) - (n_grade - 1) / 2) * espacamento
+        corte_axial = dose_3d[n_grade // 2]
+        corte_sagital = dose_3d[:, :, n_grade // 2]
+        niveis = [20, 50, 80, 95, 105]
+
+        fig_3d, (ax_ax, ax_sag) = plt.subplots(1, 2, figsize=(14, 6))
+
+        for ax_corte, corte, titulo, rotulo in ((ax_ax, corte_axial, "Corte axial", "x (cm)"),
+                                                (ax_sag, corte_sagital.T, "Corte sagital", "y (cm)")):
+            ax_corte.imshow(corte, extent=[eixo[0], eixo[-1], eixo[-1], eixo[0]], cmap='jet', vmin=0, vmax=110)
+            for nivel, segmentos in curvas_isodose(corte, eixo, eixo, niveis).items():
+                for seg in segmentos:
+                    ax_corte.plot(seg[:, 0], seg[:, 1], 'w-', linewidth=1)
+                if segmentos:
+                    ax_corte.annotate(f"{nivel:.0f}%", segmentos[0][0], color='white', fontsize=8)
+            ax_corte.set_title(f"{titulo} – isodoses {', '.join(str(n) for n in niveis)}%")
+            ax_corte.set_xlabel(rotulo)
+            ax_corte.set_ylabel("z (cm)")
+
+        plt.tight_layout()
+        st.pyplot(fig_3d)
+
+        col_dvh1, col_dvh2, col_dvh3 = st.columns(3)
+        with col_dvh1:
+            st.metric("Dose máxima", f"{dose_3d.max():.1f}%")
+        with col_dvh2:
+            st.metric("Volume ≥ 95%", f"{np.count_nonzero(dose_3d >= 95) * espacamento**3:.1f} cm³")
+        with col_dvh3:
+            st.metric("Volume ≥ 50%", f"{np.count_nonzero(dose_3d >= 50) * espacamento**3:.1f} cm³")
+
+    # Prótons: pico de Bragg espalhado (SOBP)
+    st.markdown("---")
+    st.markdown("### 🎯 Prótons: Pico de Bragg Espalhado (SOBP)")
+
+    col_sobp1, col_sobp2, col_sobp3 = st.columns(3)
+
+    with col_sobp1:
+        alcance_distal = st.slider("Alcance distal (cm)", 2.0, 30.0, 15.0, 0.1)
+    with col_sobp2:
+        modulacao = st.slider("Modulação (cm)", 0.5, 15.0, 5.0, 0.1)
+    with col_sobp3:
+        espalhamento = st.slider("Espalhamento de energia (%)", 0.0, 3.0, 1.0, 0.1)
+
+    modulacao = min(modulacao, alcance_distal - 0.5)
+    profundidades_sobp = np.linspace(0, alcance_distal + 3, 600)
+
+    inicio_sobp = time.perf_counter()
+    sobp, picos, alcances_picos, pesos_picos = construir_sobp(profundidades_sobp, alcance_distal, modulacao,
+                                                              espalhamento / 100)
+    tempo_sobp = time.perf_counter() - inicio_sobp
+
+    normalizacao = sobp[(profundidades_sobp >= alcance_distal - modulacao) & (profundidades_sobp <= alcance_distal)].mean()
+
+    fig_sobp, ax_sobp = plt.subplots(figsize=(12, 6))
+    ax_sobp.plot(profundidades_sobp, 100 * picos / normalizacao, color='gray', alpha=0.5, linewidth=1)
+    ax_sobp.plot(profundidades_sobp, 100 * sobp / normalizacao, 'r-', linewidth=3, label='SOBP')
+    ax_sobp.axvspan(alcance_distal - modulacao, alcance_distal, color='green', alpha=0.1, label='Região modulada')
+    ax_sobp.set_xlabel("Profundidade (cm)")
+    ax_sobp.set_ylabel("Dose Relativa (%)")
+    ax_sobp.set_title(f"SOBP com {len(alcances_picos)} picos de Bragg "
+                      f"({energia_protons(alcances_picos[0]):.0f}–{energia_protons(alcances_picos[-1]):.0f} MeV)")
+    ax_sobp.legend()
+    ax_sobp.grid(True)
+
+    st.pyplot(fig_sobp)
+
+    # Platô recuado pela queda distal 80–20%, que se alarga com o espalhamento de energia
+    indices_sobp = indices_dosimetricos(profundidades_sobp, sobp)
+    queda_distal = float(indices_sobp["R20"][0] - indices_sobp["R80"][0])
+    plato = sobp[(profundidades_sobp >= alcance_distal - modulacao + 0.2) &
+                 (profundidades_sobp <= alcance_distal - 0.2 - queda_distal)]
+    st.markdown(f"- **Homogeneidade no platô:** ±{50 * (plato.max() - plato.min()) / normalizacao:.1f}% "
+                f"(queda distal 80–20%: {10 * queda_distal:.1f} mm)")
+    st.markdown(f"- **Dose de entrada:** {100 * sobp[0] / normalizacao:.1f}% da dose do platô")
+    st.markdown(f"- **Tempo de cálculo:** {tempo_sobp * 1000:.1f} ms (pesos e picos em cache por alcance e modulação)")
+
 # =============================================================================
 # MÓDULO 5: APLICAÇÕES CLÍNICAS
 # =============================================================================
 
+# Restrições padrão dos órgãos de risco: fração da dose prescrita recebida e BED máxima (Gy)
+RESTRICOES_OAR_PADRAO = {
+    "Medula espinhal": {"fracao_dose": 0.8, "bed_max": 100.0},
+    "Reto": {"fracao_dose": 0.9, "bed_max": 125.0},
+    "Pulmão (pneumonite)": {"fracao_dose": 0.4, "bed_max": 35.0},
+    "Cérebro": {"fracao_dose": 0.7, "bed_max": 120.0},
+    "Mucosa (reação aguda)": {"fracao_dose": 0.9, "bed_max": 65.0}
+}
+
+def fronteira_pareto(objetivos, tamanho_bloco=1024):
+    """Máscara dos pontos não dominados (todos os objetivos são maximizados)"""
+    objetivos = np.asarray(objetivos, dtype=float)
+    # Ordem lexicográfica decrescente: um ponto nunca é dominado por um posterior
+    ordem = np.lexsort(objetivos.T[::-1])[::-1]
+    ordenados = objetivos[ordem]
+
+    frente = np.empty((0, objetivos.shape[1]))
+    nao_dominado = np.zeros(len(objetivos), dtype=bool)
+
+    for inicio in range(0, len(ordenados), tamanho_bloco):
+        bloco = ordenados[inicio:inicio + tamanho_bloco]
+        referencia = np.vstack([frente, bloco])
+        maior_igual = np.all(referencia[:, None, :] >= bloco[None, :, :], axis=2)
+        maior = np.any(referencia[:, None, :] > bloco[None, :, :], axis=2)
+        dominado = np.any(maior_igual & maior, axis=0)
+
+        nao_dominado[ordem[inicio:inicio + len(bloco)]] = ~dominado
+        frente = np.vstack([frente, bloco[~dominado]])
+
+    return nao_dominado
+
+def otimizar_fracionamento(tumor, restricoes, fracoes=np.arange(1, 41), doses_fracao=np.arange(1.0, 10.01, 0.05),
+                           sessoes_semana=(3, 4, 5), bed_tumor_min=0.0, tamanho_lote=16384):
+    """Busca vetorizada (nº de frações × dose/fração × sessões/semana) que maximiza a BED tumoral
+    respeitando os limites de BED dos órgãos de risco; retorna a fronteira de Pareto"""
+    inicio = time.perf_counter()
+    fracoes = np.asarray(fracoes, dtype=float)
+    doses_fracao = np.asarray(doses_fracao, dtype=float)
+    sessoes_semana = np.asarray(sessoes_semana, dtype=float)
+    formato = (len(fracoes), len(doses_fracao), len(sessoes_semana))
+    total = int(np.prod(formato))
+
+    # Restrições mais seletivas primeiro para podar o lote o quanto antes
+    restricoes = sorted(restricoes.items(), key=lambda item: item[1]["bed_max"] / item[1]["fracao_dose"])
+    aceitos = []
+    podados = 0
+
+    for inicio_lote in range(0, total, tamanho_lote):
+        indices = np.arange(inicio_lote, min(inicio_lote + tamanho_lote, total))
+        i_n, i_d, i_s = np.unravel_index(indices, formato)
+        n, d, s = fracoes[i_n], doses_fracao[i_d], sessoes_semana[i_s]
+        tempo = duracao_tratamento_dias(n, s)
+        uso_oar = np.zeros(len(indices))
+        beds_oar = {}
+
+        for nome, restricao in restricoes:
+            oar = TECIDOS_LQ[nome]
+            bed = calcular_bed_lq(n, restricao["fracao_dose"] * d, oar["alpha_beta"], tempo,
+                                  oar["alpha"], oar["t_k"], oar["t_pot"])
+            viavel = bed <= restricao["bed_max"]
+            podados += int(np.count_nonzero(~viavel))
+
+            n, d, s, tempo, indices = n[viavel], d[viavel], s[viavel], tempo[viavel], indices[viavel]
+            uso_oar = np.maximum(uso_oar[viavel], bed[viavel] / restricao["bed_max"])
+            beds_oar = {k: v[viavel] for k, v in beds_oar.items()}
+            beds_oar[nome] = bed[viavel]
+            if len(indices) == 0:
+                break
+
+        if len(indices) == 0:
+            continue
+
+        bed_tumor = calcular_bed_lq(n, d, tumor["alpha_beta"], tempo, tumor["alpha"], tumor["t_k"], tumor["t_pot"])
+        viavel = bed_tumor >= bed_tumor_min
+        podados += int(np.count_nonzero(~viavel))
+
+        lote = {
+            "Frações": n[viavel].astype(int),
+            "Dose/fração (Gy)": d[viavel],
+            "Sessões/semana": s[viavel].astype(int),
+            "Tempo total (dias)": tempo[viavel],
+            "BED tumor (Gy)": bed_tumor[viavel],
+            "Uso máximo OAR (%)": 100 * uso_oar[viavel]
+        }
+        for nome, bed in beds_oar.items():
+            lote[f"BED {nome} (Gy)"] = bed[viavel]
+        aceitos.append(pd.DataFrame(lote))
+
+    viaveis = pd.concat(aceitos, ignore_index=True) if aceitos else pd.DataFrame()
+
+    if len(viaveis) > 0:
+        objetivos = np.column_stack([viaveis["BED tumor (Gy)"], -viaveis["Tempo total (dias)"],
+                                     -viaveis["Uso máximo OAR (%)"]])
+        pareto = viaveis[fronteira_pareto(objetivos)].sort_values("BED tumor (Gy)", ascending=False)
+        pareto = pareto.reset_index(drop=True)
+    else:
+        pareto = viaveis
+
+    duracao = time.perf_counter() - inicio
+    estatisticas = {
+        "avaliados": total,
+        "podados": podados,
+        "viaveis": len(viaveis),
+        "pareto": len(pareto),
+        "tempo_s": duracao,
+        "taxa": total / duracao if duracao > 0 else float("inf")
+    }
+
+    return pareto, estatisticas
+
+def _histograma_estrutura(dose, mascara, largura_bin, n_bins, tamanho_bloco):
+    """Histograma de dose de uma estrutura percorrendo os voxels em blocos (compatível com np.memmap)"""
+    dose_plana = dose.reshape(-1)
+    mascara_plana = mascara.reshape(-1)
+    contagem = np.zeros(n_bins, dtype=np.int64)
+    soma, d_min, d_max = 0.0, np.inf, -np.inf
+
+    for inicio in range(0, dose_plana.size, tamanho_bloco):
+        selecao = np.asarray(mascara_plana[inicio:inicio + tamanho_bloco], dtype=bool)
+        if not selecao.any():
+            continue
+        d = np.asarray(dose_plana[inicio:inicio + tamanho_bloco])[selecao]
+        indices = np.minimum((d / largura_bin).astype(np.int64), n_bins - 1)
+        contagem += np.bincount(indices, minlength=n_bins)
+        soma += float(d.sum(dtype=np.float64))
+        d_min, d_max = min(d_min, float(d.min())), max(d_max, float(d.max()))
+
+    return contagem, soma, d_min, d_max
+
+def calcular_dvh(dose, estruturas, volume_voxel=1.0, largura_bin=0.1, dose_maxima=None,
+                 tamanho_bloco=2**22, threads=None):
+    """DVHs diferenciais e cumulativos de cada estrutura (máscara booleana com a forma da dose).
+    Os voxels são processados em blocos, com as estruturas distribuídas entre threads."""
+    if dose_maxima is None:
+        dose_plana = dose.reshape(-1)
+        dose_maxima = max(float(np.max(dose_plana[i:i + tamanho_bloco]))
+                          for i in range(0, dose_plana.size, tamanho_bloco))
+    n_bins = int(math.ceil(dose_maxima / largura_bin)) + 1
+    bordas = np.arange(n_bins) * largura_bin
+
+    def processar(item):
+        nome, mascara = item
+        contagem, soma, d_min, d_max = _histograma_estrutura(dose, mascara, largura_bin, n_bins, tamanho_bloco)
+        n_voxels = int(contagem.sum())
+        return nome, {
+            "dose": bordas,
+            "diferencial": contagem * volume_voxel,
+            "cumulativo": np.cumsum(contagem[::-1])[::-1] * volume_voxel,
+            "volume": n_voxels * volume_voxel,
+            "dmedia": soma / n_voxels if n_voxels else np.nan,
+            "dmin": d_min if n_voxels else np.nan,
+            "dmax": d_max if n_voxels else np.nan
+        }
+
+    with ThreadPoolExecutor(max_workers=threads or min(len(estruturas), os.cpu_count() or 1) or 1) as executor:
+        return dict(executor.map(processar, estruturas.items()))
+
+def dose_no_volume(dvh, percentual):
+    """Dx: menor dose recebida pelos x% do volume mais irradiados (Gy)"""
+    fracao = dvh["cumulativo"] / dvh["volume"]
+    # A curva cumulativa é decrescente: interpola no eixo invertido
+    return float(np.interp(percentual / 100, fracao[::-1], dvh["dose"][::-1]))
+
+def volume_na_dose(dvh, dose):
+    """Vx: percentual do volume que recebe pelo menos a dose informada (Gy)"""
+    return float(100 * np.interp(dose, dvh["dose"], dvh["cumulativo"]) / dvh["volume"])
+
+def metricas_dvh(dvhs, doses_d=(98, 95, 50, 2), doses_v=(5, 20, 30)):
+    """Tabela com volume, Dmin/Dmédia/Dmax, Dx% e Vx Gy de cada estrutura"""
+    linhas = []
+    for nome, dvh in dvhs.items():
+        linha = {"Estrutura": nome, "Volume (cm³)": dvh["volume"], "Dmin (Gy)": dvh["dmin"],
+                 "Dmédia (Gy)": dvh["dmedia"], "Dmax (Gy)": dvh["dmax"]}
+        for x in doses_d:
+            linha[f"D{x} (Gy)"] = dose_no_volume(dvh, x) if dvh["volume"] else np.nan
+        for x in doses_v:
+            linha[f"V{x} (%)"] = volume_na_dose(dvh, x) if dvh["volume"] else np.nan
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+# Parâmetros Lyman-Kutcher-Burman (TD50 em Gy, EQD2) por órgão de risco
+PARAMETROS_LKB = {
+    "Medula espinhal": {"td50": 66.5, "m": 0.175, "n": 0.05},
+    "Reto": {"td50": 76.9, "m": 0.13, "n": 0.09},
+    "Pulmão (pneumonite)": {"td50": 30.8, "m": 0.37, "n": 0.99},
+    "Tronco cerebral": {"td50": 65.0, "m": 0.14, "n": 0.16},
+    "Órgão de risco": {"td50": 60.0, "m": 0.15, "n": 0.25}
+}
+
+def dvh_compacto(dvh):
+    """Centros de bin (Gy) e volumes (cm³) apenas dos bins ocupados de um DVH diferencial"""
+    largura = dvh["dose"][1] - dvh["dose"][0] if len(dvh["dose"]) > 1 else 0.0
+    ocupado = dvh["diferencial"] > 0
+    return dvh["dose"][ocupado] + 0.5 * largura, dvh["diferencial"][ocupado]
+
+def tcp_poisson_lq(doses, volumes, n_fracoes, alpha, alpha_beta, densidade_clonogenica=1e7):
+    """TCP Poisson-LQ de um DVH diferencial; alpha (e demais parâmetros) em broadcast com
+    uma última dimensão de bins, ex.: alpha[:, None] para uma coorte"""
+    doses = np.asarray(doses, dtype=float)
+    d = doses / n_fracoes
+    alpha = np.asarray(alpha, dtype=float)
+    fracao_sobrevivente = np.exp(-alpha * doses * (1 + d / alpha_beta))
+    clonogenos = np.sum(densidade_clonogenica * np.asarray(volumes, dtype=float) * fracao_sobrevivente, axis=-1)
+    return np.exp(-clonogenos)
+
+def ntcp_lkb(doses, volumes, td50, m, n, n_fracoes=None, alpha_beta=3.0):
+    """NTCP Lyman-Kutcher-Burman via gEUD; parâmetros em broadcast (ex.: td50[:, None] para amostras).
+    Com n_fracoes, as doses são convertidas para EQD2 antes do gEUD."""
+    doses = np.asarray(doses, dtype=float)
+    if n_fracoes:
+        doses = doses * (doses / n_fracoes + alpha_beta) / (2 + alpha_beta)
+    fracoes_volume = np.asarray(volumes, dtype=float) / np.sum(volumes)
+
+    n = np.asarray(n, dtype=float)
+    geud = np.sum(fracoes_volume * doses ** (1 / n), axis=-1, keepdims=True) ** n
+    ntcp = 0.5 * (1 + erf_vetorizado((geud - td50) / (m * np.asarray(td50, dtype=float) * math.sqrt(2))))
+    return ntcp[..., 0]
+
+def curvas_populacionais(dvh_alvo, dvh_oar, parametros_oar, n_fracoes, escalas, alpha_beta_tumor=10.0,
+                         alpha_medio=0.3, alpha_desvio=0.07, densidade_clonogenica=1e7,
+                         incerteza_relativa=0.1, alpha_beta_oar=3.0, n_pacientes=10000, semente=0,
+                         tamanho_bloco=500):
+    """TCP e NTCP populacionais em função da escala da prescrição: α tumoral amostrado por paciente
+    virtual e parâmetros LKB amostrados (incerteza log-normal), avaliados em blocos de pacientes"""
+    rng = np.random.default_rng(semente)
+    escalas = np.asarray(escalas, dtype=float)
+    doses_alvo, volumes_alvo = dvh_compacto(dvh_alvo)
+    doses_oar, volumes_oar = dvh_compacto(dvh_oar)
+
+    alphas = np.clip(rng.normal(alpha_medio, alpha_desvio, n_pacientes), 0.01, None)
+    tcp = np.empty((n_pacientes, len(escalas)))
+    for inicio in range(0, n_pacientes, tamanho_bloco):
+        bloco = alphas[inicio:inicio + tamanho_bloco, None, None]
+        doses_escaladas = escalas[None, :, None] * doses_alvo[None, None, :]
+        tcp[inicio:inicio + tamanho_bloco] = tcp_poisson_lq(doses_escaladas, volumes_alvo, n_fracoes, bloco,
+                                                             alpha_beta_tumor, densidade_clonogenica)
+
+    amostras = {chave: parametros_oar[chave] * rng.lognormal(0.0, incerteza_relativa, n_pacientes)
+                for chave in ("td50", "m", "n")}
+    ntcp = np.empty((n_pacientes, len(escalas)))
+    for j, escala in enumerate(escalas):
+        ntcp[:, j] = ntcp_lkb(escala * doses_oar, volumes_oar, amostras["td50"][:, None], amostras["m"][:, None],
+                              amostras["n"][:, None], n_fracoes, alpha_beta_oar)
+
+    return {
+        "tcp_medio": tcp.mean(axis=0), "tcp_p5": np.percentile(tcp, 5, axis=0), "tcp_p95": np.percentile(tcp, 95, axis=0),
+        "ntcp_medio": ntcp.mean(axis=0), "ntcp_p5": np.percentile(ntcp, 5, axis=0), "ntcp_p95": np.percentile(ntcp, 95, axis=0)
+    }
+
+# Órgão de risco representativo de cada localização e sua posição relativa ao tumor (x, z em cm)
+ORGAOS_RISCO_LOCALIZACAO = {
+    "Pulmão": ("Medula espinhal", (0.0, 6.0), 0.8),
+    "Próstata": ("Reto", (0.0, 3.5), 1.5),
+    "Mama": ("Pulmão (pneumonite)", (-4.0, 4.0), 3.0),
+    "Cérebro": ("Tronco cerebral", (0.0, 4.0), 1.2),
+    "Outro": ("Órgão de risco", (4.0, 0.0), 1.5)
+}
+
+def estruturas_fantoma(densidade, espacamento, volume_tumor, localizacao):
+    """Máscaras de PTV (esfera com o volume do tumor), órgão de risco (cilindro) e corpo"""
+    n = densidade.shape[0]
+    c = (np.arange(n) - (n - 1) / 2) * espacamento
+    Y, Z, X = np.meshgrid(c, c, c, indexing="ij", sparse=True)
+
+    raio_ptv = (3 * volume_tumor / (4 * math.pi)) ** (1 / 3)
+    nome_oar, (dx, dz), raio_oar = ORGAOS_RISCO_LOCALIZACAO.get(localizacao, ORGAOS_RISCO_LOCALIZACAO["Outro"])
+    deslocamento = raio_ptv + raio_oar
+    centro_oar = (dx / math.hypot(dx, dz) * deslocamento, dz / math.hypot(dx, dz) * deslocamento)
+
+    return {
+        "PTV": X ** 2 + Y ** 2 + Z ** 2 <= raio_ptv ** 2,
+        nome_oar: np.broadcast_to((X - centro_oar[0]) ** 2 + (Z - centro_oar[1]) ** 2 <= raio_oar ** 2,
+                                  densidade.shape) & (densidade > 0.5),
+        "Corpo": densidade > 0.5
+    }
+
+# Dados TG-43 (valores representativos de consenso): Λ em cGy h⁻¹ U⁻¹, L em cm, meia-vida em dias
+_ANGULOS_TG43 = [0, 5, 10, 20, 30, 45, 60, 90, 120, 135, 150, 160, 170, 175, 180]
+
+def _simetrico(valores):
+    return valores + valores[-2::-1]
+
+FONTES_TG43 = {
+    "Ir-192 HDR": {
+        "lambda": 1.109, "comprimento": 0.36, "meia_vida": 73.83, "phi_an": 0.98,
+        "r_g": [0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0],
+        "g": [0.991, 0.996, 1.000, 1.000, 1.003, 1.004, 1.003, 0.997, 0.990, 0.980, 0.950, 0.911],
+        "r_f": [0.25, 0.5, 1.0, 2.0, 5.0],
+        "theta_f": _ANGULOS_TG43,
+        "f": [[0.730, 0.738, 0.783, 0.874, 0.927, 0.966, 0.987, 1.0, 0.987, 0.966, 0.923, 0.869, 0.725, 0.638, 0.607],
+              [0.666, 0.675, 0.737, 0.847, 0.911, 0.960, 0.985, 1.0, 0.985, 0.959, 0.911, 0.856, 0.716, 0.617, 0.583],
+              [0.650, 0.667, 0.721, 0.836, 0.903, 0.955, 0.982, 1.0, 0.983, 0.956, 0.904, 0.850, 0.727, 0.632, 0.596],
+              [0.664, 0.680, 0.730, 0.838, 0.904, 0.955, 0.982, 1.0, 0.982, 0.955, 0.905, 0.854, 0.750, 0.668, 0.633],
+              [0.715, 0.727, 0.767, 0.856, 0.913, 0.959, 0.984, 1.0, 0.984, 0.958, 0.911, 0.867, 0.790, 0.729, 0.699]]
+    },
+    "I-125 (semente)": {
+        "lambda": 0.965, "comprimento": 0.30, "meia_vida": 59.40, "phi_an": 0.93,
+        "r_g": [0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 10.0],
+        "g": [1.055, 1.082, 1.071, 1.042, 1.000, 0.908, 0.814, 0.632, 0.496, 0.364, 0.270, 0.199, 0.148, 0.080],
+        "r_f": [0.5, 1.0, 2.0, 3.0, 5.0],
+        "theta_f": _ANGULOS_TG43,
+        "f": [_simetrico([0.333, 0.400, 0.519, 0.716, 0.846, 0.926, 0.972, 1.0]),
+              _simetrico([0.370, 0.429, 0.537, 0.705, 0.834, 0.925, 0.972, 1.0]),
+              _simetrico([0.442, 0.497, 0.580, 0.727, 0.842, 0.926, 0.970, 1.0]),
+              _simetrico([0.488, 0.535, 0.609, 0.743, 0.846, 0.926, 0.969, 1.0]),
+              _simetrico([0.520, 0.561, 0.630, 0.752, 0.848, 0.928, 0.969, 1.0])]
+    }
+}
+
+def fator_geometria_linha(r, theta, comprimento):
+    """Fator de geometria G_L(r, θ) de fonte linear (cm⁻²), θ em graus"""
+    r = np.asarray(r, dtype=float)
+    theta = np.radians(theta)
+    z = r * np.cos(theta)
+    rho = r * np.sin(theta)
+    meio = comprimento / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = np.arctan2(rho, z - meio) - np.arctan2(rho, z + meio)
+        fora_eixo = beta / (comprimento * rho)
+        no_eixo = 1.0 / np.abs(z ** 2 - meio ** 2)
+    return np.where(rho > 1e-9, fora_eixo, no_eixo)
+
+def funcao_dose_radial(r, fonte):
+    """g_L(r) interpolada, com extrapolação log-linear além do último ponto tabelado"""
+    dados = FONTES_TG43[fonte]
+    r_tab, g_tab = np.array(dados["r_g"]), np.array(dados["g"])
+    r = np.asarray(r, dtype=float)
+    inclinacao = np.log(g_tab[-1] / g_tab[-2]) / (r_tab[-1] - r_tab[-2])
+    return np.where(r > r_tab[-1], g_tab[-1] * np.exp(inclinacao * (r - r_tab[-1])), np.interp(r, r_tab, g_tab))
+
+def anisotropia_2d(r, theta, fonte):
+    """F(r, θ) por interpolação bilinear da tabela (valores constantes fora dela)"""
+    dados = FONTES_TG43[fonte]
+    r_tab, t_tab, f_tab = np.array(dados["r_f"]), np.array(dados["theta_f"], dtype=float), np.array(dados["f"])
+    r = np.clip(r, r_tab[0], r_tab[-1])
+    theta = np.clip(theta, 0.0, 180.0)
+
+    i = np.clip(np.searchsorted(r_tab, r) - 1, 0, len(r_tab) - 2)
+    j = np.clip(np.searchsorted(t_tab, theta) - 1, 0, len(t_tab) - 2)
+    wr = (r - r_tab[i]) / (r_tab[i + 1] - r_tab[i])
+    wt = (theta - t_tab[j]) / (t_tab[j + 1] - t_tab[j])
+    return ((1 - wr) * (1 - wt) * f_tab[i, j] + wr * (1 - wt) * f_tab[i + 1, j] +
+            (1 - wr) * wt * f_tab[i, j + 1] + wr * wt * f_tab[i + 1, j + 1])
+
+@lru_cache(maxsize=16)
+def nucleo_tg43(fonte, formalismo="linha", r_min=0.1, r_max=15.0, passo_r=0.02, passo_theta=1.0):
+    """Taxa de dose por unidade de S_K (cGy h⁻¹ U⁻¹) tabelada numa grade polar uniforme (r, θ)"""
+    dados = FONTES_TG43[fonte]
+    r = np.arange(r_min, r_max + passo_r / 2, passo_r)
+    theta = np.arange(0.0, 180.0 + passo_theta / 2, passo_theta)
+    R, T = np.meshgrid(r, theta, indexing='ij')
+
+    comprimento = dados["comprimento"]
+    g_ref = fator_geometria_linha(1.0, 90.0, comprimento)
+    if formalismo == "linha":
+        nucleo = fator_geometria_linha(R, T, comprimento) / g_ref * funcao_dose_radial(R, fonte) * anisotropia_2d(R, T, fonte)
+    else:
+        # g_P(r) = g_L(r)·G_L(r, 90°)/G_L(r0, 90°)·r² e anisotropia 1D φ_an
+        g_pontual = funcao_dose_radial(r, fonte) * fator_geometria_linha(r, 90.0, comprimento) / g_ref * r ** 2
+        nucleo = np.broadcast_to((g_pontual * dados["phi_an"] / r ** 2)[:, None], R.shape)
+
+    nucleo = np.ascontiguousarray(dados["lambda"] * nucleo)
+    nucleo.setflags(write=False)
+    return nucleo
+
+def _consultar_nucleo(nucleo, r, theta, r_min, passo_r, passo_theta):
+    """Interpolação bilinear direta na grade polar uniforme (zero além de r_max)"""
+    fr = (np.maximum(r, r_min) - r_min) / passo_r
+    ft = theta / passo_theta
+    i = np.minimum(fr.astype(np.intp), nucleo.shape[0] - 2)
+    j = np.minimum(ft.astype(np.intp), nucleo.shape[1] - 2)
+    wr = np.clip(fr - i, 0.0, 1.0)
+    wt = ft - j
+    valor = ((1 - wr) * (1 - wt) * nucleo[i, j] + wr * (1 - wt) * nucleo[i + 1, j] +
+             (1 - wr) * wt * nucleo[i, j + 1] + wr * wt * nucleo[i + 1, j + 1])
+    return np.where(fr <= nucleo.shape[0] - 1, valor, 0.0)
+
+def calcular_dose_braquiterapia(pontos, posicoes, direcoes, tempos, fonte="Ir-192 HDR", s_k=40700.0,
+                                formalismo="linha", r_min=0.1, r_max=15.0, passo_r=0.02, passo_theta=1.0,
+                                max_elementos=4_000_000):
+    """Dose TG-43 (Gy) em pontos (N, 3) somando as paradas (M, 3) com eixo (M, 3) e tempos (M,) em s.
+    A superposição é um broadcast (pontos × paradas) avaliado em blocos de pontos."""
+    pontos = np.asarray(pontos, dtype=float).reshape(-1, 3)
+    posicoes = np.asarray(posicoes, dtype=float).reshape(-1, 3)
+    direcoes = np.asarray(direcoes, dtype=float).reshape(-1, 3)
+    direcoes = direcoes / np.linalg.norm(direcoes, axis=1, keepdims=True)
+    pesos = np.asarray(tempos, dtype=float) / 3600.0 * s_k / 100.0  # cGy h⁻¹ → Gy
+    nucleo = nucleo_tg43(fonte, formalismo, r_min, r_max, passo_r, passo_theta)
+
+    dose = np.empty(len(pontos))
+    bloco = max(1, int(max_elementos // max(len(posicoes), 1)))
+    for inicio in range(0, len(pontos), bloco):
+        delta = pontos[inicio:inicio + bloco, None, :] - posicoes[None, :, :]
+        r = np.sqrt(np.einsum('pmk,pmk->pm', delta, delta))
+        cos_theta = np.einsum('pmk,mk->pm', delta, direcoes) / np.maximum(r, 1e-12)
+        theta = np.degrees(np.arccos(np.clip(cos_theta, -1.0, 1.0)))
+        dose[inicio:inicio + bloco] = _consultar_nucleo(nucleo, r, theta, r_min, passo_r, passo_theta) @ pesos
+    return dose
+
+def implante_cateteres(n_cateteres, paradas_por_cateter, passo, espacamento_cateteres=1.0):
+    """Posições de parada e direções de um implante de cateteres paralelos ao eixo z (plano y = 0)"""
+    x = (np.arange(n_cateteres) - (n_cateteres - 1) / 2) * espacamento_cateteres
+    z = (np.arange(paradas_por_cateter) - (paradas_por_cateter - 1) / 2) * passo
+    X, Z = np.meshgrid(x, z, indexing='ij')
+    posicoes = np.column_stack([X.ravel(), np.zeros(X.size), Z.ravel()])
+    direcoes = np.tile([0.0, 0.0, 1.0], (len(posicoes), 1))
+    return posicoes, direcoes
+
+def direcoes_arcos(arcos, passo_graus=5.0):
+    """Direções de propagação (M, 3) dos feixes de arcos (ângulo de mesa, gantry inicial, gantry final)"""
+    direcoes = []
+    for mesa, inicio, fim in arcos:
+        n = max(int(abs(fim - inicio) // passo_graus) + 1, 2)
+        g = np.radians(np.linspace(inicio, fim, n))
+        c = math.radians(mesa)
+        fonte = np.column_stack([np.sin(g) * math.cos(c), np.cos(g), np.sin(g) * math.sin(c)])
+        direcoes.append(-fonte)
+    return np.vstack(direcoes)
+
+def dose_cones(pontos, direcoes, diametro_cone, raio_cranio=8.0, sad=100.0, energia=6, penumbra=0.15,
+               max_elementos=2_000_000, threads=None):
+    """Dose relativa de feixes cônicos convergindo no isocentro, somada sobre todas as direções (N pontos × M feixes)"""
+    pontos = np.asarray(pontos, dtype=float).reshape(-1, 3)
+    dose = np.empty(len(pontos))
+    bloco = max(1, int(max_elementos // len(direcoes)))
+
+    def calcular_bloco(inicio):
+        p = pontos[inicio:inicio + bloco]
+        ao_longo = p @ direcoes.T
+        quadrado = np.einsum('pk,pk->p', p, p)[:, None]
+        radial = np.sqrt(np.maximum(quadrado - ao_longo ** 2, 0.0))
+
+        # Profundidade até a superfície do crânio (esfera) e divergência a partir da fonte
+        profundidade = ao_longo + np.sqrt(np.maximum(ao_longo ** 2 - quadrado + raio_cranio ** 2, 0.0))
+        escala = sad / (sad + ao_longo)
+        contribuicao = (pdd_fotons(profundidade, energia) * escala ** 2 *
+                        perfil_fora_do_eixo(radial * escala, diametro_cone, penumbra))
+        dose[inicio:inicio + bloco] = contribuicao.sum(axis=1)
+
+    with ThreadPoolExecutor(max_workers=threads or os.cpu_count()) as executor:
+        list(executor.map(calcular_bloco, range(0, len(pontos), bloco)))
+    return dose / len(direcoes)
+
+def _dilatar(mascara):
+    """Dilatação 3D de uma máscara booleana pela vizinhança 3×3×3"""
+    expandida = np.pad(mascara, 1)
+    resultado = np.zeros_like(mascara)
+    nz, ny, nx = mascara.shape
+    for dz in range(3):
+        for dy in range(3):
+            for dx in range(3):
+                resultado |= expandida[dz:dz + nz, dy:dy + ny, dx:dx + nx]
+    return resultado
+
+def grade_refinada_radiocirurgia(direcoes, diametro_cone, meia_largura=3.0, passo_grosso=0.2, fator_refino=8,
+                                 limiar_refino=0.3, raio_alvo=None, **parametros_feixe):
+    """Dose em grade esparsa de dois níveis: grade grossa em todo o volume e subcélulas finas apenas
+    nas células acima do limiar de dose (dilatadas) ou sobre o alvo"""
+    eixo = np.arange(-meia_largura, meia_largura + passo_grosso / 2, passo_grosso)
+    Z, Y, X = np.meshgrid(eixo, eixo, eixo, indexing='ij')
+    centros = np.column_stack([X.ravel(), Y.ravel(), Z.ravel()])
+    dose_grossa = dose_cones(centros, direcoes, diametro_cone, **parametros_feixe).reshape(X.shape)
+
+    refinar = dose_grossa >= limiar_refino * dose_grossa.max()
+    if raio_alvo is not None:
+        refinar |= X ** 2 + Y ** 2 + Z ** 2 <= (raio_alvo + passo_grosso) ** 2
+    refinar = _dilatar(refinar)
+
+    # Subcélulas centradas dentro de cada célula grossa selecionada
+    passo_fino = passo_grosso / fator_refino
+    sub = (np.arange(fator_refino) - (fator_refino - 1) / 2) * passo_fino
+    sz, sy, sx = np.meshgrid(sub, sub, sub, indexing='ij')
+    deslocamentos = np.column_stack([sx.ravel(), sy.ravel(), sz.ravel()])
+    pontos_finos = (centros[refinar.ravel()][:, None, :] + deslocamentos[None, :, :]).reshape(-1, 3)
+    dose_fina = dose_cones(pontos_finos, direcoes, diametro_cone, **parametros_feixe)
+
+    norma = max(dose_fina.max() if dose_fina.size else 0.0, dose_grossa.max())
+    return {
+        "eixo": eixo, "passo_grosso": passo_grosso, "passo_fino": passo_fino,
+        "dose_grossa": dose_grossa / norma, "refinado": refinar,
+        "pontos_finos": pontos_finos, "dose_fina": dose_fina / norma,
+        "pontos_totais": centros.shape[0] + pontos_finos.shape[0],
+        "pontos_equivalentes": centros.shape[0] * fator_refino ** 3
+    }
+
+def indices_radiocirurgia(grade, raio_alvo, nivel_prescricao=0.8):
+    """Índices de conformidade (RTOG, Paddick), cobertura e gradiente (Paddick GI) a partir da grade esparsa"""
+    eixo = grade["eixo"]
+    Z, Y, X = np.meshgrid(eixo, eixo, eixo, indexing='ij')
+    grossas = ~grade["refinado"]
+    r2_grosso = (X ** 2 + Y ** 2 + Z ** 2)[grossas]
+    r2_fino = np.einsum('pk,pk->p', grade["pontos_finos"], grade["pontos_finos"])
+
+    doses = np.concatenate([grade["dose_grossa"][grossas], grade["dose_fina"]])
+    volumes = np.concatenate([np.full(r2_grosso.size, grade["passo_grosso"] ** 3),
+                              np.full(r2_fino.size, grade["passo_fino"] ** 3)])
+    no_alvo = np.concatenate([r2_grosso, r2_fino]) <= raio_alvo ** 2
+
+    volume_alvo = volumes[no_alvo].sum()
+    piv = volumes[doses >= nivel_prescricao].sum()
+    alvo_coberto = volumes[no_alvo & (doses >= nivel_prescricao)].sum()
+    piv_metade = volumes[doses >= 0.5 * nivel_prescricao].sum()
+
+    return {
+        "volume_alvo": volume_alvo, "volume_prescricao": piv,
+        "cobertura": alvo_coberto / volume_alvo if volume_alvo else np.nan,
+        "ci_rtog": piv / volume_alvo if volume_alvo else np.nan,
+        "ci_paddick": alvo_coberto ** 2 / (volume_alvo * piv) if volume_alvo and piv else np.nan,
+        "gi_paddick": piv_metade / piv if piv else np.nan
+    }
+
+# Coeficientes por protocolo (adulto): TC em mSv/(mGy·cm) sobre o DLP; radiografia em mSv/mGy sobre a
+# dose de entrada. NRD = nível de referência de diagnóstico (CTDIvol em mGy para TC, ESD em mGy para radiografia)
+COEFICIENTES_IMAGEM = pd.DataFrame([
+    ("TC", "Crânio", 0.0021, 60.0),
+    ("TC", "Pescoço", 0.0059, 25.0),
+    ("TC", "Tórax", 0.014, 15.0),
+    ("TC", "Abdome", 0.015, 20.0),
+    ("TC", "Abdome-pelve", 0.015, 20.0),
+    ("TC", "Coluna lombar", 0.015, 35.0),
+    ("Radiografia", "Tórax PA", 0.10, 0.4),
+    ("Radiografia", "Crânio AP", 0.015, 5.0),
+    ("Radiografia", "Abdome AP", 0.23, 10.0),
+    ("Radiografia", "Pelve AP", 0.20, 10.0),
+    ("Radiografia", "Coluna lombar AP", 0.14, 10.0)
+], columns=["modalidade", "protocolo", "coeficiente", "nrd"]).set_index(["modalidade", "protocolo"]).sort_index()
+
+def rendimento_tubo(kvp, rendimento_80kv=0.05):
+    """Rendimento aproximado do tubo (mGy/mAs a 1 m) escalando com kVp²"""
+    return rendimento_80kv * (np.asarray(kvp, dtype=float) / 80.0) ** 2
+
+def calcular_doses_exames(exames, fator_retroespalhamento=1.35):
+    """Doses de um lote de exames (DataFrame) com consulta vetorizada dos coeficientes por protocolo.
+    TC: colunas ctdivol (mGy) e dlp (mGy·cm) ou comprimento (cm); radiografia: kvp, mas e dfp (cm)."""
+    resultado = exames.copy()
+    for coluna in ("ctdivol", "dlp", "comprimento", "kvp", "mas", "dfp"):
+        if coluna not in resultado:
+            resultado[coluna] = np.nan
+        resultado[coluna] = pd.to_numeric(resultado[coluna], errors="coerce")
+
+    chaves = pd.MultiIndex.from_frame(resultado[["modalidade", "protocolo"]])
+    coeficientes = COEFICIENTES_IMAGEM.reindex(chaves)
+    tc = (resultado["modalidade"] == "TC").to_numpy()
+
+    dlp = resultado["dlp"].fillna(resultado["ctdivol"] * resultado["comprimento"]).to_numpy()
+    dose_entrada = (rendimento_tubo(resultado["kvp"]) * resultado["mas"].to_numpy() *
+                    (100.0 / resultado["dfp"].to_numpy()) ** 2 * fator_retroespalhamento)
+    indicador = np.where(tc, resultado["ctdivol"].to_numpy(), dose_entrada)
+
+    resultado["dlp"] = np.where(tc, dlp, np.nan)
+    resultado["dose_entrada"] = np.where(tc, np.nan, dose_entrada)
+    resultado["dose_efetiva"] = coeficientes["coeficiente"].to_numpy() * np.where(tc, dlp, dose_entrada)
+    resultado["razao_nrd"] = indicador / coeficientes["nrd"].to_numpy()
+    resultado["acima_nrd"] = resultado["razao_nrd"] > 1
+    resultado["protocolo_conhecido"] = coeficientes["coeficiente"].notna().to_numpy()
+    return resultado
+
+def estatisticas_por_protocolo(resultado):
+    """Estatísticas agregadas por protocolo (mediana e 3º quartil são os valores usados em auditorias de NRD)"""
+    validos = resultado[resultado["protocolo_conhecido"]].assign(
+        indicador=lambda df: df["ctdivol"].where(df["modalidade"] == "TC", df["dose_entrada"]))
+    grupos = validos.groupby(["modalidade", "protocolo"])
+    tabela = grupos.agg(
+        exames=("dose_efetiva", "size"),
+        indicador_mediana=("indicador", "median"),
+        indicador_p75=("indicador", lambda s: s.quantile(0.75)),
+        dose_efetiva_media=("dose_efetiva", "mean"),
+        dose_efetiva_mediana=("dose_efetiva", "median"),
+        dose_coletiva=("dose_efetiva", "sum"),
+        fracao_acima_nrd=("acima_nrd", "mean")
+    )
+    return tabela.join(COEFICIENTES_IMAGEM["nrd"]).reset_index()
+
+def gerar_exames_sinteticos(n_exames=10000, semente=0):
+    """Lote sintético de registros de exames para demonstração da auditoria"""
+    rng = np.random.default_rng(semente)
+    protocolos = COEFICIENTES_IMAGEM.reset_index()
+    escolha = protocolos.iloc[rng.integers(0, len(protocolos), n_exames)].reset_index(drop=True)
+    tc = (escolha["modalidade"] == "TC").to_numpy()
+
+    # Parâmetros típicos em torno de 70% do NRD, com dispersão log-normal entre equipamentos
+    ctdivol = escolha["nrd"].to_numpy() * 0.7 * rng.lognormal(0.0, 0.35, n_exames)
+    comprimento = np.where(escolha["protocolo"].str.contains("Crânio"), 18.0, 35.0) * rng.uniform(0.8, 1.2, n_exames)
+    kvp = rng.choice([70, 80, 90, 110, 125], n_exames)
+    dfp = rng.uniform(80, 160, n_exames)
+    esd_alvo = escolha["nrd"].to_numpy() * 0.7 * rng.lognormal(0.0, 0.35, n_exames)
+    mas = esd_alvo / (rendimento_tubo(kvp) * (100.0 / dfp) ** 2 * 1.35)
+
+    return pd.DataFrame({
+        "exame": np.arange(1, n_exames + 1),
+        "modalidade": escolha["modalidade"], "protocolo": escolha["protocolo"],
+        "ctdivol": np.where(tc, ctdivol, np.nan).round(2), "comprimento": np.where(tc, comprimento, np.nan).round(1),
+        "kvp": np.where(tc, np.nan, kvp), "mas": np.where(tc, np.nan, mas).round(1), "dfp": np.where(tc, np.nan, dfp).round(0)
+    })
+
 def modulo_aplicacoes_clinicas():
     st.header("🏥 Aplicações Clínicas da Radiação")
     
@@ -1178,7 +2891,7 @@ def modulo_aplicacoes_clinicas():
         
         if st.button("📊 Calcular Parâmetros Clínicos"):
             dose_fracao = dose_total / num_fracoes
-            BED = dose_total * (1 + dose_fracao / alpha_beta)
+            BED = float(calcular_bed_lq(num_fracoes, dose_fracao, alpha_beta))
             
             st.markdown("---")
             st.markdown("### 📋 Resultados do Tratamento")
@@ -1209,7 +2922,7 @@ def modulo_aplicacoes_clinicas():
             # Gráfico de BED vs dose/fração
             fracoes_test = np.linspace(1, 40, 40)
             doses_frac_test = 60 / fracoes_test
-            BED_test = 60 * (1 + doses_frac_test / alpha_beta)
+            BED_test = calcular_bed_lq(fracoes_test, doses_frac_test, alpha_beta)
             
             fig, ax = plt.subplots(figsize=(10, 6))
             ax.plot(fracoes_test, BED_test, 'b-', linewidth=2)
@@ -1223,10 +2936,372 @@ def modulo_aplicacoes_clinicas():
             
             st.pyplot(fig)
     
+        # Otimizador de fracionamento com restrições de órgãos de risco
+        st.markdown("---")
+        st.markdown("### 🔎 Otimizador de Fracionamento")
+
+        col_opt1, col_opt2 = st.columns(2)
+
+        with col_opt1:
+            tumor_opt = st.selectbox("Tumor", [nome for nome, p in TECIDOS_LQ.items() if p["tipo"] == "tumor"])
+            sessoes_opt = st.multiselect("Sessões por semana permitidas", [1, 2, 3, 4, 5], default=[3, 4, 5])
+            bed_min_opt = st.number_input("BED tumoral mínima (Gy)", min_value=0.0, value=60.0, step=5.0)
+
+        with col_opt2:
+            oars_opt = st.multiselect("Órgãos de risco com restrição", list(RESTRICOES_OAR_PADRAO.keys()),
+                                    default=["Medula espinhal"])
+            restricoes = {}
+            for nome in oars_opt:
+                padrao = RESTRICOES_OAR_PADRAO[nome]
+                col_r1, col_r2 = st.columns(2)
+                with col_r1:
+                    fracao = st.number_input(f"{nome}: fração da dose", min_value=0.05, max_value=1.5,
+                                           value=padrao["fracao_dose"], step=0.05)
+                with col_r2:
+                    bed_max = st.number_input(f"{nome}: BED máx. (Gy)", min_value=1.0,
+                                            value=padrao["bed_max"], step=5.0)
+                restricoes[nome] = {"fracao_dose": fracao, "bed_max": bed_max}
+
+        if st.button("🔎 Otimizar Fracionamento") and sessoes_opt:
+            pareto, estatisticas = otimizar_fracionamento(TECIDOS_LQ[tumor_opt], restricoes,
+                                                          sessoes_semana=sessoes_opt, bed_tumor_min=bed_min_opt)
+
+            st.markdown(f"**{estatisticas['avaliados']:,} esquemas avaliados** em {estatisticas['tempo_s']*1000:.0f} ms "
+                        f"({estatisticas['taxa']:,.0f} esquemas/s) — {estatisticas['podados']:,} podados, "
+                        f"{estatisticas['viaveis']:,} viáveis, {estatisticas['pareto']} na fronteira de Pareto")
+
+            if len(pareto) == 0:
+                st.warning("⚠️ Nenhum esquema satisfaz as restrições. Relaxe os limites ou a BED mínima.")
+            else:
+                melhor = pareto.iloc[0]
+                st.success(f"✅ Maior BED tumoral: {melhor['BED tumor (Gy)']:.1f} Gy com "
+                           f"{melhor['Frações']} × {melhor['Dose/fração (Gy)']:.2f} Gy "
+                           f"({melhor['Sessões/semana']} sessões/semana, {melhor['Tempo total (dias)']:.0f} dias)")
+
+                fig_opt, ax_opt = plt.subplots(figsize=(10, 6))
+                sc = ax_opt.scatter(pareto["Tempo total (dias)"], pareto["BED tumor (Gy)"],
+                                    c=pareto["Uso máximo OAR (%)"], cmap='RdYlGn_r', s=40)
+                fig_opt.colorbar(sc, ax=ax_opt, label="Uso máximo da restrição OAR (%)")
+                ax_opt.set_xlabel("Tempo total de tratamento (dias)")
+                ax_opt.set_ylabel("BED tumoral (Gy)")
+                ax_opt.set_title("Fronteira de Pareto: BED tumoral × Tempo × Restrições OAR")
+                ax_opt.grid(True)
+
+                st.pyplot(fig_opt)
+                st.dataframe(pareto.head(20), use_container_width=True)
+
+        # Histograma dose-volume do plano em fantoma com as estruturas informadas
+        st.markdown("---")
+        st.markdown("### 📊 Histograma Dose-Volume (DVH)")
+        st.markdown(f"PTV esférico de {volume:.0f} cm³ e órgão de risco típico de **{localizacao}**, "
+                    f"irradiados por 3 campos de {energia} MV.")
+
+        if st.button("📊 Calcular DVH"):
+            n_dvh, espacamento_dvh = 96, 0.3
+            densidade_dvh = fantoma_densidade(n_dvh, espacamento_dvh)
+            estruturas = estruturas_fantoma(densidade_dvh, espacamento_dvh, volume, localizacao)
+            campo_ptv = 2 * (3 * volume / (4 * math.pi)) ** (1 / 3) + 1.0
+
+            # Dose relativa (100% no isocentro) escalonada para a dose prescrita
+            dose_dvh = calcular_dose_3d(densidade_dvh, espacamento_dvh, [0, 120, 240], float(energia),
+                                        (campo_ptv, campo_ptv), penumbra=0.5) * (dose_total / 100)
+
+            inicio_dvh = time.perf_counter()
+            dvhs = calcular_dvh(dose_dvh, estruturas, volume_voxel=espacamento_dvh ** 3)
+            tempo_dvh = time.perf_counter() - inicio_dvh
+
+            fig_dvh, ax_dvh = plt.subplots(figsize=(10, 6))
+            for nome, dvh in dvhs.items():
+                ax_dvh.plot(dvh["dose"], 100 * dvh["cumulativo"] / dvh["volume"], linewidth=2, label=nome)
+            ax_dvh.axvline(x=dose_total, color='gray', linestyle=':', label=f'Prescrição: {dose_total:.0f} Gy')
+            ax_dvh.set_xlabel("Dose (Gy)")
+            ax_dvh.set_ylabel("Volume (%)")
+            ax_dvh.set_title("Histograma Dose-Volume Cumulativo")
+            ax_dvh.legend()
+            ax_dvh.grid(True)
+
+            st.pyplot(fig_dvh)
+            st.dataframe(metricas_dvh(dvhs).round(2), use_container_width=True)
+            st.markdown(f"*DVH de {dose_dvh.size:,} voxels calculado em {tempo_dvh*1000:.0f} ms*")
+
+            # TCP/NTCP populacionais a partir dos DVHs (10⁴ pacientes virtuais)
+            nome_oar = ORGAOS_RISCO_LOCALIZACAO.get(localizacao, ORGAOS_RISCO_LOCALIZACAO["Outro"])[0]
+            escalas = np.linspace(0.5, 1.5, 41)
+
+            inicio_tcp = time.perf_counter()
+            populacao = curvas_populacionais(dvhs["PTV"], dvhs[nome_oar], PARAMETROS_LKB[nome_oar], num_fracoes,
+                                             escalas, alpha_beta_tumor=alpha_beta)
+            tempo_tcp = time.perf_counter() - inicio_tcp
+
+            doses_escala = escalas * dose_total
+            i_plano = np.argmin(np.abs(escalas - 1.0))
+
+            col_tcp1, col_tcp2 = st.columns(2)
+            with col_tcp1:
+                st.metric("TCP populacional", f"{100 * populacao['tcp_medio'][i_plano]:.1f}%",
+                          help="Poisson-LQ, α ~ N(0,30; 0,07) Gy⁻¹, 10⁷ clonogênicos/cm³")
+            with col_tcp2:
+                st.metric(f"NTCP {nome_oar}", f"{100 * populacao['ntcp_medio'][i_plano]:.1f}%",
+                          help="Lyman-Kutcher-Burman com incerteza de 10% nos parâmetros")
+
+            fig_tcp, ax_tcp = plt.subplots(figsize=(10, 6))
+            ax_tcp.plot(doses_escala, 100 * populacao["tcp_medio"], 'b-', linewidth=2, label='TCP')
+            ax_tcp.fill_between(doses_escala, 100 * populacao["tcp_p5"], 100 * populacao["tcp_p95"], color='blue', alpha=0.15)
+            ax_tcp.plot(doses_escala, 100 * populacao["ntcp_medio"], 'r-', linewidth=2, label=f'NTCP {nome_oar}')
+            ax_tcp.fill_between(doses_escala, 100 * populacao["ntcp_p5"], 100 * populacao["ntcp_p95"], color='red', alpha=0.15)
+            ax_tcp.axvline(x=dose_total, color='gray', linestyle=':', label='Prescrição atual')
+            ax_tcp.set_xlabel("Dose prescrita (Gy)")
+            ax_tcp.set_ylabel("Probabilidade (%)")
+            ax_tcp.set_title("Curvas Populacionais de TCP/NTCP (faixa 5–95%)")
+            ax_tcp.legend()
+            ax_tcp.grid(True)
+
+            st.pyplot(fig_tcp)
+            st.markdown(f"*10.000 pacientes virtuais × {len(escalas)} níveis de dose em {tempo_tcp:.2f} s*")
+
     elif aplicacao == "Brachytherapy":
         st.markdown("### 📍 Brachytherapy")
-        st.info("Módulo em desenvolvimento. Use Radioterapia Externa para simulações.")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("**☢️ Fonte:**")
+            fonte = st.selectbox("Fonte", list(FONTES_TG43.keys()))
+            formalismo = st.radio("Formalismo TG-43", ["linha", "ponto"], horizontal=True,
+                                  format_func=lambda f: "Fonte linear (2D)" if f == "linha" else "Fonte pontual (1D)")
+            s_k_calibracao = st.number_input("Intensidade de kerma no ar na calibração (U)", 0.01, 100000.0,
+                                             40700.0 if fonte == "Ir-192 HDR" else 0.5, key=f"s_k_{fonte}")
+            dias_calibracao = st.slider("Dias desde a calibração", 0, 120, 0)
+            s_k = s_k_calibracao * math.exp(-math.log(2) * dias_calibracao / FONTES_TG43[fonte]["meia_vida"])
+
+        with col2:
+            st.markdown("**📐 Implante:**")
+            n_cateteres = st.slider("Número de cateteres", 1, 15, 5)
+            paradas = st.slider("Posições de parada por cateter", 1, 60, 20)
+            passo_paradas = st.slider("Passo entre paradas (cm)", 0.25, 1.0, 0.5, 0.25)
+            espacamento_cat = st.slider("Espaçamento entre cateteres (cm)", 0.5, 2.0, 1.0, 0.1)
+            dose_prescrita = st.slider("Dose de prescrição (Gy)", 1.0, 20.0, 7.0, 0.5)
+
+        st.markdown(f"**S_K atual:** {s_k:,.1f} U")
+
+        if st.button("📍 Calcular Distribuição de Dose"):
+            posicoes, direcoes = implante_cateteres(n_cateteres, paradas, passo_paradas, espacamento_cat)
+
+            # Ponto de prescrição a 1 cm lateral do cateter externo, no plano central
+            borda = (n_cateteres - 1) / 2 * espacamento_cat
+            ponto_prescricao = np.array([[borda + 1.0, 0.0, 0.0]])
+            dose_unitaria = calcular_dose_braquiterapia(ponto_prescricao, posicoes, direcoes, np.ones(len(posicoes)),
+                                                        fonte, s_k, formalismo)[0]
+            tempo_parada = dose_prescrita / dose_unitaria
+            tempos = np.full(len(posicoes), tempo_parada)
+
+            meia_largura = borda + 3.0
+            meia_altura = (paradas - 1) / 2 * passo_paradas + 3.0
+            x = np.linspace(-meia_largura, meia_largura, 201)
+            z = np.linspace(-meia_altura, meia_altura, 201)
+            X, Z = np.meshgrid(x, z)
+            pontos = np.column_stack([X.ravel(), np.zeros(X.size), Z.ravel()])
+
+            inicio = time.perf_counter()
+            dose = calcular_dose_braquiterapia(pontos, posicoes, direcoes, tempos, fonte, s_k, formalismo).reshape(X.shape)
+            tempo_calc = time.perf_counter() - inicio
+
+            col_b1, col_b2, col_b3 = st.columns(3)
+            with col_b1:
+                st.metric("Posições de parada", f"{len(posicoes)}")
+            with col_b2:
+                st.metric("Tempo por parada", f"{tempo_parada:.1f} s")
+            with col_b3:
+                st.metric("Tempo total", f"{tempos.sum() / 60:.1f} min")
+
+            fig_bq, (ax_bq1, ax_bq2) = plt.subplots(1, 2, figsize=(14, 6))
+
+            niveis = np.array([50, 100, 150, 200, 300]) * dose_prescrita / 100
+            cf = ax_bq1.contourf(X, Z, np.minimum(dose, 4 * dose_prescrita), levels=30, cmap='hot')
+            cs = ax_bq1.contour(X, Z, dose, levels=niveis, colors='cyan', linewidths=1)
+            ax_bq1.clabel(cs, fmt=lambda v: f"{100 * v / dose_prescrita:.0f}%", fontsize=8)
+            ax_bq1.plot(posicoes[:, 0], posicoes[:, 2], 'w.', markersize=3)
+            ax_bq1.plot(*ponto_prescricao[0, [0, 2]], 'g*', markersize=12)
+            ax_bq1.set_xlabel("x (cm)")
+            ax_bq1.set_ylabel("z (cm)")
+            ax_bq1.set_title("Distribuição de Dose TG-43 (plano y = 0)")
+            ax_bq1.set_aspect('equal')
+            plt.colorbar(cf, ax=ax_bq1, label="Dose (Gy)")
+
+            r_graf = np.linspace(0.25, 10, 200)
+            ax_bq2.plot(r_graf, funcao_dose_radial(r_graf, fonte), 'b-', linewidth=2, label='g_L(r)')
+            theta_graf = np.linspace(0, 180, 181)
+            ax_bq2b = ax_bq2.twiny()
+            for r_f, cor in zip((0.5, 1.0, 5.0), ('orange', 'red', 'purple')):
+                ax_bq2b.plot(theta_graf, anisotropia_2d(np.full_like(theta_graf, r_f), theta_graf, fonte),
+                             color=cor, linestyle='--', label=f'F({r_f} cm, θ)')
+            ax_bq2.set_xlabel("r (cm)")
+            ax_bq2b.set_xlabel("θ (graus)")
+            ax_bq2.set_ylabel("g_L(r) / F(r, θ)")
+            ax_bq2.set_title(f"Dados TG-43: {fonte}", pad=30)
+            ax_bq2.legend(loc='lower left')
+            ax_bq2b.legend(loc='lower right')
+            ax_bq2.grid(True)
+
+            plt.tight_layout()
+            st.pyplot(fig_bq)
+            st.markdown(f"*{pontos.shape[0]:,} pontos × {len(posicoes)} paradas em {tempo_calc*1000:.0f} ms*")
         
+    elif aplicacao == "Radiocirurgia":
+        st.markdown("### 🎯 Radiocirurgia Estereotáxica com Cones")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("**🎯 Alvo e Cone:**")
+            diametro_alvo = st.slider("Diâmetro do alvo (mm)", 4.0, 30.0, 10.0, 1.0)
+            diametro_cone = st.selectbox("Diâmetro do cone (mm)", [4.0, 5.0, 7.5, 10.0, 12.5, 15.0, 17.5, 20.0, 25.0, 30.0], index=3)
+            dose_prescrita = st.slider("Dose prescrita (Gy)", 10.0, 30.0, 18.0, 1.0)
+            nivel_prescricao = st.slider("Isodose de prescrição (%)", 50, 95, 80, 5)
+
+        with col2:
+            st.markdown("**🔄 Arcos:**")
+            n_arcos = st.slider("Número de arcos", 1, 9, 5)
+            extensao_arco = st.slider("Extensão de cada arco (graus)", 40, 160, 120, 10)
+            passo_arco = st.slider("Amostragem angular (graus)", 2.0, 10.0, 5.0, 1.0)
+            fator_refino = st.select_slider("Refinamento local", options=[2, 4, 8], value=4,
+                                            format_func=lambda f: f"{2.0 / f:.2f} mm")
+
+        # Arcos não coplanares distribuídos em ângulos de mesa entre -80° e 80°
+        angulos_mesa = np.linspace(-80, 80, n_arcos) if n_arcos > 1 else np.array([0.0])
+        arcos = [(mesa, 180 - extensao_arco / 2 - 90 * (i % 2), 180 + extensao_arco / 2 - 90 * (i % 2))
+                 for i, mesa in enumerate(angulos_mesa)]
+
+        if st.button("🎯 Calcular Radiocirurgia"):
+            direcoes = direcoes_arcos(arcos, passo_arco)
+            raio_alvo = diametro_alvo / 20
+            meia_largura = max(2.0, 2 * diametro_cone / 10)
+
+            inicio = time.perf_counter()
+            grade = grade_refinada_radiocirurgia(direcoes, diametro_cone / 10, meia_largura, 0.2, fator_refino,
+                                                 raio_alvo=raio_alvo)
+            indices = indices_radiocirurgia(grade, raio_alvo, nivel_prescricao / 100)
+            tempo_calc = time.perf_counter() - inicio
+
+            col_r1, col_r2, col_r3, col_r4 = st.columns(4)
+            with col_r1:
+                st.metric("Cobertura do alvo", f"{100 * indices['cobertura']:.1f}%")
+            with col_r2:
+                st.metric("CI (RTOG)", f"{indices['ci_rtog']:.2f}")
+            with col_r3:
+                st.metric("CI (Paddick)", f"{indices['ci_paddick']:.2f}")
+            with col_r4:
+                st.metric("GI (Paddick)", f"{indices['gi_paddick']:.2f}")
+
+            st.markdown(f"""
+            **Grade esparsa:** {grade['pontos_totais']:,} pontos calculados contra {grade['pontos_equivalentes']:,}
+            de uma grade uniforme de {10 * grade['passo_fino']:.2f} mm ({len(direcoes)} feixes, {tempo_calc:.1f} s).
+            **Dose máxima:** {dose_prescrita / (nivel_prescricao / 100):.1f} Gy
+            """)
+
+            # Plano axial central em resolução fina
+            x = np.linspace(-meia_largura, meia_largura, 241)
+            X, Y = np.meshgrid(x, x)
+            plano = np.column_stack([X.ravel(), Y.ravel(), np.zeros(X.size)])
+            dose_plano = dose_cones(plano, direcoes, diametro_cone / 10).reshape(X.shape)
+            dose_plano *= 100 / dose_plano.max()
+
+            fig_rc, (ax_rc1, ax_rc2) = plt.subplots(1, 2, figsize=(14, 6))
+
+            cf = ax_rc1.contourf(10 * X, 10 * Y, dose_plano, levels=30, cmap='jet')
+            cs = ax_rc1.contour(10 * X, 10 * Y, dose_plano, levels=[nivel_prescricao / 2, nivel_prescricao],
+                                colors='white', linewidths=1.5)
+            ax_rc1.clabel(cs, fmt="%.0f%%", fontsize=8)
+            ax_rc1.add_patch(plt.Circle((0, 0), 10 * raio_alvo, fill=False, color='lime', linestyle='--', label='Alvo'))
+            ax_rc1.set_xlabel("x (mm)")
+            ax_rc1.set_ylabel("y (mm)")
+            ax_rc1.set_title("Distribuição de Dose (plano axial)")
+            ax_rc1.set_aspect('equal')
+            ax_rc1.legend()
+            plt.colorbar(cf, ax=ax_rc1, label="Dose relativa (%)")
+
+            centro = len(x) // 2
+            ax_rc2.plot(10 * x, dose_plano[centro, :], 'b-', linewidth=2, label='Perfil lateral (x)')
+            ax_rc2.plot(10 * x, dose_plano[:, centro], 'r--', linewidth=2, label='Perfil AP (y)')
+            ax_rc2.axhline(y=nivel_prescricao, color='gray', linestyle=':', label='Isodose de prescrição')
+            ax_rc2.axvspan(-10 * raio_alvo, 10 * raio_alvo, color='lime', alpha=0.15, label='Alvo')
+            ax_rc2.set_xlabel("Posição (mm)")
+            ax_rc2.set_ylabel("Dose relativa (%)")
+            ax_rc2.set_title("Perfis de Dose")
+            ax_rc2.legend()
+            ax_rc2.grid(True)
+
+            plt.tight_layout()
+            st.pyplot(fig_rc)
+
+    elif aplicacao == "Imagem Diagnóstica":
+        st.markdown("### 🩻 Auditoria de Doses em Imagem Diagnóstica")
+
+        st.markdown("""
+        **Colunas do CSV:** `modalidade` (TC ou Radiografia), `protocolo`, e
+        - TC: `ctdivol` (mGy) e `dlp` (mGy·cm) ou `comprimento` (cm)
+        - Radiografia: `kvp`, `mas` e `dfp` (distância foco-pele, cm)
+        """)
+
+        arquivo_exames = st.file_uploader("Arquivo CSV de exames", type=["csv"])
+        if arquivo_exames is not None:
+            exames = pd.read_csv(arquivo_exames)
+        else:
+            n_sinteticos = st.slider("Exames sintéticos (sem arquivo)", 1000, 100000, 10000, 1000)
+            exames = gerar_exames_sinteticos(n_sinteticos)
+
+        faltantes = {"modalidade", "protocolo"} - set(exames.columns)
+        if faltantes:
+            st.error(f"Colunas obrigatórias ausentes: {', '.join(sorted(faltantes))}")
+            return
+
+        inicio = time.perf_counter()
+        resultado_exames = calcular_doses_exames(exames)
+        estatisticas = estatisticas_por_protocolo(resultado_exames)
+        tempo_calc = time.perf_counter() - inicio
+
+        col_i1, col_i2, col_i3, col_i4 = st.columns(4)
+        with col_i1:
+            st.metric("Exames", f"{len(resultado_exames):,}")
+        with col_i2:
+            st.metric("Dose coletiva", f"{resultado_exames['dose_efetiva'].sum() / 1000:.2f} Sv·pessoa")
+        with col_i3:
+            st.metric("Acima do NRD", f"{100 * resultado_exames['acima_nrd'].mean():.1f}%")
+        with col_i4:
+            st.metric("Protocolos desconhecidos", f"{(~resultado_exames['protocolo_conhecido']).sum()}")
+
+        st.dataframe(estatisticas.round(3), use_container_width=True)
+        st.markdown(f"*{len(resultado_exames):,} exames processados em {tempo_calc*1000:.0f} ms*")
+
+        fig_img, (ax_img1, ax_img2) = plt.subplots(1, 2, figsize=(14, 6))
+
+        rotulos = [f"{m}: {p}" for m, p in zip(estatisticas["modalidade"], estatisticas["protocolo"])]
+        validos = resultado_exames[resultado_exames["protocolo_conhecido"]]
+        grupos_dose = [g["dose_efetiva"].dropna().to_numpy() for _, g in validos.groupby(["modalidade", "protocolo"])]
+        ax_img1.boxplot(grupos_dose, vert=False, showfliers=False)
+        ax_img1.set_yticks(range(1, len(rotulos) + 1))
+        ax_img1.set_yticklabels(rotulos, fontsize=8)
+        ax_img1.set_xscale('log')
+        ax_img1.set_xlabel("Dose efetiva (mSv)")
+        ax_img1.set_title("Dose Efetiva por Protocolo")
+        ax_img1.grid(True, axis='x')
+
+        razao_p75 = estatisticas["indicador_p75"] / estatisticas["nrd"]
+        ax_img2.barh(rotulos, 100 * razao_p75, color=np.where(razao_p75 > 1, 'red', 'green'))
+        ax_img2.axvline(x=100, color='black', linestyle='--', label='NRD')
+        ax_img2.set_xlabel("3º quartil do indicador (% do NRD)")
+        ax_img2.set_title("Auditoria de Níveis de Referência")
+        ax_img2.tick_params(axis='y', labelsize=8)
+        ax_img2.legend()
+        ax_img2.grid(True, axis='x')
+
+        plt.tight_layout()
+        st.pyplot(fig_img)
+
+        st.download_button("📥 Baixar Doses por Exame", data=resultado_exames.to_csv(index=False),
+                          file_name="doses_imagem_diagnostica.csv", mime="text/csv",
+                          use_container_width=True)
+
     else:
         st.info(f"Módulo {aplicacao} em desenvolvimento.")
 
@@ -1234,6 +3309,264 @@ def modulo_aplicacoes_clinicas():
 # MÓDULO 6: APLICAÇÕES AMBIENTAIS
 # =============================================================================
 
+# Propriedades dos solos: densidade aparente (g/cm³), porosidade e dispersividade longitudinal (cm)
+SOLOS_MIGRACAO = {
+    "Argiloso": {"densidade": 1.4, "porosidade": 0.45, "dispersividade": 1.0},
+    "Arenoso": {"densidade": 1.6, "porosidade": 0.35, "dispersividade": 0.5},
+    "Orgânico": {"densidade": 1.0, "porosidade": 0.60, "dispersividade": 2.0},
+    "Misto": {"densidade": 1.5, "porosidade": 0.40, "dispersividade": 1.0}
+}
+
+# Coeficientes de distribuição sólido-líquido Kd (L/kg) por radioisótopo e solo (IAEA TRS-472)
+KD_SOLO = {
+    "Cs-137": {"Argiloso": 5500.0, "Arenoso": 530.0, "Orgânico": 270.0, "Misto": 1200.0},
+    "Sr-90": {"Argiloso": 110.0, "Arenoso": 22.0, "Orgânico": 150.0, "Misto": 52.0},
+    "I-131": {"Argiloso": 5.0, "Arenoso": 1.0, "Orgânico": 32.0, "Misto": 7.0},
+    "U-238": {"Argiloso": 1600.0, "Arenoso": 110.0, "Orgânico": 1200.0, "Misto": 310.0},
+    "Co-60": {"Argiloso": 550.0, "Arenoso": 60.0, "Orgânico": 990.0, "Misto": 300.0}
+}
+
+def parametros_migracao(isotopo, tipo_solo, umidade, fluxo_cm_dia, kd=None):
+    """Velocidade da água nos poros v = q/θ (cm/dia) a partir do fluxo de Darcy q, dispersividade (cm) e
+    fator de retardamento R = 1 + ρ·Kd/θ"""
+    solo = SOLOS_MIGRACAO[tipo_solo]
+    theta = np.clip(solo["porosidade"] * np.asarray(umidade, dtype=float) / 100, 0.05, solo["porosidade"])
+    kd = KD_SOLO[isotopo][tipo_solo] if kd is None else kd
+    return {"velocidade": np.asarray(fluxo_cm_dia, dtype=float) / theta, "dispersividade": solo["dispersividade"],
+            "retardamento": 1 + solo["densidade"] * np.asarray(kd, dtype=float) / theta}
+
+def _fatorar_tridiagonal(inferior, diagonal, superior):
+    """Eliminação de Thomas em lote (eixo 0: incógnitas, eixo 1: sistemas), reaproveitada a cada passo"""
+    reduzida = np.empty_like(diagonal)
+    inverso = np.empty_like(diagonal)
+    inverso[0] = 1 / diagonal[0]
+    reduzida[0] = superior[0] * inverso[0]
+    for i in range(1, len(diagonal)):
+        inverso[i] = 1 / (diagonal[i] - inferior[i] * reduzida[i - 1])
+        reduzida[i] = superior[i] * inverso[i]
+    return inferior, reduzida, inverso
+
+def _resolver_tridiagonal(fatores, lado_direito):
+    """Substituições progressiva e regressiva de Thomas para todos os sistemas de uma vez"""
+    inferior, reduzida, inverso = fatores
+    x = np.empty_like(lado_direito)
+    x[0] = lado_direito[0] * inverso[0]
+    for i in range(1, len(x)):
+        x[i] = (lado_direito[i] - inferior[i] * x[i - 1]) * inverso[i]
+    for i in range(len(x) - 2, -1, -1):
+        x[i] -= reduzida[i] * x[i + 1]
+    return x
+
+def migracao_solo(velocidade, dispersividade, retardamento, constante_decaimento, perfil_inicial, espessura_cm,
+                  tempos_d, passo_d=None, theta=0.5, passos_implicitos=2):
+    """Advecção–dispersão com sorção (Kd) e decaimento em colunas verticais de solo, todas resolvidas juntas:
+    volumes finitos com diferenças híbridas (centrais até Péclet 2), esquema θ implícito (Crank–Nicolson com
+    partida por Euler implícito) e sistemas tridiagonais fatorados uma única vez. Parâmetros por coluna (cm, dias);
+    topo sem fluxo e base com saída livre; o decaimento, uniforme, é aplicado exatamente"""
+    perfil_inicial = np.atleast_2d(np.asarray(perfil_inicial, dtype=float))
+    n_celulas = perfil_inicial.shape[1]
+    forma = np.broadcast(np.atleast_1d(velocidade), dispersividade, retardamento, constante_decaimento,
+                         perfil_inicial[:, 0]).shape
+    velocidade, dispersividade, retardamento, lam = (np.broadcast_to(np.asarray(v, dtype=float), forma) for v in
+                                                     (velocidade, dispersividade, retardamento, constante_decaimento))
+    perfil = np.broadcast_to(perfil_inicial, (len(velocidade), n_celulas)).T.copy()
+
+    # Coeficientes efetivos (divididos por R) e pesos de montante para manter a matriz monótona
+    dz = espessura_cm / n_celulas
+    u = velocidade / retardamento
+    k = dispersividade * velocidade / retardamento / dz ** 2
+    s = u / dz
+    peclet = dz / np.maximum(dispersividade, 1e-12)
+    montante = np.clip(1 - 2 / np.maximum(peclet, 1e-12), 0.0, 1.0)
+    p, q = (1 + montante) / 2, (1 - montante) / 2
+    inferior = np.tile(s * p + k, (n_celulas, 1))
+    superior = np.tile(k - s * q, (n_celulas, 1))
+    diagonal = np.zeros((n_celulas, len(u)))
+    diagonal[1:] += s * q - k
+    diagonal[:-1] -= s * p + k
+    diagonal[-1] -= s
+    inferior[0] = 0.0
+    superior[-1] = 0.0
+
+    tempos_d = np.atleast_1d(np.asarray(tempos_d, dtype=float))
+    horizonte = float(tempos_d.max())
+    n_passos = max(int(math.ceil(horizonte / passo_d)) if passo_d else 400, 1)
+    dt = horizonte / n_passos if horizonte > 0 else 1.0
+    saidas = np.rint(tempos_d / dt).astype(int)
+
+    # (I − θ·dt·L) C(n+1) = (I + (1 − θ)·dt·L) C(n): fatoração implícita e diagonais explícitas por valor de θ
+    esquemas = {}
+    def esquema(peso):
+        if peso not in esquemas:
+            explicito = (1 - peso) * dt
+            esquemas[peso] = (_fatorar_tridiagonal(-peso * dt * inferior, 1 - peso * dt * diagonal, -peso * dt * superior),
+                              explicito * inferior[1:], 1 + explicito * diagonal, explicito * superior[:-1])
+        return esquemas[peso]
+
+    perfis = np.empty((len(tempos_d), len(u), n_celulas))
+    lixiviado = np.zeros((len(tempos_d), len(u)))
+    acumulado = np.zeros(len(u))
+    for j in np.flatnonzero(saidas == 0):
+        perfis[j] = perfil.T
+    for passo in range(1, n_passos + 1):
+        peso = 1.0 if passo <= passos_implicitos else theta
+        fatores, inferior_explicito, diagonal_explicita, superior_explicito = esquema(peso)
+        anterior = perfil
+        lado_direito = perfil
+        if peso < 1:
+            lado_direito = diagonal_explicita * perfil
+            lado_direito[1:] += inferior_explicito * perfil[:-1]
+            lado_direito[:-1] += superior_explicito * perfil[1:]
+        perfil = _resolver_tridiagonal(fatores, lado_direito)
+        # Fluxo pela base consistente com o esquema, descontado o decaimento no meio do passo
+        acumulado += dt * u * (peso * perfil[-1] + (1 - peso) * anterior[-1]) * np.exp(-lam * (passo - 0.5) * dt)
+        for j in np.flatnonzero(saidas == passo):
+            perfis[j] = perfil.T * np.exp(-lam * passo * dt)[:, None]
+            lixiviado[j] = acumulado
+
+    z = (np.arange(n_celulas) + 0.5) * dz
+    inventario = perfis.sum(axis=2) * dz
+    return {"z": z, "tempos": saidas * dt, "perfis": perfis, "inventario": inventario, "lixiviado": lixiviado,
+            "inventario_inicial": perfil_inicial.sum(axis=1) * dz}
+
+# Dados para águas superficiais: meia-vida (dias), Kd sedimento-água doce (L/kg, IAEA TRS-472) e nível de
+# orientação para água potável (Bq/L, OMS)
+NUCLIDEOS_AGUA = {
+    "Cs-137": {"meia_vida_d": 30.17 * 365.25, "kd": 2.9e4, "orientacao_bq_l": 10.0},
+    "Sr-90": {"meia_vida_d": 28.8 * 365.25, "kd": 190.0, "orientacao_bq_l": 10.0},
+    "I-131": {"meia_vida_d": 8.02, "kd": 4.4, "orientacao_bq_l": 10.0},
+    "Co-60": {"meia_vida_d": 5.27 * 365.25, "kd": 1.1e4, "orientacao_bq_l": 100.0},
+    "H-3": {"meia_vida_d": 12.32 * 365.25, "kd": 0.0, "orientacao_bq_l": 10000.0}
+}
+
+def rede_fluvial(n_trechos, comprimento_km, vazao, velocidade, dispersao, vazao_lateral=0.0, lagos=None):
+    """Rio em trechos (do montante à foz) com lagos intercalados. Cada lago é um dict com o trecho afluente
+    ("apos_trecho"), volume_m3, profundidade_m, solidos_kg_m3, sedimentacao_m_d, ressuspensao_d e soterramento_d;
+    vazões em m³/s (a lateral, sem contaminação, entra em cada trecho), dispersão longitudinal em m²/s"""
+    vazoes = vazao + vazao_lateral * np.arange(n_trechos)
+    areas = vazoes / velocidade
+    lagos = sorted(lagos or [], key=lambda lago: lago["apos_trecho"])
+    nomes = [f"Trecho {i + 1}" for i in range(n_trechos)]
+    for lago in lagos:
+        nomes += [f"Lago após o trecho {lago['apos_trecho'] + 1} (água)",
+                  f"Lago após o trecho {lago['apos_trecho'] + 1} (sedimento)"]
+    return {"n_trechos": n_trechos, "comprimento": comprimento_km * 1000.0, "vazoes": vazoes, "areas": areas,
+            "volumes": areas * comprimento_km * 1000.0, "dispersao": dispersao, "lagos": lagos, "nomes": nomes}
+
+def matriz_compartimentos(rede, nuclideo):
+    """Matriz de transferência A (1/dia) entre os inventários (Bq) dos trechos e das águas e sedimentos dos lagos,
+    montada a partir de listas de coordenadas (origem, destino, taxa); destino -1 é a saída do sistema"""
+    n = rede["n_trechos"]
+    dados = NUCLIDEOS_AGUA[nuclideo]
+    volumes, vazoes = rede["volumes"], rede["vazoes"]
+    agua_lago = {lago["apos_trecho"]: n + 2 * k for k, lago in enumerate(rede["lagos"])}
+    origens, destinos, taxas = [], [], []
+
+    def transferir(origem, destino, taxa):
+        origem = np.atleast_1d(origem)
+        origens.append(origem)
+        destinos.append(np.broadcast_to(destino, origem.shape))
+        taxas.append(np.broadcast_to(taxa, origem.shape))
+
+    # Advecção (de montante) para o trecho seguinte, o lago ou a foz e dispersão entre trechos vizinhos não
+    # separados por lago, descontada a dispersão numérica u·Δx/2 do esquema de montante
+    trechos = np.arange(n)
+    jusante = np.where(trechos + 1 < n, trechos + 1, -1)
+    for i, agua in agua_lago.items():
+        jusante[i] = agua
+    transferir(trechos, jusante, vazoes / volumes * 86400)
+    vizinhos = np.array([i for i in range(n - 1) if i not in agua_lago], dtype=int)
+    velocidades = vazoes[vizinhos] / rede["areas"][vizinhos]
+    dispersao = np.maximum(rede["dispersao"] - velocidades * rede["comprimento"] / 2, 0.0)
+    troca = dispersao * rede["areas"][vizinhos] / rede["comprimento"] * 86400
+    transferir(vizinhos, vizinhos + 1, troca / volumes[vizinhos])
+    transferir(vizinhos + 1, vizinhos, troca / volumes[vizinhos + 1])
+
+    # Lagos: vazão de saída, sedimentação da fração particulada (Kd), ressuspensão e soterramento
+    for lago in rede["lagos"]:
+        agua, sedimento = agua_lago[lago["apos_trecho"]], agua_lago[lago["apos_trecho"]] + 1
+        saida = lago["apos_trecho"] + 1 if lago["apos_trecho"] + 1 < n else -1
+        sorcao = dados["kd"] * 1e-3 * lago["solidos_kg_m3"]
+        transferir(agua, saida, vazoes[lago["apos_trecho"]] / lago["volume_m3"] * 86400)
+        transferir(agua, sedimento, lago["sedimentacao_m_d"] * sorcao / (1 + sorcao) / lago["profundidade_m"])
+        transferir(sedimento, agua, lago["ressuspensao_d"])
+        transferir(sedimento, -1, lago["soterramento_d"])
+
+    origens, destinos, taxas = (np.concatenate(v) for v in (origens, destinos, taxas))
+    n_estados = n + 2 * len(rede["lagos"])
+    matriz = -math.log(2) / dados["meia_vida_d"] * np.eye(n_estados)
+    np.add.at(matriz, (origens, origens), -taxas)
+    interno = destinos >= 0
+    np.add.at(matriz, (destinos[interno], origens[interno]), taxas[interno])
+    return matriz
+
+def _propagador_implicito(matriz, entrada, passo_d=1.0, max_subpassos=2 ** 16):
+    """Propagadores de um passo (M, g) de dy/dt = A·y + s·e com s constante no passo e e o compartimento de
+    entrada, y(t + passo) = M·y + g·s: K subpassos implícitos de Crank–Nicolson (K potência de 2 com
+    taxa·subpasso ≤ 1) compostos por quadraturas sucessivas"""
+    taxa_maxima = max(float(np.max(np.abs(np.diag(matriz)))), 1e-12)
+    n_dobras = int(np.clip(np.ceil(np.log2(taxa_maxima * passo_d)), 0, math.log2(max_subpassos)))
+    subpasso = passo_d / 2 ** n_dobras
+    n = len(matriz)
+    explicito = np.eye(n) + 0.5 * subpasso * matriz
+    impulso = np.zeros((n, 1))
+    impulso[entrada] = subpasso
+    solucao = np.linalg.solve(np.eye(n) - 0.5 * subpasso * matriz, np.hstack([explicito, impulso]))
+    propagador, fonte = solucao[:, :n], solucao[:, n]
+    for _ in range(n_dobras):
+        fonte = fonte + propagador @ fonte
+        propagador = propagador @ propagador
+    return propagador, fonte
+
+def _avancar_em_blocos(propagador, fonte, taxas, tamanho_bloco=64):
+    """Todos os estados de y(n+1) = M·y(n) + g·s(n), y(0) = 0, em lote de nuclídeos: recorrência grossa com M^B
+    entre inícios de bloco e, depois, os B passos internos de todos os blocos juntos em produtos matriz-matriz"""
+    n_nuclideos, n_estados, _ = propagador.shape
+    n_blocos = -(-(len(taxas) + 1) // tamanho_bloco)
+    fontes = np.zeros((n_blocos * tamanho_bloco, n_nuclideos))
+    fontes[:len(taxas)] = taxas
+    fontes = fontes.reshape(n_blocos, tamanho_bloco, n_nuclideos)
+
+    # Resposta ao fim de um bloco a cada passo da fonte, H[..., j] = M^(B-1-j)·g, e potência M^B
+    resposta = np.empty((n_nuclideos, n_estados, tamanho_bloco))
+    vetor = fonte
+    for j in range(tamanho_bloco - 1, -1, -1):
+        resposta[:, :, j] = vetor
+        vetor = np.matmul(propagador, vetor[:, :, None])[:, :, 0]
+    potencia = np.linalg.matrix_power(propagador, tamanho_bloco)
+
+    inicios = np.zeros((n_nuclideos, n_estados, n_blocos))
+    for bloco in range(1, n_blocos):
+        inicios[:, :, bloco] = (np.matmul(potencia, inicios[:, :, bloco - 1, None])[:, :, 0]
+                                + np.einsum("kej,jk->ke", resposta, fontes[bloco - 1]))
+
+    estados = np.empty((n_blocos, tamanho_bloco, n_nuclideos, n_estados))
+    atual = inicios
+    for passo in range(tamanho_bloco):
+        estados[:, passo] = atual.transpose(2, 0, 1)
+        atual = propagador @ atual + fonte[:, :, None] * fontes[:, passo].T[:, None, :]
+    return estados.reshape(-1, n_nuclideos, n_estados)[:len(taxas) + 1]
+
+def transporte_agua_superficial(rede, liberacoes, trecho_fonte=0, passo_d=1.0):
+    """Inventários (Bq) em cada passo de todos os compartimentos para liberações {nuclídeo: Bq/dia em cada passo}
+    no trecho da fonte, com propagadores fixos por nuclídeo e avanço no tempo em blocos"""
+    nuclideos = list(liberacoes)
+    taxas = np.stack([np.asarray(liberacoes[n], dtype=float) for n in nuclideos], axis=1)  # (passos, nuclídeos)
+    propagadores, fontes = zip(*(_propagador_implicito(matriz_compartimentos(rede, n), trecho_fonte, passo_d)
+                                 for n in nuclideos))
+    inventarios = _avancar_em_blocos(np.stack(propagadores), np.stack(fontes), taxas)
+
+    # Concentrações (Bq/L) nos trechos e águas dos lagos; sedimentos em Bq/m² de fundo
+    n = rede["n_trechos"]
+    concentracoes = inventarios[:, :, :n] / rede["volumes"] / 1000
+    lagos = {}
+    for k, lago in enumerate(rede["lagos"]):
+        area_fundo = lago["volume_m3"] / lago["profundidade_m"]
+        lagos[lago["apos_trecho"]] = {"agua_bq_l": inventarios[:, :, n + 2 * k] / lago["volume_m3"] / 1000,
+                                      "sedimento_bq_m2": inventarios[:, :, n + 2 * k + 1] / area_fundo}
+    return {"tempos_d": np.arange(len(taxas) + 1) * passo_d, "nuclideos": nuclideos, "inventarios": inventarios,
+            "concentracoes": concentracoes, "lagos": lagos}
+
 def modulo_aplicacoes_ambientais():
     st.header("🌍 Aplicações Ambientais da Radioatividade")
     
@@ -1264,7 +3597,9 @@ def modulo_aplicacoes_ambientais():
                                  ["Cs-137", "Sr-90", "I-131", "U-238", "Co-60"])
             atividade = st.number_input("Atividade (Bq/kg)", 
                                       min_value=0.1, value=1000.0, step=10.0)
-            profundidade = st.slider("Profundidade (cm)", 1, 100, 20, 1)
+            profundidade = st.slider("Profundidade (cm)", 1, 100, 20, 1,
+                                     help="Espessura da camada contaminada no início da simulação")
+            horizonte_anos = st.slider("Horizonte da simulação (anos)", 1, 100, 30, 1)
             
         with col2:
             st.markdown("**📊 Parâmetros do Solo:**")
@@ -1282,10 +3617,19 @@ def modulo_aplicacoes_ambientais():
             
             lambda_val = math.log(2) / (meia_vida * 365.25)  # dia⁻¹
             
-            # Fator de migração baseado no tipo de solo
+            # Infiltração (fluxo de Darcy) baseada no tipo de solo
             fatores_migracao = {"Argiloso": 0.1, "Arenoso": 0.3, "Orgânico": 0.2, "Misto": 0.15}
             taxa_migracao = fatores_migracao[tipo_solo] * (1 + umidade/100)
             
+            # Migração vertical numa coluna de 2 m com a camada contaminada no topo
+            parametros = parametros_migracao(isotopo, tipo_solo, umidade, taxa_migracao)
+            espessura = 200.0
+            z = (np.arange(200) + 0.5) * espessura / 200
+            perfil_inicial = np.where(z < profundidade, atividade, 0.0)
+            tempo_dias = np.linspace(0, horizonte_anos * 365.25, 100)
+            coluna = migracao_solo(parametros["velocidade"], parametros["dispersividade"], parametros["retardamento"], lambda_val,
+                                   perfil_inicial, espessura, tempo_dias)
+            
             st.markdown("---")
             st.markdown("### 📋 Resultados da Análise")
             
@@ -1296,8 +3640,10 @@ def modulo_aplicacoes_ambientais():
                 st.markdown(f'<div class="info-box"><h4>📉 Constante λ: <span style="color:#1976D2">{lambda_val:.3e} dia⁻¹</span></h4></div>', unsafe_allow_html=True)
             
             with col_res2:
-                st.markdown(f'<div class="info-box"><h4>🌊 Taxa migração: <span style="color:#1976D2">{taxa_migracao:.3f} cm/dia</span></h4></div>', unsafe_allow_html=True)
+                st.markdown(f'<div class="info-box"><h4>🌊 Infiltração: <span style="color:#1976D2">{taxa_migracao:.3f} cm/dia → {float(parametros["velocidade"]):.3f} cm/dia nos poros</span></h4></div>', unsafe_allow_html=True)
                 st.markdown(f'<div class="info-box"><h4>📏 Profundidade: <span style="color:#1976D2">{profundidade} cm</span></h4></div>', unsafe_allow_html=True)
+                st.markdown(f'<div class="info-box"><h4>🧲 Retardamento (Kd): <span style="color:#1976D2">R = {float(parametros["retardamento"]):,.0f} '
+                            f'→ {float(parametros["velocidade"] / parametros["retardamento"]) * 365.25:.3g} cm/ano</span></h4></div>', unsafe_allow_html=True)
             
             # Recomendações
             st.markdown("### 💡 Recomendações de Proteção")
@@ -1314,12 +3660,14 @@ def modulo_aplicacoes_ambientais():
             else:
                 st.success("✅ Contaminação baixa. Monitoramento de rotina.")
             
-            # Simulação temporal
-            tempo_dias = np.linspace(0, min(meia_vida * 365.25 * 2, 3650), 100)
+            # Simulação temporal: decaimento puro e atividade média na camada inicial com migração
             atividade_temporal = atividade * np.exp(-lambda_val * tempo_dias)
+            camada = coluna["perfis"][:, 0, z < profundidade].mean(axis=1)
             
             fig, ax = plt.subplots(figsize=(10, 6))
-            ax.plot(tempo_dias/365.25, atividade_temporal, 'r-', linewidth=2)
+            ax.plot(tempo_dias/365.25, atividade_temporal, 'r-', linewidth=2, label='Somente decaimento')
+            ax.plot(tempo_dias/365.25, np.maximum(camada, 1e-6), 'b-', linewidth=2,
+                   label=f'Camada 0–{profundidade} cm (decaimento + migração)')
             ax.axhline(y=1000, color='orange', linestyle='--', label='Limite alerta (1000 Bq/kg)')
             ax.axhline(y=100, color='green', linestyle='--', label='Limite seguro (100 Bq/kg)')
             
@@ -1331,6 +3679,149 @@ def modulo_aplicacoes_ambientais():
             ax.set_yscale('log')
             
             st.pyplot(fig)
+            
+            # Perfis em profundidade ao longo do tempo
+            fig_perfil, ax_perfil = plt.subplots(figsize=(10, 6))
+            for indice in np.linspace(0, len(tempo_dias) - 1, 5).astype(int):
+                ax_perfil.plot(coluna["perfis"][indice, 0], z, linewidth=2,
+                               label=f'{coluna["tempos"][indice] / 365.25:.1f} anos')
+            ax_perfil.invert_yaxis()
+            ax_perfil.set_xlabel("Atividade (Bq/kg)")
+            ax_perfil.set_ylabel("Profundidade (cm)")
+            ax_perfil.set_title(f"Perfil de {isotopo} no Solo {tipo_solo} (advecção–dispersão com Kd)")
+            ax_perfil.legend()
+            ax_perfil.grid(True)
+            st.pyplot(fig_perfil)
+            
+            lixiviado = coluna["lixiviado"][-1, 0] / coluna["inventario_inicial"][0] * 100
+            st.markdown(f"**Inventário remanescente em {horizonte_anos} anos:** "
+                        f"{coluna['inventario'][-1, 0] / coluna['inventario_inicial'][0] * 100:.1f}% — "
+                        f"**lixiviado abaixo de {espessura:.0f} cm:** {lixiviado:.2f}%")
+            
+            # Variabilidade na área: 1000 colunas com Kd e infiltração lognormais, resolvidas num único lote
+            st.markdown("### 🗺️ Perfis em Toda a Área")
+            rng = np.random.default_rng(0)
+            n_colunas = 1000
+            fluxos = taxa_migracao * rng.lognormal(0.0, 0.5, n_colunas)
+            area = parametros_migracao(isotopo, tipo_solo, umidade, fluxos,
+                                       kd=KD_SOLO[isotopo][tipo_solo] * rng.lognormal(0.0, 1.0, n_colunas))
+            inicio = time.perf_counter()
+            perfis_area = migracao_solo(area["velocidade"], area["dispersividade"], area["retardamento"], lambda_val,
+                                        perfil_inicial, espessura, [horizonte_anos * 365.25], passo_d=horizonte_anos * 365.25 / 200)
+            tempo_calc = time.perf_counter() - inicio
+            percentis = np.percentile(perfis_area["perfis"][0], [5, 50, 95], axis=0)
+            
+            fig_area, ax_area = plt.subplots(figsize=(10, 6))
+            ax_area.fill_betweenx(z, percentis[0], percentis[2], color='steelblue', alpha=0.3, label='Percentis 5–95%')
+            ax_area.plot(percentis[1], z, 'b-', linewidth=2, label='Mediana')
+            ax_area.invert_yaxis()
+            ax_area.set_xlabel("Atividade (Bq/kg)")
+            ax_area.set_ylabel("Profundidade (cm)")
+            ax_area.set_title(f"Perfis de {n_colunas} colunas em {horizonte_anos} anos")
+            ax_area.legend()
+            ax_area.grid(True)
+            st.pyplot(fig_area)
+            
+            fracao_lixiviada = perfis_area["lixiviado"][0] / perfis_area["inventario_inicial"][0] * 100
+            st.markdown(f"**{n_colunas} colunas** calculadas em {tempo_calc:.2f} s — lixiviado abaixo de {espessura:.0f} cm: "
+                        f"mediana {np.median(fracao_lixiviada):.2f}%, percentil 95 {np.percentile(fracao_lixiviada, 95):.2f}%")
+    
+    elif cenario == "Contaminação da Água":
+        st.markdown("### 💧 Contaminação da Água")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("**☢️ Liberação no Rio:**")
+            nuclideos = st.multiselect("Radioisótopos", list(NUCLIDEOS_AGUA), default=["Cs-137", "Sr-90"])
+            atividade_tbq = st.number_input("Atividade liberada (TBq)", min_value=0.01, value=10.0, step=1.0)
+            duracao_dias = st.slider("Duração da liberação (dias)", 1, 90, 10)
+            anos = st.slider("Período simulado (anos)", 1, 10, 5)
+            
+        with col2:
+            st.markdown("**🏞️ Rio e Lago:**")
+            n_trechos = st.slider("Número de trechos", 50, 500, 200, 10)
+            comprimento_km = st.slider("Comprimento de cada trecho (km)", 0.5, 5.0, 1.0, 0.5)
+            vazao = st.number_input("Vazão (m³/s)", min_value=1.0, value=100.0, step=10.0)
+            velocidade = st.slider("Velocidade média (m/s)", 0.1, 2.0, 0.5, 0.1)
+            dispersao = st.slider("Dispersão longitudinal (m²/s)", 10, 2000, 300, 10)
+            incluir_lago = st.checkbox("Incluir lago/reservatório", value=True)
+            trecho_lago = st.slider("Lago após o trecho", 1, n_trechos, n_trechos // 2)
+            volume_lago = st.number_input("Volume do lago (10⁶ m³)", min_value=1.0, value=500.0, step=50.0)
+        
+        if st.button("💧 Simular Transporte") and nuclideos:
+            lagos = []
+            if incluir_lago:
+                lagos.append({"apos_trecho": trecho_lago - 1, "volume_m3": volume_lago * 1e6, "profundidade_m": 10.0,
+                              "solidos_kg_m3": 0.02, "sedimentacao_m_d": 2.0, "ressuspensao_d": 1e-4,
+                              "soterramento_d": 2e-4})
+            rede = rede_fluvial(n_trechos, comprimento_km, vazao, velocidade, dispersao, lagos=lagos)
+            n_dias = int(anos * 365)
+            taxa = np.where(np.arange(n_dias) < duracao_dias, atividade_tbq * 1e12 / duracao_dias, 0.0)
+            
+            inicio = time.perf_counter()
+            resultado = transporte_agua_superficial(rede, {n: taxa for n in nuclideos})
+            tempo_calc = time.perf_counter() - inicio
+            
+            st.markdown("---")
+            st.markdown("### 📋 Resultados do Transporte")
+            st.markdown(f"**{n_trechos} trechos** ({n_trechos * comprimento_km:,.0f} km) e {n_dias:,} passos diários "
+                        f"simulados em {tempo_calc:.2f} s")
+            
+            anos_eixo = resultado["tempos_d"] / 365.25
+            foz = resultado["concentracoes"][:, :, -1]
+            linhas = []
+            for k, nuclideo in enumerate(nuclideos):
+                orientacao = NUCLIDEOS_AGUA[nuclideo]["orientacao_bq_l"]
+                linha = {"Radioisótopo": nuclideo, "Pico na foz (Bq/L)": foz[:, k].max(),
+                         "Dias acima da orientação OMS na foz": int(np.sum(foz[:, k] > orientacao))}
+                for lago in resultado["lagos"].values():
+                    linha["Pico no lago (Bq/L)"] = lago["agua_bq_l"][:, k].max()
+                    linha["Sedimento ao final (Bq/m²)"] = lago["sedimento_bq_m2"][-1, k]
+                linhas.append(linha)
+            st.dataframe(pd.DataFrame(linhas).style.format({c: "{:.3g}" for c in linhas[0] if "Bq" in c}),
+                         use_container_width=True)
+            
+            fig, (ax_foz, ax_lago) = plt.subplots(1, 2, figsize=(14, 5))
+            for k, nuclideo in enumerate(nuclideos):
+                linha = ax_foz.semilogy(anos_eixo, np.maximum(foz[:, k], 1e-9), linewidth=2, label=nuclideo)[0]
+                ax_foz.axhline(NUCLIDEOS_AGUA[nuclideo]["orientacao_bq_l"], color=linha.get_color(), linestyle='--', alpha=0.6)
+                for lago in resultado["lagos"].values():
+                    ax_lago.semilogy(anos_eixo, np.maximum(lago["agua_bq_l"][:, k], 1e-9), color=linha.get_color(),
+                                     linewidth=2, label=f'{nuclideo} (água, Bq/L)')
+                    ax_lago.semilogy(anos_eixo, np.maximum(lago["sedimento_bq_m2"][:, k], 1e-9), color=linha.get_color(),
+                                     linestyle=':', linewidth=2, label=f'{nuclideo} (sedimento, Bq/m²)')
+            ax_foz.set_xlabel("Tempo (anos)")
+            ax_foz.set_ylabel("Concentração (Bq/L)")
+            ax_foz.set_title("Concentração na Foz (tracejado: orientação OMS)")
+            ax_foz.set_ylim(bottom=1e-6)
+            ax_foz.legend()
+            ax_foz.grid(True, which='both', alpha=0.3)
+            ax_lago.set_xlabel("Tempo (anos)")
+            ax_lago.set_title("Lago: Água e Sedimento")
+            ax_lago.set_ylim(bottom=1e-6)
+            if resultado["lagos"]:
+                ax_lago.legend(fontsize=8)
+            ax_lago.grid(True, which='both', alpha=0.3)
+            plt.tight_layout()
+            st.pyplot(fig)
+            
+            # Concentração máxima ao longo do rio
+            distancias = (np.arange(n_trechos) + 0.5) * comprimento_km
+            fig_perfil, ax_perfil = plt.subplots(figsize=(12, 5))
+            for k, nuclideo in enumerate(nuclideos):
+                ax_perfil.semilogy(distancias, np.maximum(resultado["concentracoes"][:, k].max(axis=0), 1e-9),
+                                   linewidth=2, label=nuclideo)
+            for lago in lagos:
+                ax_perfil.axvline((lago["apos_trecho"] + 1) * comprimento_km, color='steelblue', linestyle='--',
+                                  label='Lago')
+            ax_perfil.set_xlabel("Distância da fonte (km)")
+            ax_perfil.set_ylabel("Concentração máxima (Bq/L)")
+            ax_perfil.set_title("Pico de Concentração ao Longo do Rio")
+            ax_perfil.set_ylim(bottom=1e-6)
+            ax_perfil.legend()
+            ax_perfil.grid(True, which='both', alpha=0.3)
+            st.pyplot(fig_perfil)
     
     else:
         st.info(f"Módulo {cenario} em desenvolvimento.")
@@ -1572,6 +4063,282 @@ def modulo_producao_pares():
 # MÓDULO 9: EXPOSIÇÃO OCUPACIONAL
 # =============================================================================
 
+class RegistroDosimetrico:
+    """Registro de leituras de dosímetros por trabalhador, com totais mensais e janelas móveis
+    (12 meses e 5 anos) mantidos incrementalmente a cada lote de leituras"""
+
+    def __init__(self, limite_anual=20.0, limite_5_anos=100.0, limite_ano_unico=50.0, fracao_alerta=0.8):
+        self.limite_anual = limite_anual
+        self.limite_5_anos = limite_5_anos
+        self.limite_ano_unico = limite_ano_unico
+        self.fracao_alerta = fracao_alerta
+
+        self.indice = {}
+        self.trabalhadores = []
+        self.mensal = np.zeros((0, 0))
+        self.mes_base = None
+        self.mes_atual = None
+        self.soma_12 = np.zeros(0)
+        self.soma_60 = np.zeros(0)
+        self.total = np.zeros(0)
+        self.leituras = 0
+
+    @staticmethod
+    def _numero_mes(datas):
+        meses = np.asarray(datas, dtype="datetime64[M]")
+        return meses.astype("int64")
+
+    def _indices_trabalhadores(self, trabalhadores):
+        codigos, inversos = np.unique(np.asarray(trabalhadores).astype(str), return_inverse=True)
+        for codigo in codigos:
+            if codigo not in self.indice:
+                self.indice[codigo] = len(self.trabalhadores)
+                self.trabalhadores.append(codigo)
+        return np.array([self.indice[c] for c in codigos], dtype=np.intp)[inversos]
+
+    def _garantir_capacidade(self, n_trabalhadores, primeiro_mes, ultimo_mes):
+        if self.mes_base is None:
+            self.mes_base = primeiro_mes
+        antes = max(self.mes_base - primeiro_mes, 0)
+        linhas, colunas = self.mensal.shape
+        colunas_necessarias = ultimo_mes - self.mes_base + 1 + antes
+        if n_trabalhadores > linhas or colunas_necessarias > colunas or antes:
+            # Crescimento geométrico para amortizar as cópias
+            nova = np.zeros((linhas if n_trabalhadores <= linhas else max(n_trabalhadores, 2 * linhas),
+                             colunas + antes if colunas_necessarias <= colunas + antes
+                             else max(colunas_necessarias, 2 * colunas)))
+            nova[:linhas, antes:antes + colunas] = self.mensal
+            self.mensal = nova
+            self.mes_base -= antes
+        if n_trabalhadores > len(self.total):
+            extra = n_trabalhadores - len(self.total)
+            self.soma_12 = np.concatenate([self.soma_12, np.zeros(extra)])
+            self.soma_60 = np.concatenate([self.soma_60, np.zeros(extra)])
+            self.total = np.concatenate([self.total, np.zeros(extra)])
+
+    def _janela(self, fim, meses):
+        """Soma das colunas mensais na janela (fim − meses, fim] a partir do histórico"""
+        inicio = max(fim - meses + 1 - self.mes_base, 0)
+        final = max(fim - self.mes_base + 1, 0)
+        return self.mensal[:len(self.total), inicio:final].sum(axis=1)
+
+    def _deslizar(self, novo_mes):
+        """Avança as janelas móveis subtraindo apenas os meses que saem delas"""
+        for soma, meses in ((self.soma_12, 12), (self.soma_60, 60)):
+            avanco = novo_mes - self.mes_atual
+            if avanco >= meses:
+                soma[:] = self._janela(novo_mes, meses)
+            else:
+                saem = self._janela(self.mes_atual - meses + avanco, avanco)
+                soma -= saem
+        self.mes_atual = novo_mes
+
+    def registrar(self, trabalhadores, datas, doses):
+        """Acrescenta um lote de leituras (mSv); não reprocessa o histórico já registrado"""
+        doses = np.asarray(doses, dtype=float)
+        if doses.size == 0:
+            return self
+        meses = self._numero_mes(datas)
+        linhas = self._indices_trabalhadores(trabalhadores)
+        self._garantir_capacidade(len(self.trabalhadores), int(meses.min()), int(meses.max()))
+
+        if self.mes_atual is None:
+            self.mes_atual = int(meses.max())
+        elif meses.max() > self.mes_atual:
+            self._deslizar(int(meses.max()))
+
+        np.add.at(self.mensal, (linhas, meses - self.mes_base), doses)
+        np.add.at(self.total, linhas, doses)
+        for soma, janela in ((self.soma_12, 12), (self.soma_60, 60)):
+            dentro = meses > self.mes_atual - janela
+            np.add.at(soma, linhas[dentro], doses[dentro])
+        self.leituras += doses.size
+        return self
+
+    def situacao(self):
+        """Totais por trabalhador e situação frente aos limites (20 mSv/ano em média de 5 anos, 50 mSv num ano)"""
+        alerta = self.fracao_alerta
+        estado = np.select(
+            [(self.soma_12 > self.limite_ano_unico) | (self.soma_60 > self.limite_5_anos),
+             self.soma_12 > self.limite_anual,
+             (self.soma_12 >= alerta * self.limite_anual) | (self.soma_60 >= alerta * self.limite_5_anos)],
+            ["Limite excedido", "Acima de 20 mSv/12 meses", "Próximo do limite"], default="Normal")
+        return pd.DataFrame({
+            "trabalhador": self.trabalhadores,
+            "dose_12_meses": self.soma_12,
+            "dose_5_anos": self.soma_60,
+            "media_anual_5_anos": self.soma_60 / 5,
+            "dose_total": self.total,
+            "situacao": estado
+        })
+
+    def sinalizados(self):
+        """Trabalhadores em alerta, ordenados pela dose dos últimos 12 meses"""
+        tabela = self.situacao()
+        return tabela[tabela["situacao"] != "Normal"].sort_values("dose_12_meses", ascending=False)
+
+    def historico(self, trabalhador):
+        """Série mensal de doses de um trabalhador"""
+        linha = self.indice[str(trabalhador)]
+        n_meses = self.mes_atual - self.mes_base + 1
+        meses = (self.mes_base + np.arange(n_meses)).astype("datetime64[M]")
+        return pd.DataFrame({"mes": meses, "dose": self.mensal[linha, :n_meses]})
+
+def gerar_leituras_dosimetros(n_trabalhadores=2000, anos=5, inicio="2020-01", semente=0):
+    """Leituras mensais sintéticas: doses log-normais por trabalhador, com um grupo de alta exposição"""
+    rng = np.random.default_rng(semente)
+    meses = np.datetime64(inicio, "M") + np.arange(12 * anos)
+    taxa = rng.lognormal(np.log(0.15), 0.8, n_trabalhadores)
+    alta = rng.random(n_trabalhadores) < 0.03
+    taxa[alta] *= 8
+
+    doses = taxa[:, None] * rng.lognormal(0.0, 0.5, (n_trabalhadores, len(meses)))
+    doses[doses < 0.1] = 0.0  # abaixo do nível de registro
+    return pd.DataFrame({
+        "trabalhador": np.repeat([f"T{i:05d}" for i in range(n_trabalhadores)], len(meses)),
+        "data": np.tile(meses, n_trabalhadores).astype("datetime64[D]"),
+        "dose_msv": doses.ravel().round(2)
+    })
+
+def taxa_dose_pontos(pontos, posicoes_fontes, taxas_1m, mascara=None, distancia_minima=0.3):
+    """Taxa de dose (µSv/h) em pontos (..., 2) pela lei do inverso do quadrado; mascara (..., S) seleciona as fontes"""
+    delta = np.asarray(pontos, dtype=float)[..., None, :] - np.asarray(posicoes_fontes, dtype=float)
+    distancia2 = np.maximum(np.einsum('...k,...k->...', delta, delta), distancia_minima ** 2)
+    contribuicao = np.asarray(taxas_1m, dtype=float) / distancia2
+    if mascara is not None:
+        contribuicao = contribuicao * mascara
+    return contribuicao.sum(axis=-1)
+
+def amostrar_segmentos(origens, destinos, velocidade=1.0, n_amostras=50):
+    """Pontos médios de n_amostras trechos por segmento (K, n, 2) e tempo de cada trecho (K,) em horas"""
+    origens = np.asarray(origens, dtype=float)
+    destinos = np.asarray(destinos, dtype=float)
+    fracao = (np.arange(n_amostras) + 0.5) / n_amostras
+    pontos = origens[..., None, :] + fracao[:, None] * (destinos - origens)[..., None, :]
+    comprimento = np.linalg.norm(destinos - origens, axis=-1)
+    return pontos, comprimento / velocidade / 3600.0 / n_amostras
+
+def mascara_fontes_etapas(etapas, n_fontes):
+    """Matriz (etapas × fontes) a partir da coluna 'fontes' ("todas" ou índices 1-based separados por vírgula)"""
+    mascara = np.zeros((len(etapas), n_fontes), dtype=bool)
+    for i, texto in enumerate(etapas["fontes"].astype(str)):
+        if texto.strip().lower() in ("todas", "", "nan"):
+            mascara[i] = True
+        else:
+            try:
+                indices = [int(v) - 1 for v in texto.replace(";", ",").split(",") if v.strip()]
+            except ValueError:
+                raise ValueError(f"Etapa {i + 1} ({etapas['nome'].iloc[i]}): a coluna 'fontes' deve ser \"todas\" "
+                                 f"ou índices separados por vírgula, não \"{texto}\".") from None
+            mascara[i, [j for j in indices if 0 <= j < n_fontes]] = True
+    return mascara
+
+def _doses_deslocamento(nos, fontes, velocidade, n_amostras=50):
+    """Dose individual (µSv) de caminhar entre todos os pares de nós (N × N), sem blindagem"""
+    pontos, dt = amostrar_segmentos(nos[:, None, :], nos[None, :, :], velocidade, n_amostras)
+    taxas = taxa_dose_pontos(pontos, fontes[["x", "y"]].to_numpy(), fontes["taxa_1m"].to_numpy())
+    return taxas.sum(axis=-1) * dt
+
+def dose_tarefa(etapas, fontes, entrada, ordem=None, velocidade=1.0, n_amostras=50):
+    """Doses individuais e coletivas (µSv) de cada etapa e dos deslocamentos entre etapas, partindo e voltando à entrada"""
+    ordem = np.arange(len(etapas)) if ordem is None else np.asarray(ordem)
+    etapas = etapas.iloc[ordem].reset_index(drop=True)
+    posicoes_fontes = fontes[["x", "y"]].to_numpy(dtype=float)
+    mascara = mascara_fontes_etapas(etapas, len(fontes))
+
+    posicoes = etapas[["x", "y"]].to_numpy(dtype=float)
+    transmissao = 0.5 ** etapas["camadas_semirredutoras"].to_numpy(dtype=float)
+    dose_trabalho = (taxa_dose_pontos(posicoes, posicoes_fontes, fontes["taxa_1m"].to_numpy(), mascara) *
+                     transmissao * etapas["duracao_h"].to_numpy(dtype=float))
+
+    # Trajetos: entrada → etapa 1 → ... → etapa n → entrada, todos amostrados de uma vez
+    rota = np.vstack([entrada, posicoes, entrada])
+    pontos, dt = amostrar_segmentos(rota[:-1], rota[1:], velocidade, n_amostras)
+    dose_caminho = taxa_dose_pontos(pontos, posicoes_fontes, fontes["taxa_1m"].to_numpy()).sum(axis=-1) * dt
+
+    trabalhadores = etapas["trabalhadores"].to_numpy(dtype=float)
+    equipe_trajeto = np.append(trabalhadores, trabalhadores[-1])
+    return pd.DataFrame({
+        "etapa": list(etapas["nome"]) + ["Saída"],
+        "dose_deslocamento": dose_caminho,
+        "dose_trabalho": np.append(dose_trabalho, 0.0),
+        "dose_individual": dose_caminho + np.append(dose_trabalho, 0.0),
+        "dose_coletiva": dose_caminho * equipe_trajeto + np.append(dose_trabalho * trabalhadores, 0.0)
+    })
+
+def _ordem_minima(custo_caminho, equipe):
+    """Ordem das etapas que minimiza a dose coletiva dos deslocamentos (nó 0 = entrada).
+    Held-Karp exato até 10 etapas; acima disso, vizinho mais próximo seguido de trocas 2-opt."""
+    n = len(equipe)
+    # custo[i, j] = ir do nó i ao nó j com a equipe da etapa j (j = 0 é a volta, equipe da etapa i)
+    custo = custo_caminho * np.append(0.0, equipe)[None, :]
+    custo[1:, 0] = custo_caminho[1:, 0] * equipe
+
+    def total(ordem):
+        nos = np.concatenate([[0], np.asarray(ordem) + 1, [0]])
+        return custo[nos[:-1], nos[1:]].sum()
+
+    if n <= 10:
+        melhor = {(1 << j, j): (custo[0, j + 1], None) for j in range(n)}
+        for tamanho in range(2, n + 1):
+            for subconjunto in range(1 << n):
+                if bin(subconjunto).count("1") != tamanho:
+                    continue
+                for j in range(n):
+                    if not subconjunto & (1 << j):
+                        continue
+                    anterior = subconjunto ^ (1 << j)
+                    candidatos = [(melhor[(anterior, i)][0] + custo[i + 1, j + 1], i)
+                                  for i in range(n) if anterior & (1 << i)]
+                    melhor[(subconjunto, j)] = min(candidatos)
+        cheio = (1 << n) - 1
+        _, ultimo = min((melhor[(cheio, j)][0] + custo[j + 1, 0], j) for j in range(n))
+        ordem, subconjunto = [], cheio
+        while ultimo is not None:
+            ordem.append(ultimo)
+            ultimo, subconjunto = melhor[(subconjunto, ultimo)][1], subconjunto ^ (1 << ultimo)
+        return np.array(ordem[::-1])
+
+    ordem, restantes, atual = [], set(range(n)), 0
+    while restantes:
+        proximo = min(restantes, key=lambda j: custo[atual, j + 1])
+        ordem.append(proximo)
+        restantes.remove(proximo)
+        atual = proximo + 1
+    melhorou = True
+    while melhorou:
+        melhorou = False
+        for i in range(n - 1):
+            for j in range(i + 1, n):
+                candidata = ordem[:i] + ordem[i:j + 1][::-1] + ordem[j + 1:]
+                if total(candidata) < total(ordem) - 1e-12:
+                    ordem, melhorou = candidata, True
+    return np.array(ordem)
+
+def otimizar_tarefa(etapas, fontes, entrada, raio_reposicionamento=0.0, velocidade=1.0, n_candidatos=9, n_amostras=50):
+    """Reposiciona cada etapa dentro do raio permitido (menor dose de trabalho) e reordena as etapas
+    para minimizar a dose coletiva; retorna (etapas otimizadas, ordem)"""
+    etapas = etapas.reset_index(drop=True).copy()
+    posicoes_fontes = fontes[["x", "y"]].to_numpy(dtype=float)
+    taxas_1m = fontes["taxa_1m"].to_numpy(dtype=float)
+
+    if raio_reposicionamento > 0:
+        eixo = np.linspace(-raio_reposicionamento, raio_reposicionamento, n_candidatos)
+        dx, dy = np.meshgrid(eixo, eixo)
+        dentro = dx ** 2 + dy ** 2 <= raio_reposicionamento ** 2
+        deslocamentos = np.column_stack([dx[dentro], dy[dentro]])
+
+        candidatos = etapas[["x", "y"]].to_numpy(dtype=float)[:, None, :] + deslocamentos[None, :, :]
+        mascara = mascara_fontes_etapas(etapas, len(fontes))[:, None, :]
+        taxas = taxa_dose_pontos(candidatos, posicoes_fontes, taxas_1m, mascara)
+        escolha = np.argmin(taxas, axis=1)
+        etapas[["x", "y"]] = candidatos[np.arange(len(etapas)), escolha]
+
+    nos = np.vstack([entrada, etapas[["x", "y"]].to_numpy(dtype=float)])
+    custo_caminho = _doses_deslocamento(nos, fontes, velocidade, n_amostras)
+    ordem = _ordem_minima(custo_caminho, etapas["trabalhadores"].to_numpy(dtype=float))
+    return etapas, ordem
+
 def modulo_exposicao_ocupacional():
     st.header("👨‍⚕️ Cálculo de Exposição Ocupacional")
     
@@ -1680,16 +4447,16 @@ def modulo_exposicao_ocupacional():
             st.markdown(f"- **Distância:** {distancia} m (fator: {1/(distancia**2):.3f})")
             st.markdown(f"- **Dose efetiva:** {dose_bruta_anual:,.0f} / {fator_protecao} / {distancia**2:.2f} = {dose_efetiva:,.0f} µSv")
         
-        # Gráfico de acumulação de dose
-        semanas = list(range(1, semanas_ano + 1))
-        dose_acumulada = []
-        for semana in semanas:
-            horas_semana = horas_dia * dias_semana
-            dose_semana = (taxa_dose * horas_semana) / fator_protecao / (distancia ** 2)
-            dose_acumulada.append(dose_semana * semana)
+        # Gráfico de acumulação de dose (agenda diária a partir da segunda-feira desta semana)
+        semanas = np.arange(1, semanas_ano + 1)
+        hoje = np.datetime64(datetime.now().date(), "D")
+        segunda = hoje - (hoje.astype("int64") + 3) % 7
+        dias_expostos, horas_expostas = horas_exposicao_diarias(segunda, 7 * semanas_ano, horas_dia, int(dias_semana))
+        doses_diarias = taxa_em_vigor(dias_expostos, taxa_dose) * horas_expostas / fator_protecao / (distancia ** 2)
+        doses_semanais_acumuladas = dose_acumulada(doses_diarias, np.arange(len(dias_expostos)) // 7)
         
         fig, ax = plt.subplots(figsize=(10, 6))
-        ax.plot(semanas, dose_acumulada, 'b-', linewidth=2, label='Dose acumulada')
+        ax.plot(semanas, doses_semanais_acumuladas, 'b-', linewidth=2, label='Dose acumulada')
         ax.axhline(y=limite, color='r', linestyle='--', label=f'Limite anual: {limite/1000:.0f} mSv')
         ax.axhline(y=limite*0.8, color='orange', linestyle=':', label='80% do limite')
         
@@ -1730,11 +4497,360 @@ RECOMENDAÇÕES:
                           file_name="exposicao_ocupacional.txt", 
                           mime="text/plain", use_container_width=True)
 
+    # Planejamento de tarefas por tempo, distância e blindagem
+    st.markdown("---")
+    st.markdown("### 🗺️ Planejador de Tarefas (Tempo, Distância e Blindagem)")
+    st.markdown("Coordenadas em metros; taxa de cada fonte a 1 m em µSv/h; `fontes` = \"todas\" ou índices (ex.: 1,3).")
+
+    fontes_padrao = pd.DataFrame({"nome": ["Fonte A", "Fonte B", "Tanque"], "x": [2.0, 8.0, 5.0],
+                                  "y": [3.0, 6.0, 9.0], "taxa_1m": [500.0, 200.0, 1000.0]})
+    etapas_padrao = pd.DataFrame({
+        "nome": ["Inspeção A", "Troca de filtro", "Leitura B", "Amostragem tanque", "Registro"],
+        "x": [3.0, 6.0, 8.5, 6.5, 1.0], "y": [3.5, 4.0, 5.0, 8.0, 8.0],
+        "duracao_h": [0.25, 0.5, 0.2, 0.3, 0.2], "camadas_semirredutoras": [0.0, 1.0, 0.0, 2.0, 0.0],
+        "fontes": ["todas", "todas", "todas", "todas", "todas"], "trabalhadores": [1, 2, 1, 2, 1]
+    })
+
+    col_plan1, col_plan2 = st.columns(2)
+    with col_plan1:
+        fontes_tarefa = st.data_editor(fontes_padrao, num_rows="dynamic", key="fontes_tarefa")
+        entrada_x = st.number_input("Entrada x (m)", value=0.0)
+        entrada_y = st.number_input("Entrada y (m)", value=0.0)
+    with col_plan2:
+        etapas_tarefa = st.data_editor(etapas_padrao, num_rows="dynamic", key="etapas_tarefa")
+        velocidade_marcha = st.slider("Velocidade de deslocamento (m/s)", 0.3, 2.0, 1.0, 0.1)
+        raio_reposicionamento = st.slider("Raio de reposicionamento permitido (m)", 0.0, 2.0, 0.5, 0.1)
+
+    if st.button("🗺️ Avaliar e Otimizar Tarefa", use_container_width=True):
+        fontes_tarefa = fontes_tarefa.dropna(subset=["x", "y", "taxa_1m"])
+        etapas_tarefa = etapas_tarefa.dropna(subset=["x", "y", "duracao_h"]).fillna(
+            {"camadas_semirredutoras": 0.0, "fontes": "todas", "trabalhadores": 1}).reset_index(drop=True)
+        if fontes_tarefa.empty or etapas_tarefa.empty:
+            st.error("Informe ao menos uma fonte e uma etapa.")
+            return
+        try:
+            mascara_fontes_etapas(etapas_tarefa, len(fontes_tarefa))
+        except ValueError as erro:
+            st.error(str(erro))
+            return
+
+        entrada = np.array([entrada_x, entrada_y])
+        inicio_plan = time.perf_counter()
+        original = dose_tarefa(etapas_tarefa, fontes_tarefa, entrada, velocidade=velocidade_marcha)
+        etapas_otim, ordem = otimizar_tarefa(etapas_tarefa, fontes_tarefa, entrada, raio_reposicionamento,
+                                             velocidade_marcha)
+        otimizada = dose_tarefa(etapas_otim, fontes_tarefa, entrada, ordem, velocidade_marcha)
+        tempo_plan = time.perf_counter() - inicio_plan
+
+        col_p1, col_p2, col_p3 = st.columns(3)
+        with col_p1:
+            st.metric("Dose coletiva original", f"{original['dose_coletiva'].sum():.1f} µSv·pessoa")
+        with col_p2:
+            st.metric("Dose coletiva otimizada", f"{otimizada['dose_coletiva'].sum():.1f} µSv·pessoa",
+                      delta=f"{otimizada['dose_coletiva'].sum() - original['dose_coletiva'].sum():.1f}",
+                      delta_color="inverse")
+        with col_p3:
+            st.metric("Maior dose individual", f"{otimizada['dose_individual'].max():.1f} µSv")
+
+        st.markdown(f"**Ordem otimizada:** {' → '.join(etapas_otim['nome'].iloc[ordem].astype(str))} "
+                    f"*(calculado em {tempo_plan*1000:.0f} ms)*")
+        st.dataframe(otimizada.round(2), use_container_width=True)
+
+        # Mapa de taxa de dose com as rotas original e otimizada
+        todos = np.vstack([fontes_tarefa[["x", "y"]].to_numpy(dtype=float), etapas_tarefa[["x", "y"]].to_numpy(dtype=float), entrada])
+        minimo, maximo = todos.min(axis=0) - 2, todos.max(axis=0) + 2
+        gx, gy = np.meshgrid(np.linspace(minimo[0], maximo[0], 200), np.linspace(minimo[1], maximo[1], 200))
+        mapa = taxa_dose_pontos(np.stack([gx, gy], axis=-1), fontes_tarefa[["x", "y"]].to_numpy(dtype=float),
+                                fontes_tarefa["taxa_1m"].to_numpy(dtype=float))
+
+        fig_plan, ax_plan = plt.subplots(figsize=(10, 8))
+        cf = ax_plan.contourf(gx, gy, np.log10(mapa), levels=30, cmap='YlOrRd')
+        plt.colorbar(cf, ax=ax_plan, label="log₁₀ taxa de dose (µSv/h)")
+        rota_original = np.vstack([entrada, etapas_tarefa[["x", "y"]].to_numpy(dtype=float), entrada])
+        rota_otimizada = np.vstack([entrada, etapas_otim[["x", "y"]].to_numpy(dtype=float)[ordem], entrada])
+        ax_plan.plot(rota_original[:, 0], rota_original[:, 1], 'b--o', label='Rota original')
+        ax_plan.plot(rota_otimizada[:, 0], rota_otimizada[:, 1], 'g-o', linewidth=2, label='Rota otimizada')
+        ax_plan.plot(fontes_tarefa["x"], fontes_tarefa["y"], 'k*', markersize=15, label='Fontes')
+        ax_plan.plot(*entrada, 'ks', markersize=10, label='Entrada')
+        ax_plan.set_xlabel("x (m)")
+        ax_plan.set_ylabel("y (m)")
+        ax_plan.set_title("Rotas de Trabalho sobre o Mapa de Taxa de Dose")
+        ax_plan.set_aspect('equal')
+        ax_plan.legend()
+
+        st.pyplot(fig_plan)
+
+    # Registro dosimétrico de leituras reais
+    st.markdown("---")
+    st.markdown("### 📒 Registro Dosimétrico")
+    st.markdown("CSV com colunas `trabalhador`, `data` e `dose_msv`; as leituras são acrescentadas ao registro por mês.")
+
+    if "registro_dosimetrico" not in st.session_state:
+        st.session_state.registro_dosimetrico = RegistroDosimetrico()
+    registro = st.session_state.registro_dosimetrico
+
+    col_reg1, col_reg2 = st.columns(2)
+    with col_reg1:
+        arquivo_leituras = st.file_uploader("Arquivo CSV de leituras", type=["csv"])
+    with col_reg2:
+        n_trab_sint = st.slider("Trabalhadores (dados sintéticos)", 100, 10000, 2000, 100)
+        anos_sint = st.slider("Anos de histórico (dados sintéticos)", 1, 10, 5)
+
+    col_botao1, col_botao2 = st.columns(2)
+    with col_botao1:
+        importar = st.button("📥 Acrescentar Leituras", use_container_width=True)
+    with col_botao2:
+        if st.button("🗑️ Limpar Registro", use_container_width=True):
+            registro = st.session_state.registro_dosimetrico = RegistroDosimetrico()
+
+    if importar:
+        if arquivo_leituras is not None:
+            leituras = pd.read_csv(arquivo_leituras)
+        else:
+            leituras = gerar_leituras_dosimetros(n_trab_sint, anos_sint)
+        leituras["data"] = pd.to_datetime(leituras["data"]).to_numpy().astype("datetime64[M]")
+
+        inicio_reg = time.perf_counter()
+        for _, lote in leituras.groupby("data", sort=True):
+            registro.registrar(lote["trabalhador"].to_numpy(), lote["data"].to_numpy(), lote["dose_msv"].to_numpy())
+        st.success(f"{len(leituras):,} leituras acrescentadas em {time.perf_counter() - inicio_reg:.2f} s")
+
+    if registro.leituras:
+        situacao = registro.situacao()
+        col_s1, col_s2, col_s3, col_s4 = st.columns(4)
+        with col_s1:
+            st.metric("Trabalhadores", f"{len(situacao):,}")
+        with col_s2:
+            st.metric("Leituras", f"{registro.leituras:,}")
+        with col_s3:
+            st.metric("Próximos do limite", f"{(situacao['situacao'] == 'Próximo do limite').sum()}")
+        with col_s4:
+            st.metric("Acima de 20 mSv", f"{(situacao['situacao'].isin(['Acima de 20 mSv/12 meses', 'Limite excedido'])).sum()}")
+
+        st.markdown(f"**Mês de referência:** {np.datetime64(registro.mes_atual, 'M')}")
+        st.dataframe(registro.sinalizados().round(2), use_container_width=True)
+
+        fig_reg, (ax_reg1, ax_reg2) = plt.subplots(1, 2, figsize=(14, 5))
+        ax_reg1.hist(situacao["dose_12_meses"], bins=60, color='steelblue', edgecolor='black')
+        ax_reg1.axvline(x=registro.limite_anual, color='r', linestyle='--', label='20 mSv')
+        ax_reg1.axvline(x=registro.fracao_alerta * registro.limite_anual, color='orange', linestyle=':', label='Nível de alerta')
+        ax_reg1.set_yscale('log')
+        ax_reg1.set_xlabel("Dose nos últimos 12 meses (mSv)")
+        ax_reg1.set_ylabel("Trabalhadores")
+        ax_reg1.set_title("Distribuição de Doses")
+        ax_reg1.legend()
+
+        trabalhador_escolhido = situacao.sort_values("dose_12_meses").iloc[-1]["trabalhador"]
+        serie = registro.historico(trabalhador_escolhido)
+        ax_reg2.bar(serie["mes"], serie["dose"], width=25, color='gray', label='Dose mensal')
+        ax_reg2.plot(serie["mes"], serie["dose"].rolling(12, min_periods=1).sum(), 'r-', linewidth=2,
+                     label='Soma móvel de 12 meses')
+        ax_reg2.axhline(y=registro.limite_anual, color='r', linestyle='--')
+        ax_reg2.set_ylabel("Dose (mSv)")
+        ax_reg2.set_title(f"Histórico de {trabalhador_escolhido} (maior dose)")
+        ax_reg2.legend()
+        ax_reg2.grid(True)
+
+        plt.tight_layout()
+        st.pyplot(fig_reg)
+
 
 # =============================================================================
 # MÓDULO 10: CENÁRIOS HISTÓRICOS (COMPLETO)
 # =============================================================================
 
+# Motores de cálculo (pluma, vias, termos-fonte, cinética) em cenarios.py; aqui apenas a interface
+
+def exibir_pluma(resultado, titulo, campo=None, rotulo="Dose (µSv)", niveis=(1, 10, 100, 1000, 20000),
+                 receptor_km=None):
+    """Mapa em escala logarítmica e perfil ao longo do eixo da pluma"""
+    campo = resultado["dose"]["total"] if campo is None else campo
+    extensao = resultado["parametros"]["extensao_km"]
+    n = campo.shape[0]
+    maximo = float(np.max(campo))
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    if maximo > 0:
+        log_campo = np.log10(np.maximum(campo, maximo * 1e-6))
+        im = ax1.imshow(log_campo, origin='lower', extent=[-extensao, extensao, -extensao, extensao], cmap='inferno')
+        plt.colorbar(im, ax=ax1, label=f"log₁₀ {rotulo}")
+        niveis_validos = [v for v in niveis if maximo * 1e-6 < v < maximo]
+        if niveis_validos:
+            eixo = np.linspace(-extensao, extensao, n)
+            cs = ax1.contour(eixo, eixo, campo, levels=niveis_validos, colors='cyan', linewidths=1)
+            ax1.clabel(cs, fmt=lambda v: f"{v:g}", fontsize=8)
+    ax1.plot(0, 0, 'w^', markersize=10, label='Fonte')
+    if receptor_km is not None:
+        ax1.plot(*receptor_km, 'co', markersize=8, label='Receptor')
+    ax1.set_xlabel("Leste (km)")
+    ax1.set_ylabel("Norte (km)")
+    ax1.set_title(titulo)
+    ax1.legend(loc='upper right')
+
+    # Perfil no eixo da pluma: amostra a grade ao longo da direção do vento
+    p = resultado["parametros"]
+    para = math.radians(p["direcao"] + 180.0)
+    distancias = np.linspace(0, extensao, n // 2)
+    i = np.clip(np.round((distancias * math.cos(para) + extensao) / (2 * extensao) * (n - 1)).astype(int), 0, n - 1)
+    j = np.clip(np.round((distancias * math.sin(para) + extensao) / (2 * extensao) * (n - 1)).astype(int), 0, n - 1)
+    ax2.semilogy(distancias, np.maximum(campo[i, j], 1e-12), 'r-', linewidth=2)
+    ax2.set_xlabel("Distância a favor do vento (km)")
+    ax2.set_ylabel(rotulo)
+    ax2.set_title(f"Perfil no Eixo da Pluma (classe {p['classe']}, {p['velocidade']:.1f} m/s)")
+    ax2.grid(True, which='both')
+
+    plt.tight_layout()
+    st.pyplot(fig)
+
+def secao_puffs(cenario, totais, extensao_km=300.0, altura=300.0):
+    """Seção de liberação de vários dias com meteorologia horária (CSV local ou sintética)"""
+    st.markdown("---")
+    st.markdown("### 🌀 Liberação de Vários Dias (Puffs Lagrangianos)")
+    st.markdown("CSV meteorológico horário com `velocidade` (m/s), `direcao` (graus, de onde sopra) e, opcionalmente, "
+                "`classe`, `precipitacao` (mm/h) e `altura_mistura` (m).")
+
+    col_p1, col_p2 = st.columns(2)
+    with col_p1:
+        arquivo_met = st.file_uploader("Tabela meteorológica (CSV)", type=["csv"], key=f"met_{cenario}")
+        dias = st.slider("Duração simulada (dias)", 1, 15, 10, key=f"dias_{cenario}")
+    with col_p2:
+        puffs_hora = st.select_slider("Puffs por hora", options=[10, 50, 100, 200, 500, 1000], value=100,
+                                      key=f"puffs_{cenario}")
+        resolucao = st.select_slider("Resolução da grade", options=[150, 200, 300, 400], value=200,
+                                     key=f"grade_{cenario}")
+
+    if st.button("🌀 Simular Puffs", key=f"botao_puffs_{cenario}"):
+        meteorologia = ler_meteorologia(arquivo_met) if arquivo_met is not None else meteorologia_sintetica(24 * dias)
+        meteorologia = meteorologia.iloc[:24 * dias]
+        liberacao = perfil_liberacao(totais, len(meteorologia), cenario)
+
+        inicio = time.perf_counter()
+        resultado = simular_puffs(meteorologia, liberacao, altura, extensao_km, resolucao, puffs_hora)
+        tempo_calc = time.perf_counter() - inicio
+        resultado["parametros"] = {"extensao_km": extensao_km, "direcao": float(meteorologia["direcao"].iloc[0]),
+                                   "classe": "variável", "velocidade": float(meteorologia["velocidade"].mean())}
+        resultado["dose"] = dose_pluma(resultado["pluma"], 24.0 * dias)
+
+        retido = 100 * resultado["massa_final"] / resultado["massa_liberada"]
+        st.markdown(f"**{resultado['n_puffs']:,} puffs** em {tempo_calc:.1f} s — fração ainda no ar (ou fora da grade): "
+                    + ", ".join(f"{n}: {r:.0f}%" for n, r in zip(resultado["nuclideos"], retido)))
+
+        fig_met, ax_met = plt.subplots(figsize=(12, 4))
+        ax_met.bar(liberacao["hora"], liberacao[resultado["nuclideos"]].sum(axis=1) / 1e15, color='gray',
+                   label='Liberação (PBq/h)')
+        ax_met.set_xlabel("Hora")
+        ax_met.set_ylabel("Liberação (PBq/h)")
+        ax_vento = ax_met.twinx()
+        ax_vento.plot(meteorologia["hora"], meteorologia["direcao"], 'b.', markersize=3, label='Direção do vento')
+        ax_vento.set_ylabel("Direção (graus)")
+        ax_met.set_title("Liberação e Meteorologia Horária")
+        st.pyplot(fig_met)
+
+        exibir_pluma(resultado, f"Dose em {dias} dias (µSv)")
+
+def secao_varredura(cenario):
+    """Varredura de parâmetros do cenário selecionado com resumo de sensibilidade"""
+    st.markdown("---")
+    st.markdown("### 🔀 Varredura de Parâmetros")
+    st.markdown("Avalia todas as combinações das faixas abaixo para a liberação de referência do cenário "
+                "(dose em 7 dias num receptor no eixo da pluma).")
+
+    col_v1, col_v2 = st.columns(2)
+    with col_v1:
+        faixa_liberacao = st.slider("Fator sobre a liberação", 0.1, 10.0, (0.5, 2.0), key="varredura_liberacao")
+        faixa_distancia = st.slider("Distância (km)", 1, 300, (5, 100), key="varredura_distancia")
+        faixa_evacuacao = st.slider("Evacuação (horas após o início)", 1, 168, (4, 72), key="varredura_evacuacao")
+    with col_v2:
+        faixa_abrigo = st.slider("Fator de abrigo", 1.0, 20.0, (1.0, 10.0), key="varredura_abrigo")
+        incluir_iodo = st.checkbox("Variar também o horário do iodeto (0–24 h)", key="varredura_iodo")
+        n_pontos = st.slider("Valores por parâmetro", 3, 40, 15, key="varredura_pontos")
+
+    n_combinacoes = n_pontos ** (5 if incluir_iodo else 4)
+    excede = n_combinacoes > MAX_COMBINACOES_VARREDURA
+    if excede:
+        st.warning(f"{n_combinacoes:,} combinações excedem o limite de {MAX_COMBINACOES_VARREDURA:,}: "
+                   "reduza os valores por parâmetro ou não varie o horário do iodeto.")
+
+    if st.button("🔀 Executar Varredura", key="botao_varredura", disabled=excede):
+        faixas = {
+            "liberacao": np.geomspace(*faixa_liberacao, n_pontos),
+            "distancia_km": np.geomspace(*faixa_distancia, n_pontos),
+            "evacuacao_h": np.linspace(*faixa_evacuacao, n_pontos),
+            "abrigo": np.linspace(*faixa_abrigo, n_pontos)
+        }
+        if incluir_iodo:
+            faixas["iodo_h"] = np.linspace(0.0, 24.0, n_pontos)
+
+        inicio = time.perf_counter()
+        tabela = varredura_cenario(cenario, faixas)
+        st.session_state.varredura = {"cenario": cenario, "tabela": tabela, "tempo": time.perf_counter() - inicio}
+        st.session_state.pop("csv_varredura", None)
+
+    # Resultado mantido na sessão: preparar o CSV não refaz a varredura
+    varredura = st.session_state.get("varredura")
+    if varredura is not None and varredura["cenario"] == cenario:
+        tabela = varredura["tabela"]
+        st.markdown(f"**{len(tabela):,} combinações** avaliadas em {varredura['tempo']:.2f} s")
+
+        resumo = resumo_tornado(tabela)
+        if not resumo.empty:
+            fig_t, ax_t = plt.subplots(figsize=(10, 4))
+            posicoes = np.arange(len(resumo))
+            base = resumo["dose_base"].iloc[0] / 1000
+            ax_t.barh(posicoes, resumo["dose_no_min"] / 1000 - base, left=base, color='steelblue', label='Valor mínimo da faixa')
+            ax_t.barh(posicoes, resumo["dose_no_max"] / 1000 - base, left=base, color='indianred', label='Valor máximo da faixa')
+            ax_t.axvline(base, color='black', linewidth=1)
+            ax_t.set_yticks(posicoes)
+            ax_t.set_yticklabels(resumo["parametro"])
+            ax_t.set_xlabel("Dose em 7 dias (mSv)")
+            ax_t.set_title(f"Diagrama de Tornado - {cenario}")
+            ax_t.legend()
+            st.pyplot(fig_t)
+
+        st.dataframe(tabela.replace(np.inf, np.nan).describe().T.style.format("{:.3g}"), use_container_width=True)
+
+        # Serializar a tabela completa leva mais que a própria varredura: só sob demanda
+        if st.button(f"📦 Preparar CSV ({len(tabela):,} linhas)", key="preparar_csv_varredura"):
+            st.session_state.csv_varredura = tabela.to_csv(index=False, float_format="%.4g")
+        if "csv_varredura" in st.session_state:
+            st.download_button("📥 Baixar resultados (CSV)", data=st.session_state.csv_varredura,
+                               file_name=f"varredura_{cenario}.csv", mime="text/csv", key="download_varredura")
+
+def secao_termo_fonte(cenario):
+    """Seção com o termo-fonte do cenário por nuclídeo, cronologia da liberação e decaimento da mistura"""
+    st.markdown("---")
+    st.markdown("### 🧪 Termo-Fonte por Nuclídeo")
+    inicial = TERMOS_FONTE.loc[cenario]
+    liberado = termo_fonte(cenario)
+    tabela = pd.DataFrame({
+        "Meia-vida (dias)": [NUCLIDEOS_PLUMA[n]["meia_vida_s"] / 86400 for n in inicial.index],
+        "No início do acidente (PBq)": inicial / 1e15,
+        "Liberado (PBq)": [liberado.get(n, 0.0) / 1e15 for n in inicial.index]
+    }, index=inicial.index)
+    st.dataframe(tabela.loc[inicial > 0].style.format("{:.3g}"), use_container_width=True)
+
+    # Decaimento da mistura liberada em todos os instantes numa única operação
+    tempos_d = np.geomspace(1 / 24, 365 * 50, 300)
+    nuclideos = list(liberado)
+    decaidas = decair_atividades([liberado[n] for n in nuclideos], tempos_d * 86400, _vetores_nuclideos(nuclideos)[0])
+
+    fig_tf, (ax_perfil, ax_decai) = plt.subplots(1, 2, figsize=(12, 4))
+    fracoes = PERFIS_LIBERACAO.get(cenario, [1.0])
+    ax_perfil.bar(np.arange(1, len(fracoes) + 1), np.asarray(fracoes) * 100, color='gray')
+    ax_perfil.set_xlabel("Dia da liberação")
+    ax_perfil.set_ylabel("Fração da liberação total (%)")
+    ax_perfil.set_title("Cronologia da Liberação")
+    for k, nuclideo in enumerate(nuclideos):
+        ax_decai.loglog(tempos_d, decaidas[:, k] / 1e15, label=nuclideo)
+    ax_decai.loglog(tempos_d, decaidas.sum(axis=1) / 1e15, 'k--', linewidth=2, label='Total')
+    ax_decai.set_xlabel("Tempo após a liberação (dias)")
+    ax_decai.set_ylabel("Atividade (PBq)")
+    ax_decai.set_title("Decaimento da Mistura Liberada")
+    ax_decai.legend(fontsize=8)
+    ax_decai.grid(True, which='both', alpha=0.3)
+    plt.tight_layout()
+    st.pyplot(fig_tf)
+
 def modulo_cenarios_historicos():
     st.header("📜 Simulação de Cenários Históricos")
     
@@ -1774,6 +4890,9 @@ def modulo_cenarios_historicos():
         simulacao_windscale()
     elif evento == "Tokaimura (1999)":
         simulacao_tokaimura()
+    
+    secao_termo_fonte(evento.split(" (")[0])
+    secao_varredura(evento.split(" (")[0])
 
 def simulacao_chernobyl():
     st.markdown("### ☢️ Acidente de Chernobyl (1986)")
@@ -1806,16 +4925,9 @@ def simulacao_chernobyl():
                                index=0)
     
     if st.button("📊 Simular Impacto de Chernobyl"):
-        # Cálculos simplificados
-        dose_1h = (liberacao * 1000) / (distancia ** 2)  # µSv/h a 1 km
-        dose_total = dose_1h * tempo_exposicao / abrigo
-        
-        # Redução por evacuação
-        fatores_evac = {
-            "Imediata": 0.1, "1 dia": 0.3, "3 dias": 0.6, 
-            "1 semana": 0.8, "Nenhuma": 1.0
-        }
-        dose_total *= fatores_evac[evacuacao]
+        resultado = executar_chernobyl(ParametrosChernobyl(liberacao, distancia, tempo_exposicao, abrigo, evacuacao))
+        resultado_pluma = resultado.pluma
+        dose_total = resultado.dose_total
         
         st.markdown("---")
         st.markdown("### 📊 Resultados da Simulação")
@@ -1827,21 +4939,14 @@ def simulacao_chernobyl():
             st.markdown(f'<div class="info-box"><h4>📏 Equivalente: <span style="color:#1976D2">{dose_total/1000:.1f} mSv</span></h4></div>', unsafe_allow_html=True)
         
         with col_res2:
-            if dose_total < 1000:
-                risco = "Muito baixo"
-                cor = "green"
-            elif dose_total < 10000:
-                risco = "Baixo"
-                cor = "orange"
-            elif dose_total < 50000:
-                risco = "Moderado" 
-                cor = "red"
-            else:
-                risco = "Alto"
-                cor = "darkred"
+            risco = resultado.risco
+            cor = cor_risco("Chernobyl", risco)
             
             st.markdown(f'<div class="warning-box"><h4>⚠️ Nível de risco: <span style="color:{cor}">{risco}</span></h4></div>', unsafe_allow_html=True)
         
+        st.markdown("**Dose por via:** " + ", ".join(f"{via} {resultado.vias[via] / 1000:.2f} mSv"
+                                                     for via in ("nuvem", "solo", "inalacao", "ingestao")))
+        
         # Efeitos na saúde
         st.markdown("### 👨‍⚕️ Possíveis Efeitos na Saúde")
         
@@ -1861,9 +4966,9 @@ def simulacao_chernobyl():
             st.markdown("- Danos aos órgãos hematopoiéticos")
             st.markdown("- Tratamento médico imediato necessário")
         
-        # Mapa de contaminação simulado
-        distancias = np.linspace(1, 300, 100)
-        doses_map = (liberacao * 1000) / (distancias ** 2) * 24 / abrigo
+        # Perfil de dose no eixo da pluma
+        distancias = resultado.extras["distancias"]
+        doses_map = resultado.extras["perfil"]
         
         fig, ax = plt.subplots(figsize=(10, 6))
         ax.plot(distancias, doses_map/1000, 'r-', linewidth=2)  # Convertendo para mSv
@@ -1880,6 +4985,10 @@ def simulacao_chernobyl():
         
         st.pyplot(fig)
         
+        exibir_pluma(resultado_pluma, f"Dose em {tempo_exposicao} h sem proteção (µSv)",
+                     receptor_km=(distancia * math.sin(math.radians(resultado_pluma["parametros"]["direcao"] + 180)),
+                                  distancia * math.cos(math.radians(resultado_pluma["parametros"]["direcao"] + 180))))
+        
         # Informações históricas
         st.markdown("### 📜 Informações Históricas")
         st.markdown("""
@@ -1907,6 +5016,8 @@ def simulacao_chernobyl():
         4. **Comunicação internacional** - Criação da Escala INES e protocolos de notificação
         5. **Monitoramento ambiental** - Sistemas aprimorados de detecção e monitoramento
         """)
+    
+    secao_puffs("Chernobyl", termo_fonte("Chernobyl", liberacao / 5200, ("Cs-137", "I-131"), decaido=False))
 
 def simulacao_fukushima():
     st.markdown("### ☢️ Acidente de Fukushima Daiichi (2011)")
@@ -1942,46 +5053,34 @@ def simulacao_fukushima():
                                    index=0)
     
     if st.button("📊 Simular Impacto de Fukushima"):
-        # Cálculos baseados em modelos reais de Fukushima
-        dose_1d = (liberacao * 800) / (distancia ** 1.5)  # µSv/dia a 1 km
-        dose_total = dose_1d * tempo_exposicao
-        
-        # Reduções por proteção
-        fatores_evac = {"Imediata": 0.2, "3 dias": 0.4, "1 semana": 0.6, "2 semanas": 0.8, "Nenhuma": 1.0}
-        dose_total *= fatores_evac[evacuacao]
-        
-        if iodo:
-            dose_total *= 0.7  # Redução de 30% com iodeto de potássio
-            
-        if vento_direcao == "Para o mar":
-            dose_total *= 0.3  # 70% da contaminação foi para o oceano
-        elif vento_direcao == "Mista":
-            dose_total *= 0.7
+        resultado = executar_fukushima(ParametrosFukushima(liberacao, distancia, tempo_exposicao, evacuacao, iodo,
+                                                           vento_direcao))
+        resultado_pluma = resultado.pluma
+        dose_total = resultado.dose_total
         
         st.markdown("---")
         st.markdown("### 📊 Resultados da Simulação")
         
-        col_res1, col_res2 = st.columns(2)
-        
-        with col_res1:
-            st.markdown(f'<div class="result-box"><h4>📈 Dose estimada: <span style="color:#d32f2f">{dose_total:,.0f} µSv</span></h4></div>', unsafe_allow_html=True)
-            st.markdown(f'<div class="info-box"><h4>📏 Equivalente: <span style="color:#1976D2">{dose_total/1000:.1f} mSv</span></h4></div>', unsafe_allow_html=True)
-        
-        with col_res2:
-            if dose_total < 10000:
-                risco = "Muito baixo"
-                cor = "green"
-            elif dose_total < 50000:
-                risco = "Baixo" 
-                cor = "orange"
-            elif dose_total < 100000:
-                risco = "Moderado"
-                cor = "red"
-            else:
-                risco = "Alto"
-                cor = "darkred"
+        azimute = resultado.extras["azimute"]
+        if not resultado.extras["pluma_em_terra"]:
+            st.info(f"🌊 Com o vento para o mar, a pluma não passa sobre terra: nenhuma localidade a {distancia} km "
+                    "recebe dose significativa da liberação.")
+        else:
+            col_res1, col_res2 = st.columns(2)
             
-            st.markdown(f'<div class="warning-box"><h4>⚠️ Nível de risco: <span style="color:{cor}">{risco}</span></h4></div>', unsafe_allow_html=True)
+            with col_res1:
+                st.markdown(f'<div class="result-box"><h4>📈 Dose estimada: <span style="color:#d32f2f">{dose_total:,.0f} µSv</span></h4></div>', unsafe_allow_html=True)
+                st.markdown(f'<div class="info-box"><h4>📏 Equivalente: <span style="color:#1976D2">{dose_total/1000:.1f} mSv</span></h4></div>', unsafe_allow_html=True)
+            
+            with col_res2:
+                risco = resultado.risco
+                cor = cor_risco("Fukushima", risco)
+                
+                st.markdown(f'<div class="warning-box"><h4>⚠️ Nível de risco: <span style="color:{cor}">{risco}</span></h4></div>', unsafe_allow_html=True)
+            
+            st.markdown(f"**Localidade mais exposta:** {distancia} km da usina, azimute {azimute:.0f}°")
+            st.markdown("**Dose por via:** " + ", ".join(f"{via} {resultado.vias[via] / 1000:.2f} mSv"
+                                                         for via in ("nuvem", "solo", "inalacao", "ingestao")))
         
         # Comparação com dados reais
         st.markdown("### 📊 Comparação com Dados Reais de Fukushima")
@@ -1996,9 +5095,9 @@ def simulacao_fukushima():
         df_reais = pd.DataFrame(dados_reais)
         st.dataframe(df_reais.style.format({"Dose 1º ano (mSv)": "{:.1f}", "Dose 4 anos (mSv)": "{:.1f}"}))
         
-        # Mapa de contaminação
-        distancias = np.linspace(1, 200, 100)
-        doses_map = (liberacao * 800) / (distancias ** 1.5) * 90  # 90 dias
+        # Perfil de dose na direção da localidade mais exposta
+        distancias = resultado.extras["distancias"]
+        doses_map = resultado.extras["perfil"]
         
         fig, ax = plt.subplots(figsize=(10, 6))
         ax.plot(distancias, doses_map/1000, 'r-', linewidth=2)  # Convertendo para mSv
@@ -2007,14 +5106,17 @@ def simulacao_fukushima():
         ax.axhline(y=20, color='green', linestyle='--', label='Limite de evacuação (20 mSv/ano)')
         
         ax.set_xlabel("Distância da Usina (km)")
-        ax.set_ylabel("Dose em 90 dias (mSv)")
-        ax.set_title("Perfil de Dose - Acidente de Fukushima")
+        ax.set_ylabel(f"Dose em {tempo_exposicao} dias (mSv)")
+        ax.set_title(f"Perfil de Dose - Acidente de Fukushima (azimute {azimute:.0f}°)")
         ax.legend()
         ax.grid(True)
         ax.set_yscale('log')
         
         st.pyplot(fig)
         
+        exibir_pluma(resultado_pluma, f"Dose em {tempo_exposicao} dias sem proteção (µSv)",
+                     receptor_km=(distancia * math.sin(math.radians(azimute)), distancia * math.cos(math.radians(azimute))))
+        
         # Informações históricas
         st.markdown("### 📜 Informações Históricas")
         st.markdown("""
@@ -2042,6 +5144,9 @@ def simulacao_fukushima():
         4. **Preparação para acidentes severos** - Equipamentos móveis de emergência
         5. **Cooperação internacional** - Compartilhamento de expertise e recursos
         """)
+    
+    secao_puffs("Fukushima", termo_fonte("Fukushima", liberacao / 500, ("I-131", "Cs-137"), decaido=False),
+                extensao_km=150.0, altura=100.0)
 
 def simulacao_goiania():
     st.markdown("### ☢️ Acidente Radiológico de Goiânia (1987)")
@@ -2075,24 +5180,9 @@ def simulacao_goiania():
         lavagem = st.checkbox("Higiene pessoal adequada", value=False)
     
     if st.button("📊 Simular Impacto de Goiânia"):
-        # Cálculos baseados no acidente real
-        if tipo_exposicao == "Contato direto":
-            dose_diaria = atividade_fonte * 1000  # µSv/dia para contato próximo
-        elif tipo_exposicao == "Inalação":
-            dose_diaria = atividade_fonte * 100  # µSv/dia para inalação
-        elif tipo_exposicao == "Ingestão":
-            dose_diaria = atividade_fonte * 500  # µSv/dia para ingestão
-        else:  # Ambiental
-            dose_diaria = atividade_fonte * 10   # µSv/dia para ambiental
-            
-        dose_total = dose_diaria * tempo_exposicao
-        
-        # Reduções por proteção
-        fatores_conhecimento = {"Nenhum": 1.0, "Baixo": 0.8, "Médio": 0.5, "Alto": 0.2}
-        dose_total *= fatores_conhecimento[conhecimento]
-        
-        if lavagem:
-            dose_total *= 0.3  # Redução de 70% com higiene adequada
+        resultado = executar_goiania(ParametrosGoiania(atividade_fonte, tempo_exposicao, tipo_exposicao, conhecimento,
+                                                       lavagem))
+        dose_total = resultado.dose_total
         
         st.markdown("---")
         st.markdown("### 📊 Resultados da Simulação")
@@ -2104,21 +5194,15 @@ def simulacao_goiania():
             st.markdown(f'<div class="info-box"><h4>📏 Equivalente: <span style="color:#1976D2">{dose_total/1000:.1f} mSv</span></h4></div>', unsafe_allow_html=True)
         
         with col_res2:
-            if dose_total < 100000:  # < 100 mSv
-                risco = "Baixo"
-                cor = "green"
-            elif dose_total < 1000000:  # < 1 Sv
-                risco = "Moderado"
-                cor = "orange"
-            elif dose_total < 3000000:  # < 3 Sv
-                risco = "Alto"
-                cor = "red"
-            else:
-                risco = "Severo"
-                cor = "darkred"
+            risco = resultado.risco
+            cor = cor_risco("Goiânia", risco)
             
             st.markdown(f'<div class="warning-box"><h4>⚠️ Nível de risco: <span style="color:{cor}">{risco}</span></h4></div>', unsafe_allow_html=True)
         
+        st.markdown(f"**Dose pela fonte ({tipo_exposicao.lower()}):** {resultado.extras['dose_fonte'] / 1000:.1f} mSv — "
+                    "**ressuspensão a 100 m:** "
+                    + ", ".join(f"{via} {resultado.vias[via]:.1f} µSv" for via in ("nuvem", "solo", "inalacao", "ingestao")))
+        
         # Efeitos na saúde baseados no acidente real
         st.markdown("### 👨‍⚕️ Efeitos na Saúde Observados")
         
@@ -2140,6 +5224,13 @@ def simulacao_goiania():
             st.markdown("- Possíveis efeitos dermatológicos")
             st.markdown("- Monitoramento médico recomendado")
         
+        # Ressuspensão do pó de cloreto de césio (fração de 10⁻⁴ da fonte) dispersa pelo vento
+        st.markdown("### 🌬️ Dispersão por Ressuspensão")
+        resultado_pluma = resultado.pluma
+        exibir_pluma(resultado_pluma, "Deposição de Cs-137 (kBq/m²)",
+                     campo=resultado_pluma["pluma"]["Cs-137"]["deposicao"] / 1000, rotulo="Deposição (kBq/m²)",
+                     niveis=(1, 10, 100, 1000))
+        
         # Estatísticas do acidente real
         st.markdown("### 📊 Estatísticas do Acidente Real")
         
@@ -2217,27 +5308,10 @@ def simulacao_three_mile_island():
                               index=1)
     
     if st.button("📊 Simular Impacto de Three Mile Island"):
-        # Cálculos baseados no acidente real (que teve baixíssima liberação)
-        dose_base = severidade * 10  # µSv/h no pico próximo à usina
-        dose_total = dose_base * tempo_exposicao
-        
-        # Ajustes baseados nos fatores
-        if contencao == "Intacta":
-            dose_total *= 0.1  # 90% de redução
-        elif contencao == "Danificada":
-            dose_total *= 0.5  # 50% de redução
-            
-        if resposta == "Imediata":
-            dose_total *= 0.3
-        elif resposta == "Rápida":
-            dose_total *= 0.7
-        elif resposta == "Lenta":
-            dose_total *= 1.2
-            
-        if vento_direcao == "Para áreas populadas":
-            dose_total *= 2.0
-        elif vento_direcao == "Para áreas rurais":
-            dose_total *= 0.5
+        resultado = executar_three_mile_island(ParametrosThreeMileIsland(severidade, tempo_exposicao, vento_direcao,
+                                                                         contencao, resposta))
+        resultado_pluma = resultado.pluma
+        dose_total = resultado.dose_total
         
         st.markdown("---")
         st.markdown("### 📊 Resultados da Simulação")
@@ -2250,21 +5324,16 @@ def simulacao_three_mile_island():
         
         with col_res2:
             # No acidente real, a dose máxima foi ~1 mSv
-            if dose_total < 1000:
-                risco = "Mínimo"
-                cor = "green"
-            elif dose_total < 5000:
-                risco = "Muito baixo"
-                cor = "lightgreen"
-            elif dose_total < 10000:
-                risco = "Baixo"
-                cor = "orange"
-            else:
-                risco = "Moderado"
-                cor = "red"
+            risco = resultado.risco
+            cor = cor_risco("Three Mile Island", risco)
             
             st.markdown(f'<div class="warning-box"><h4>⚠️ Nível de risco: <span style="color:{cor}">{risco}</span></h4></div>', unsafe_allow_html=True)
         
+        st.markdown("**Dose por via:** " + ", ".join(f"{via} {resultado.vias[via] / 1000:.2f} mSv"
+                                                     for via in ("nuvem", "solo", "inalacao", "ingestao")))
+        
+        exibir_pluma(resultado_pluma, "Dose de imersão na nuvem de Xe-133 (µSv)")
+        
         # Comparação com dados reais
         st.markdown("### 📊 Dados Reais do Acidente")
         
@@ -2355,25 +5424,21 @@ def simulacao_testes_nucleares():
                                  ["Hemisfério Norte", "Hemisfério Sul", "Equatorial"],
                                  index=0)
         populacao = st.slider("População exposta (milhões)", 
-                            1, 5000, 2000, 100)
+                            1, 5000, 2000, 100,
+                            help="Usada no raster sintético quando nenhum raster é carregado")
+        arquivo_populacao = st.file_uploader("Raster de população (pessoas/célula, .npy ou CSV)", type=["npy", "csv"])
+        celula_km = st.number_input("Tamanho da célula do raster (km)", 0.1, 100.0, 1.0, 0.1)
     
     if st.button("📊 Simular Impacto dos Testes Nucleares"):
-        # Cálculos baseados em estudos do UNSCEAR
-        dose_per_test = 10  # µSv por quilotons por teste
-        dose_total = numero_testes * potencia_total * 1000 * dose_per_test  # Convertendo para quilotons
-        
-        # Ajustes por período e localização
-        if periodo == "1945-1963":
-            dose_total *= 1.5  # Testes mais sujos no início
-        elif periodo == "1963-1980":
-            dose_total *= 0.7  # Testes mais limpos após PTBT
-            
-        if localizacao == "Hemisfério Norte":
-            dose_total *= 1.2  # Maior concentração no HN
-        elif localizacao == "Hemisfério Sul":
-            dose_total *= 0.8
-        
-        dose_per_capita = dose_total / populacao
+        # Cópias do upload vivem só durante a execução
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as pasta:
+            raster = abrir_raster_populacao(arquivo_populacao, diretorio=pasta) if arquivo_populacao is not None else None
+            resultado = executar_testes_nucleares(ParametrosTestesNucleares(numero_testes, potencia_total, periodo,
+                                                                            localizacao, populacao, celula_km, raster))
+            del raster
+        resultado_pluma = resultado.pluma
+        coletiva = resultado.extras["coletiva"]
+        dose_per_capita = resultado.extras["dose_per_capita"]
         
         st.markdown("---")
         st.markdown("### 📊 Resultados da Simulação")
@@ -2381,7 +5446,7 @@ def simulacao_testes_nucleares():
         col_res1, col_res2, col_res3 = st.columns(3)
         
         with col_res1:
-            st.markdown(f'<div class="result-box"><h4>📈 Dose coletiva: <span style="color:#d32f2f">{dose_total/1e9:,.1f} 10⁹ µSv</span></h4></div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="result-box"><h4>📈 Dose coletiva: <span style="color:#d32f2f">{coletiva["pessoa_sv"]:,.0f} pessoa-Sv</span></h4></div>', unsafe_allow_html=True)
         
         with col_res2:
             st.markdown(f'<div class="result-box"><h4>👥 Dose per capita: <span style="color:#d32f2f">{dose_per_capita:,.0f} µSv</span></h4></div>', unsafe_allow_html=True)
@@ -2405,15 +5470,19 @@ def simulacao_testes_nucleares():
         df_reais = pd.DataFrame(dados_reais)
         st.dataframe(df_reais, use_container_width=True)
         
+        st.markdown(f"### 👥 Dose Coletiva Regional por Distância ({coletiva['populacao'] / 1e6:,.0f} milhões de pessoas no raster)")
+        st.dataframe(coletiva["por_banda"].style.format({"População": "{:,.0f}", "Dose coletiva (pessoa-Sv)": "{:,.1f}",
+                                                          "Dose média (mSv)": "{:.3f}"}), use_container_width=True)
+        
         # Impacto na saúde global
         st.markdown("### 👨‍⚕️ Impacto na Saúde Global Estimado")
         
         # Baseado em modelos da ONU (UNSCEAR)
-        canceres_estimados = dose_total / 1e9 * 0.05  # 5% por Sv para população
+        canceres_estimados = resultado.extras["canceres_estimados"]
         
         st.markdown(f"""
         **Estimativas baseadas em modelos da UNSCEAR:**
-        - **Dose coletiva total:** {dose_total/1e9:.1f} × 10⁹ homem-µSv
+        - **Dose coletiva regional:** {coletiva["pessoa_sv"]:,.1f} pessoa-Sv
         - **Risco de câncer:** ~5% por Sievert para população
         - **Cânceres estimados:** ~{canceres_estimados:,.0f} casos adicionais
         - **Distribuição:** Principalmente tireoide, leucemia e sólidos
@@ -2421,6 +5490,12 @@ def simulacao_testes_nucleares():
         **Nota:** Estas são estimativas estatísticas, não casos individuais identificáveis.
         """)
         
+        st.markdown("### 🌬️ Fallout Regional de um Teste Típico")
+        st.markdown(f"**Potência média por teste:** {resultado.extras['potencia_media'] * 1000:,.0f} kt")
+        exibir_pluma(resultado_pluma, "Deposição de Cs-137 (kBq/m²)",
+                     campo=resultado_pluma["pluma"]["Cs-137"]["deposicao"] / 1000, rotulo="Deposição (kBq/m²)",
+                     niveis=(1, 10, 100))
+        
         # Evolução temporal
         st.markdown("### 📈 Evolução Temporal das Liberações")
         
@@ -2511,24 +5586,10 @@ def simulacao_kyshtym():
                                         index=0)
     
     if st.button("📊 Simular Impacto de Kyshtym"):
-        # Cálculos baseados no acidente real
-        dose_base = atividade * 50  # µSv para população próxima
-        dose_total = dose_base
-        
-        # Ajustes baseados nos fatores
-        if evacuacao == "Imediata":
-            dose_total *= 0.2
-        elif evacuacao == "1 semana":
-            dose_total *= 0.5
-        elif evacuacao == "2 semanas":
-            dose_total *= 0.8
-            
-        if informacao_publica == "Completa":
-            dose_total *= 0.3
-        elif informacao_publica == "Parcial":
-            dose_total *= 0.6
-        elif informacao_publica == "Limitada":
-            dose_total *= 0.9
+        resultado = executar_kyshtym(ParametrosKyshtym(volume_residuos, atividade, vento_velocidade, evacuacao,
+                                                       informacao_publica))
+        resultado_pluma = resultado.pluma
+        dose_total = resultado.dose_total
         
         st.markdown("---")
         st.markdown("### 📊 Resultados da Simulação")
@@ -2540,18 +5601,14 @@ def simulacao_kyshtym():
             st.markdown(f'<div class="info-box"><h4>📏 Equivalente: <span style="color:#1976D2">{dose_total/1000:.1f} mSv</span></h4></div>', unsafe_allow_html=True)
         
         with col_res2:
-            if dose_total < 50000:
-                risco = "Moderado"
-                cor = "orange"
-            elif dose_total < 200000:
-                risco = "Alto"
-                cor = "red"
-            else:
-                risco = "Severo"
-                cor = "darkred"
+            risco = resultado.risco
+            cor = cor_risco("Kyshtym", risco)
             
             st.markdown(f'<div class="warning-box"><h4>⚠️ Nível de risco: <span style="color:{cor}">{risco}</span></h4></div>', unsafe_allow_html=True)
         
+        st.markdown("**Dose por via:** " + ", ".join(f"{via} {resultado.vias[via] / 1000:.2f} mSv"
+                                                     for via in ("nuvem", "solo", "inalacao", "ingestao")))
+        
         # Informações históricas
         st.markdown("### 📜 Informações Históricas (Reveladas Tardiamente)")
         st.markdown("""
@@ -2572,24 +5629,12 @@ def simulacao_kyshtym():
         # Mapa do fallout
         st.markdown("### 🗺️ Trajetória do Fallout de Kyshtym")
         
-        # Criar mapa simplificado da pluma de contaminação
-        x = np.linspace(0, 300, 100)
-        y = 20 * np.exp(-0.01 * x) * np.sin(0.1 * x)  # Padrão de pluma oscilante
+        # Deposição de Sr-90 pela pluma gaussiana; 74 kBq/m² (2 Ci/km²) delimita o traço do Ural Oriental
+        deposicao_sr = resultado.extras["deposicao_sr"]
+        st.markdown(f"**Área com Sr-90 acima de 74 kBq/m² (2 Ci/km²):** {resultado.extras['area_traco_km2']:,.0f} km²")
         
-        fig, ax = plt.subplots(figsize=(12, 6))
-        ax.plot(x, y, 'r-', linewidth=3, alpha=0.7, label='Trajetória principal do fallout')
-        ax.fill_between(x, -y, y, color='red', alpha=0.2, label='Área de contaminação significativa')
-        
-        ax.axvline(x=100, color='orange', linestyle='--', label='Zona de evacuação imediata')
-        ax.axvline(x=200, color='yellow', linestyle='--', label='Zona de monitoramento intensivo')
-        
-        ax.set_xlabel("Distância da Fonte (km)")
-        ax.set_ylabel("Largura da Pluma (km)")
-        ax.set_title("Padrão de Dispersão do Fallout de Kyshtym")
-        ax.legend()
-        ax.grid(True)
-        
-        st.pyplot(fig)
+        exibir_pluma(resultado_pluma, "Deposição de Sr-90 (kBq/m²)", campo=deposicao_sr,
+                     rotulo="Deposição (kBq/m²)", niveis=(3.7, 74, 3700))
         
         # Lições aprendidas
         st.markdown("### 💡 Lições Aprendidas com Kyshtym")
@@ -2614,7 +5659,7 @@ def simulacao_windscale():
                                    help="Tempo que o incêndio permaneceu ativo")
         
         iodo_liberado = st.slider("I-131 liberado (TBq)", 
-                                1, 10000, 20000, 100,
+                                100, 30000, 20000, 100,
                                 help="Estimativa de Iodo-131 liberado")
         
         direcao_vento = st.selectbox("Direção predominante do vento", 
@@ -2634,44 +5679,34 @@ def simulacao_windscale():
         restricoes_alimentares = st.checkbox("Restrições alimentares", value=True)
     
     if st.button("📊 Simular Impacto de Windscale"):
-        # Cálculos baseados no acidente real
-        dose_base = iodo_liberado * 0.05  # µSv por TBq liberado
-        dose_total = dose_base
-        
-        # Ajustes baseados nos fatores
-        if direcao_vento == "Para o mar Irlandês":
-            dose_total *= 0.3
-        elif direcao_vento == "Para áreas urbanas":
-            dose_total *= 2.0
-            
-        if monitoramento_leite:
-            dose_total *= 0.5
-        if distribuicao_iodo:
-            dose_total *= 0.3
-        if restricoes_alimentares:
-            dose_total *= 0.4
+        resultado = executar_windscale(ParametrosWindscale(duracao_incendio, iodo_liberado, direcao_vento,
+                                                           monitoramento_leite, distribuicao_iodo, restricoes_alimentares))
+        resultado_pluma = resultado.pluma
+        dose_total = resultado.dose_total
         
         st.markdown("---")
         st.markdown("### 📊 Resultados da Simulação")
         
-        col_res1, col_res2 = st.columns(2)
-        
-        with col_res1:
-            st.markdown(f'<div class="result-box"><h4>📈 Dose de tireoide: <span style="color:#d32f2f">{dose_total:,.0f} µSv</span></h4></div>', unsafe_allow_html=True)
-            st.markdown(f'<div class="info-box"><h4>📏 Equivalente: <span style="color:#1976D2">{dose_total/1000:.1f} mSv</span></h4></div>', unsafe_allow_html=True)
-        
-        with col_res2:
-            if dose_total < 10000:
-                risco = "Baixo"
-                cor = "green"
-            elif dose_total < 50000:
-                risco = "Moderado"
-                cor = "orange"
-            else:
-                risco = "Alto"
-                cor = "red"
+        if not resultado.extras["pluma_em_terra"]:
+            # Só o lado de terra (azimutes 0–180°) é avaliado: sem localidade exposta, não há dose a mostrar
+            st.info("🌊 Com o vento para o mar Irlandês, a pluma não passa sobre terra: nenhuma localidade a 10 km "
+                    "recebe dose de tireoide significativa da liberação.")
+        else:
+            col_res1, col_res2 = st.columns(2)
             
-            st.markdown(f'<div class="warning-box"><h4>⚠️ Risco de câncer de tireoide: <span style="color:{cor}">{risco}</span></h4></div>', unsafe_allow_html=True)
+            with col_res1:
+                st.markdown(f'<div class="result-box"><h4>📈 Dose de tireoide: <span style="color:#d32f2f">{dose_total:,.0f} µSv</span></h4></div>', unsafe_allow_html=True)
+                st.markdown(f'<div class="info-box"><h4>📏 Equivalente: <span style="color:#1976D2">{dose_total/1000:.1f} mSv</span></h4></div>', unsafe_allow_html=True)
+            
+            with col_res2:
+                risco = resultado.risco
+                cor = cor_risco("Windscale", risco)
+                
+                st.markdown(f'<div class="warning-box"><h4>⚠️ Risco de câncer de tireoide: <span style="color:{cor}">{risco}</span></h4></div>', unsafe_allow_html=True)
+            
+            st.markdown(f"**Dose de tireoide por via a 10 km (azimute {resultado.extras['azimute']:.0f}°):** "
+                        + ", ".join(f"{via} {resultado.vias[via] / 1000:.2f} mSv"
+                                    for via in ("nuvem", "solo", "inalacao", "ingestao")))
         
         # Informações históricas
         st.markdown("### 📜 Informações Históricas")
@@ -2690,6 +5725,13 @@ def simulacao_windscale():
         - Levou a melhorias significativas na segurança de reatores
         """)
         
+        st.markdown("### 🌬️ Pluma de I-131")
+        tireoide_10km = resultado.extras["tireoide_10km_sem_protecao"]
+        st.markdown(f"**Dose de tireoide por inalação a 10 km no eixo da pluma (sem proteção):** {tireoide_10km / 1000:,.1f} mSv")
+        exibir_pluma(resultado_pluma, "Deposição de I-131 (kBq/m²)",
+                     campo=resultado_pluma["pluma"]["I-131"]["deposicao"] / 1000, rotulo="Deposição (kBq/m²)",
+                     niveis=(1, 10, 100, 1000))
+        
         # Medidas de proteção implementadas
         st.markdown("### 🛡️ Medidas de Proteção Implementadas")
         
@@ -2730,7 +5772,7 @@ def simulacao_tokaimura():
                                     help="Massa de urânio enriquecido envolvida")
         
         enriquecimento = st.slider("Enriquecimento (%)", 
-                                 1, 100, 18.8, 0.1,
+                                 1.0, 100.0, 18.8, 0.1,
                                  help="Teor de U-235 no urânio")
         
         duracao_criticidade = st.slider("Duração da criticidade (horas)", 
@@ -2751,18 +5793,9 @@ def simulacao_tokaimura():
                                     index=1)
     
     if st.button("📊 Simular Impacto de Tokaimura"):
-        # Cálculos baseados no acidente real
-        # Acidente de criticidade produz doses extremamente altas em curta distância
-        dose_instantanea = 10000000  # µSv/s a 1m para reação crítica
-        dose_total = dose_instantanea * duracao_criticidade * 3600 / (distancia_operadores ** 2)
-        
-        # Ajustes baseados no tempo de resposta
-        if tempo_resposta == "Imediato":
-            dose_total *= 0.1
-        elif tempo_resposta == "Rápido":
-            dose_total *= 0.3
-        elif tempo_resposta == "Lento":
-            dose_total *= 2.0
+        resultado = executar_tokaimura(ParametrosTokaimura(quantidade_uranio, enriquecimento, duracao_criticidade,
+                                                           distancia_operadores, tempo_resposta))
+        dose_total = resultado.dose_total
         
         st.markdown("---")
         st.markdown("### 📊 Resultados da Simulação")
@@ -2774,18 +5807,8 @@ def simulacao_tokaimura():
             st.markdown(f'<div class="info-box"><h4>📏 Equivalente: <span style="color:#1976D2">{dose_total/1000000:.1f} Sv</span></h4></div>', unsafe_allow_html=True)
         
         with col_res2:
-            if dose_total < 1000000:  # < 1 Sv
-                risco = "Moderado"
-                cor = "orange"
-            elif dose_total < 3000000:  # < 3 Sv
-                risco = "Alto"
-                cor = "red"
-            elif dose_total < 6000000:  # < 6 Sv
-                risco = "Muito alto"
-                cor = "darkred"
-            else:
-                risco = "Fatal"
-                cor = "black"
+            risco = resultado.risco
+            cor = cor_risco("Tokaimura", risco)
             
             st.markdown(f'<div class="warning-box"><h4>⚠️ Nível de risco: <span style="color:{cor}">{risco}</span></h4></div>', unsafe_allow_html=True)
         
@@ -2813,6 +5836,50 @@ def simulacao_tokaimura():
             st.markdown("- Redução temporária de células sanguíneas")
             st.markdown("- Recuperação em semanas a meses")
         
+        # Histórico da excursão pela cinética pontual
+        st.markdown("### ⚛️ Cinética da Excursão")
+        historico = resultado.extras["historico"]
+        col_k1, col_k2, col_k3 = st.columns(3)
+        with col_k1:
+            st.metric("Reatividade inserida", f"{resultado.extras['reatividade'] / PARAMETROS_CINETICA['beta'].sum():.2f} $")
+        with col_k2:
+            st.metric("Potência de pico", f"{historico['potencia'].max() / 1e3:,.0f} kW")
+        with col_k3:
+            st.metric("Fissões totais", f"{resultado.extras['fissoes']:.2e}")
+        
+        fig_k, (ax_p, ax_f) = plt.subplots(1, 2, figsize=(14, 5))
+        tempo_s = np.maximum(historico["tempo"], 1e-3)
+        ax_p.loglog(tempo_s, np.maximum(historico["potencia"], 1e-3), 'r-', linewidth=2)
+        ax_p.set_xlabel("Tempo (s)")
+        ax_p.set_ylabel("Potência (W)")
+        ax_p.set_title("Potência da Solução Crítica")
+        ax_p.grid(True, which='both', alpha=0.3)
+        ax_t = ax_p.twinx()
+        ax_t.semilogx(tempo_s, historico["temperatura"], 'b--', alpha=0.6)
+        ax_t.set_ylabel("Elevação de temperatura (K)", color='b')
+        
+        distancias_m = np.geomspace(0.5, 1000, 200)
+        doses_dist = dose_criticidade(resultado.extras["fissoes"], distancias_m)
+        ax_f.loglog(distancias_m, doses_dist["neutrons"] / 1000, 'm-', label='Nêutrons')
+        ax_f.loglog(distancias_m, doses_dist["gama"] / 1000, 'g-', label='Gama')
+        ax_f.loglog(distancias_m, doses_dist["total"] / 1000, 'k-', linewidth=2, label='Total')
+        ax_f.axhline(y=1, color='orange', linestyle='--', label='Limite público anual (1 mSv)')
+        ax_f.set_ylim(1e-3, None)
+        ax_f.set_xlabel("Distância (m)")
+        ax_f.set_ylabel("Dose na excursão completa (mSv)")
+        ax_f.set_title("Dose de Nêutrons e Gama vs Distância")
+        ax_f.legend()
+        ax_f.grid(True, which='both', alpha=0.3)
+        st.pyplot(fig_k)
+        st.markdown(f"**Fissões durante a permanência dos operadores:** {resultado.extras['fissoes_operadores']:.2e}")
+        
+        st.markdown("### 🌬️ Liberação de Gases de Fissão")
+        atividade_xe = resultado.extras["atividade_xe"]
+        resultado_pluma = resultado.pluma
+        st.markdown(f"**Xe-133 liberado:** {atividade_xe / 1e9:,.0f} GBq — dose externa fora da instalação "
+                    f"dominada por nêutrons e gama diretos, não pela pluma")
+        exibir_pluma(resultado_pluma, "Dose de imersão na nuvem de Xe-133 (µSv)", niveis=(0.001, 0.01, 0.1, 1))
+        
         # Dados reais do acidente
         st.markdown("### 📊 Dados Reais do Acidente de Tokaimura")
         
@@ -3259,34 +6326,25 @@ def modulo_comparar():
 # ROTEIRIZADOR PRINCIPAL
 # =============================================================================
 
-def main():
-    # Mapeamento de módulos para funções
-    modulos_map = {
-        "Datação Radiométrica": modulo_datacao_radiometrica,
-        "Blindagem Radiológica": modulo_blindagem,
-        "Radioterapia": modulo_radioterapia,
-        "Distribuição de Dose": modulo_distribuicao_dose,
-        "Aplicações Clínicas": modulo_aplicacoes_clinicas,
-        "Aplicações Ambientais": modulo_aplicacoes_ambientais,
-        "Efeito Compton": modulo_efeito_compton,
-        "Produção de Pares": modulo_producao_pares,
-        "Exposição Ocupacional": modulo_exposicao_ocupacional,
-        "Cenários Históricos": modulo_cenarios_historicos,
-        "Decaimento Radioativo": modulo_decaimento_radioativo,
-        "Modo Explicativo": modulo_explicativo,
-        "Quiz Interativo": modulo_quiz,
-        "Exportar Dados": modulo_exportar,
-        "Comparar Simulações": modulo_comparar
-    }
-    
-    # Executar o módulo selecionado
-    if modulo in modulos_map:
-        modulos_map[modulo]()
-    else:
-        st.error("Módulo não encontrado!")
+# Mapeamento de módulos para funções
+modulos_map = {
+    "Datação Radiométrica": modulo_datacao_radiometrica,
+    "Blindagem Radiológica": modulo_blindagem,
+    "Radioterapia": modulo_radioterapia,
+    "Distribuição de Dose": modulo_distribuicao_dose,
+    "Aplicações Clínicas": modulo_aplicacoes_clinicas,
+    "Aplicações Ambientais": modulo_aplicacoes_ambientais,
+    "Efeito Compton": modulo_efeito_compton,
+    "Produção de Pares": modulo_producao_pares,
+    "Exposição Ocupacional": modulo_exposicao_ocupacional,
+    "Cenários Históricos": modulo_cenarios_historicos,
+    "Decaimento Radioativo": modulo_decaimento_radioativo,
+    "Modo Explicativo": modulo_explicativo,
+    "Quiz Interativo": modulo_quiz,
+    "Exportar Dados": modulo_exportar,
+    "Comparar Simulações": modulo_comparar
+}
 
-if __name__ == "__main__":
-    main()
 # Continuação do código anterior...
 
 # =============================================================================
@@ -4023,22 +7081,6 @@ def mostrar_rodape():
     st.markdown("---")
     st.markdown("*RadSimLab Pro v2.0 - Simulador Radiológico Avançado*")
 
-# =============================================================================
-# EXECUÇÃO PRINCIPAL ATUALIZADA
-# =============================================================================
-
-def main():
-    # Executar o módulo selecionado
-    if modulo in modulos_map:
-        modulos_map[modulo]()
-    else:
-        st.error("Módulo não encontrado!")
-    
-    # Mostrar rodape em todas as páginas
-    mostrar_rodape()
-
-if __name__ == "__main__":
-    main()
 # Continuação do código anterior...
 
 # =============================================================================
@@ -4054,7 +7096,6 @@ if __name__ == "__main__":
 
 import logging
 from logging.handlers import RotatingFileHandler
-import os
 
 # Configurar sistema de logging
 def setup_logging():
@@ -4080,7 +7121,6 @@ logger = setup_logging()
 # =============================================================================
 
 import json
-import yaml
 
 class ConfigManager:
     def __init__(self):
@@ -4457,6 +7497,8 @@ def carregar_estilo():
 modulos_map["Administração"] = modulo_administracao
 
 def main():
+    modulo = configurar_pagina()
+
     # Carregar estilo
     st.markdown(carregar_estilo(), unsafe_allow_html=True)
     
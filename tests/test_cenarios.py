@@ -0,0 +1,34 @@
+"""Testes de fumaça dos motores de cenários históricos (executados sem Streamlit)"""
+import math
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, RAIZ)
+
+import cenarios
+
+
+def test_importa_sem_streamlit():
+    codigo = "import sys, cenarios; assert 'streamlit' not in sys.modules"
+    subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, check=True)
+
+
+def test_executar_cenario_chernobyl():
+    resultado = cenarios.executar_cenario("Chernobyl")
+    assert isinstance(resultado, cenarios.ResultadoCenario)
+    assert math.isfinite(resultado.dose_total) and resultado.dose_total > 0
+    assert resultado.risco in cenarios.FAIXAS_RISCO["Chernobyl"][1]
+    assert math.isclose(resultado.vias["total"], sum(resultado.vias[v] for v in ("nuvem", "solo", "inalacao", "ingestao")))
+
+
+def test_liberacao_maior_aumenta_dose():
+    base = cenarios.executar_cenario("Chernobyl")
+    maior = cenarios.executar_cenario("Chernobyl", liberacao_pbq=10 * cenarios.ParametrosChernobyl().liberacao_pbq)
+    assert maior.dose_total > base.dose_total
+
+
+def test_todos_os_cenarios_executam():
+    for cenario in cenarios.MOTORES_CENARIOS:
+        assert math.isfinite(cenarios.executar_cenario(cenario).dose_total)